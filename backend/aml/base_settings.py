@@ -216,4 +216,17 @@ else:
 
 MARKUP_SETTINGS = {"markdown": {"safe_mode": False}}
 
+# Serialized experiments, blocks and themes (see experiment/cache.py) and choice lists (see question/choices.py) are
+# cached, and invalidated on admin edits.
+# With the default per-process cache, other worker processes may serve old content until this timeout (in seconds)
+# passes; configure a shared cache backend in CACHES to avoid this.
+SERIALIZED_CONTENT_CACHE_TIMEOUT = int(os.getenv("AML_SERIALIZED_CONTENT_CACHE_TIMEOUT", 300))
+
+# Count section plays in the cache instead of writing them on every audio request (see section/play_counts.py).
+# Requires a shared cache backend in CACHES, and running `manage.py flushplaycounts` periodically and on shutdown.
+BUFFER_PLAY_COUNTS = os.getenv("AML_BUFFER_PLAY_COUNTS", "") == "True"
+
+# Let nginx send section audio files from this internal location (see nginx/custom-nginx.conf), e.g. "/protected-upload/"
+AUDIO_X_ACCEL_REDIRECT_PREFIX = os.getenv("AML_AUDIO_X_ACCEL_REDIRECT_PREFIX", "")
+
 SUBPATH = os.getenv("AML_SUBPATH", "")
@@ -11,7 +11,7 @@ from .trial import Trial
 
 from experiment.actions.utils import randomize_playhead
 from experiment.actions.question import ButtonArrayQuestion
-from question.models import ChoiceList
+from question.choices import get_choices
 from result.utils import prepare_result
 from section.models import Section
 from session.models import Session
@@ -75,7 +75,7 @@ def boolean_question(
         key=key,
         text=text,
         result_id=result_id,
-        choices=ChoiceList.objects.get(pk='BOOLEAN_NEGATIVE_FIRST').to_dict(),
+        choices=get_choices('BOOLEAN_NEGATIVE_FIRST'),
     )
 
 
@@ -27,7 +27,11 @@ from experiment.forms import (
 from experiment.widgets import MarkdownPreviewTextInput
 from question.admin import QuestionListInline
 from question.models import QuestionList, QuestionInList
-from .utils import get_block_csv_export_as_response, get_block_json_export_as_response
+from .utils import (
+    get_block_csv_export_as_response,
+    get_block_json_export_as_response,
+    get_block_jsonl_export_as_response,
+)
 
 
 class FeedbackAdmin(admin.ModelAdmin):
@@ -295,6 +299,10 @@ class ExperimentAdmin(InlineActionsModelAdminMixin, TabbedTranslationAdmin):
             block_slug = request.POST.get("export-block")
             return get_block_json_export_as_response(block_slug)
 
+        if "_export_jsonl" in request.POST:
+            block_slug = request.POST.get("export-block")
+            return get_block_jsonl_export_as_response(block_slug)
+
         if "_export_csv" in request.POST:
             block_slug = request.POST.get("export-block")
             return get_block_csv_export_as_response(block_slug)
@@ -1,5 +1,30 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class AMLExperimentConfig(AppConfig):
     name = 'experiment'
+
+    def ready(self):
+        from experiment.cache import invalidate_serialized_content
+        from experiment.models import Block, Experiment, Phase, SocialMediaConfig
+        from image.models import Image
+        from theme.models import FooterConfig, HeaderConfig, SponsorImage, ThemeConfig
+
+        # models from which experiments, blocks and themes are serialized
+        for model in [
+            Experiment,
+            Phase,
+            Block,
+            SocialMediaConfig,
+            ThemeConfig,
+            FooterConfig,
+            HeaderConfig,
+            SponsorImage,
+            Image,
+        ]:
+            post_save.connect(invalidate_serialized_content, sender=model, dispatch_uid=f'invalidate_{model.__name__}')
+            post_delete.connect(invalidate_serialized_content, sender=model, dispatch_uid=f'invalidate_{model.__name__}')
+        m2m_changed.connect(
+            invalidate_serialized_content, sender=FooterConfig.logos.through, dispatch_uid='invalidate_footer_logos'
+        )
@@ -0,0 +1,83 @@
+"""Versioned cache for serialized experiment content (experiments, blocks and themes).
+
+Serialized content only changes when an admin edits it, so it is cached per object and language,
+under a content version which is bumped by signals whenever one of the models it is built from is saved or deleted,
+as soon as the change is committed.
+"""
+
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import get_language
+
+CONTENT_VERSION_KEY = "serialized_content_version"
+
+
+def get_version(key: str) -> int:
+    """
+    Args:
+        key: cache key of the version
+
+    Returns:
+        the current version stored under `key`
+    """
+    version = cache.get(key)
+    if version is None:
+        # start from a timestamp, so an evicted version never reuses the keys of older content
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _increment_version(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def bump_version(key: str):
+    """Bump the version stored under `key` once the current transaction is committed,
+    so other requests cannot cache data from before the commit under the new version
+
+    Args:
+        key: cache key of the version
+    """
+    transaction.on_commit(lambda: _increment_version(key))
+
+
+def get_content_version() -> int:
+    """
+    Returns:
+        the current version of the serialized content
+    """
+    return get_version(CONTENT_VERSION_KEY)
+
+
+def invalidate_serialized_content(**kwargs):
+    """Signal receiver which bumps the content version, so all cached serializations are rebuilt"""
+    bump_version(CONTENT_VERSION_KEY)
+
+
+def cached_serialization(kind: str, pk: int, serialize: Callable[[], dict]) -> dict:
+    """Return the cached serialization of an object in the active language, or serialize and cache it
+
+    Args:
+        kind: the kind of object, e.g. "block"
+        pk: primary key of the object
+        serialize: function returning the serialization of the object
+
+    Returns:
+        serialized object
+    """
+    if pk is None:
+        return serialize()
+    key = f"serialized:{kind}:{pk}:{get_language()}:{get_content_version()}"
+    serialized = cache.get(key)
+    if serialized is None:
+        serialized = serialize()
+        cache.set(key, serialized, timeout=settings.SERIALIZED_CONTENT_CACHE_TIMEOUT)
+    return serialized
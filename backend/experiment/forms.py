@@ -19,7 +19,7 @@ class BlockForm(ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         choices = tuple(
-            (rules, BLOCK_RULES[rules].__name__) for rules in BLOCK_RULES
+            (rules, BLOCK_RULES.class_name(rules)) for rules in BLOCK_RULES
         ) + (("", "---------"),)
         self.fields["rules"] = ChoiceField(choices=sorted(choices))
 
@@ -30,8 +30,7 @@ class BlockForm(ModelForm):
 
         # Validate the rules' playlist(s)
         rule_id = self.cleaned_data["rules"]
-        cl = BLOCK_RULES[rule_id]
-        rules = cl()
+        rules = BLOCK_RULES.get_instance(rule_id)
         playlists = self.cleaned_data["playlists"]
         if not playlists:
             return self.cleaned_data["playlists"]
@@ -0,0 +1,77 @@
+import gzip
+import multiprocessing
+import resource
+import time
+from io import BytesIO
+from zipfile import ZipFile
+
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from experiment.models import Block
+from experiment.utils import _block_export_tables, block_export_json_results, iter_block_export_jsonl
+
+
+def _export_serialize_whole_tables(block_slug: str) -> int:
+    """The export as it was before it was streamed: every table serialized to one string in an in-memory zip"""
+    zip_buffer = BytesIO()
+    with ZipFile(zip_buffer, "w") as new_zip:
+        for name, queryset in _block_export_tables(Block.objects.get(slug=block_slug)):
+            new_zip.writestr(f"{name}.json", data=str(serializers.serialize("json", queryset)))
+    return len(gzip.compress(zip_buffer.getbuffer()))
+
+
+def _export_in_memory(block_slug: str) -> int:
+    return len(block_export_json_results(block_slug).getbuffer())
+
+
+def _export_streaming(block_slug: str) -> int:
+    return sum(len(part) for part in iter_block_export_jsonl(block_slug))
+
+
+EXPORTERS = {
+    "json (whole tables)": _export_serialize_whole_tables,
+    "json (in memory)": _export_in_memory,
+    "json lines (streaming)": _export_streaming,
+}
+
+
+def _measure(exporter, block_slug: str, connection):
+    """Run an exporter in a child process, and send (size, seconds, peak rss increase in kB) to the parent"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    size = exporter(block_slug)
+    duration = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send((size, duration, peak - baseline))
+    connection.close()
+
+
+class Command(BaseCommand):
+    """Command for comparing the peak memory use of the block exports
+    Usage: python manage.py benchmarkexport block_slug"""
+
+    help = 'Compare duration and peak memory (RSS) of the previous, in-memory and streaming block exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('block_slug', type=str, help="Block slug")
+
+    def handle(self, *args, **options):
+        block_slug = options['block_slug']
+        if not Block.objects.filter(slug=block_slug).exists():
+            raise CommandError('Block "%s" does not exist with slug' % block_slug)
+
+        # every exporter runs in a fresh process, as peak RSS can only go up within a process
+        context = multiprocessing.get_context("fork")
+        for name, exporter in EXPORTERS.items():
+            connections.close_all()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_measure, args=(exporter, block_slug, sender))
+            process.start()
+            size, duration, rss_increase = receiver.recv()
+            process.join()
+            self.stdout.write(
+                f'{name}: {size / 1e6:.1f} MB archive in {duration:.1f} s, '
+                f'peak RSS +{rss_increase / 1024:.1f} MB'
+            )
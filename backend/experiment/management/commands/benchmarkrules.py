@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from experiment.rules import BLOCK_RULES
+
+# runs in a fresh interpreter, as modules are only imported once per process
+IMPORT_TIMES = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+from experiment.rules import BLOCK_RULES
+setup = time.perf_counter()
+BLOCK_RULES[{rules_id!r}]
+one = time.perf_counter()
+for rules_id in BLOCK_RULES:
+    BLOCK_RULES[rules_id]
+print(setup - start, one - setup, time.perf_counter() - one)
+"""
+
+
+class Command(BaseCommand):
+    """Command for measuring the cost of importing and instantiating rules
+    Usage: python manage.py benchmarkrules [--rules RULES_ID] [--repeat 1000]"""
+
+    help = 'Measure the start-up time of a worker, the time to import rules modules, and the cost of getting rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', type=str, default='HOOKED', help="ID of the rules to import and instantiate")
+        parser.add_argument('--repeat', type=int, default=1000, help="Number of times to get the rules")
+
+    def handle(self, *args, **options):
+        rules_id = options['rules']
+        if rules_id not in BLOCK_RULES:
+            raise CommandError('Rules "%s" do not exist' % rules_id)
+        repeat = options['repeat']
+
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_TIMES.format(rules_id=rules_id)], check=True, capture_output=True, text=True
+        ).stdout
+        setup, one, others = (float(value) for value in output.split())
+        self.stdout.write(f'django setup, without importing rules modules: {setup * 1000:.0f} ms')
+        self.stdout.write(f'importing {rules_id} when it is first used: {one * 1000:.0f} ms')
+        self.stdout.write(
+            f'importing all other {len(BLOCK_RULES) - 1} rules modules, as every worker did at start-up: '
+            f'{others * 1000:.0f} ms'
+        )
+
+        rules_class = BLOCK_RULES[rules_id]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            rules_class()
+        new_instances = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(repeat):
+            BLOCK_RULES.get_instance(rules_id)
+        shared_instance = time.perf_counter() - start
+        self.stdout.write(
+            f'getting {rules_id} {repeat} times: {new_instances * 1000:.1f} ms with a new instance per call, '
+            f'{shared_instance * 1000:.1f} ms with the shared instance'
+        )
@@ -3,13 +3,13 @@ import csv
 from os.path import basename, join, splitext
 from os.path import split as pathsplit
 
-import audioread
 import json
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
 from experiment.rules import BLOCK_RULES
+from section.audio_metadata import normalize_path, scan_audio_files
 
 
 class Command(BaseCommand):
@@ -36,6 +36,10 @@ class Command(BaseCommand):
         parser.add_argument('--tag_group',
                             type=str,
                             help='Process tags and groups for sections')
+        parser.add_argument('--processes',
+                            type=int,
+                            default=None,
+                            help='Number of audio files to probe in parallel (default: number of CPUs)')
         parser.add_argument('--song_names',
                             type=str,
                             help='Read JSON file with song names for file names {<file-name>: <song-name>}')
@@ -53,6 +57,10 @@ class Command(BaseCommand):
             with open(join(playlist_dir, song_names_option)) as json_file:
                 song_names = json.load(json_file)
         block_option = options.get('block')
+        # probe the durations of all files at once, reusing the catalog for files which did not change
+        metadata = scan_audio_files(
+            (join(directory, audio_file) for audio_file in search_criteria), options.get('processes')
+        )
         with open(join(playlist_dir, 'audiofiles.csv'), 'w+') as f:
             csv_writer = csv.writer(f)
             for i, audio_file in enumerate(search_criteria):
@@ -75,8 +83,7 @@ class Command(BaseCommand):
                 else:
                     song_name = audio_file_clean
                 start_position = 0.0
-                with audioread.audio_open(join(playlist_dir, audio_file)) as f:
-                    duration = f.duration
+                duration = metadata[normalize_path(filename)].duration
                 group_tag_option = options.get('tag_group')
                 if group_tag_option:
                     group, tag = calculate_group_tag(
@@ -53,20 +53,15 @@ class Command(BaseCommand):
         # Get the experiment name in different cases
         ruleset_name_snake_case, ruleset_name_snake_case_upper, ruleset_name_pascal_case = self.get_ruleset_name_cases(ruleset_name)
 
-        # New lines to add
-        new_import = f"from .{ruleset_name_snake_case} import {ruleset_name_pascal_case}\n"
-        new_dict_entry = f"    {ruleset_name_pascal_case}.ID: {ruleset_name_pascal_case},\n"
+        # New line to add: rules modules are imported lazily, so no import is needed
+        new_dict_entry = f'    "{ruleset_name_snake_case_upper}": "{ruleset_name_snake_case}.{ruleset_name_pascal_case}",\n'
 
         with open(file_path, 'r') as file:
             lines = file.readlines()
 
-        # Find the line to insert the new import, maintaining alphabetical order
-        import_index = next(i for i, line in enumerate(lines) if line.startswith('from .') and line > new_import)
-        lines.insert(import_index, new_import)
-
         # Find the line to insert the new dictionary entry, maintaining alphabetical order within the BLOCK_RULES
-        dict_start_index = lines.index("BLOCK_RULES = {\n") + 1  # Start after the opening brace
-        dict_end_index = lines.index("}\n", dict_start_index)  # Find the closing brace
+        dict_start_index = lines.index("BLOCK_RULES = RulesRegistry(__name__, {\n") + 1  # Start after the opening brace
+        dict_end_index = lines.index("})\n", dict_start_index)  # Find the closing brace
         dict_entry_index = next((i for i, line in enumerate(lines[dict_start_index:dict_end_index], dict_start_index) if line > new_dict_entry), dict_end_index)
         lines.insert(dict_entry_index, new_dict_entry)
 
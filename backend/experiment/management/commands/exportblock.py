@@ -4,7 +4,12 @@ from os.path import join
 from django.core.management.base import BaseCommand, CommandError
 
 from experiment.models import Block
-from experiment.utils import block_export_json_results
+from experiment.utils import (
+    block_export_incremental,
+    block_export_json_to_file,
+    iter_block_export,
+    iter_block_export_csv,
+)
 
 
 class Command(BaseCommand):
@@ -19,6 +24,20 @@ class Command(BaseCommand):
                             type=str,
                             help="Block slug")
         parser.add_argument('directory', type=str, help="Directory to write to")
+        export_format = parser.add_mutually_exclusive_group()
+        export_format.add_argument('--csv',
+                                   action='store_true',
+                                   help="Export results and profiles as csv (streamed to disk) instead of a zip of json files")
+        export_format.add_argument('--jsonl',
+                                   action='store_true',
+                                   help="Write json lines files (one object per line) to the zip instead of json lists")
+        export_format.add_argument('--incremental',
+                                   action='store_true',
+                                   help="Only export sessions and results created or changed since the previous incremental export, "
+                                   "as json lines files in one directory per day")
+        parser.add_argument('--no-gzip',
+                            action='store_true',
+                            help="Write a plain zip archive, instead of a gzip-compressed one (still named <block_slug>.zip)")
 
     def handle(self, *args, **options):
         block_slug = options['block_slug']
@@ -29,6 +48,22 @@ class Command(BaseCommand):
             raise CommandError(
                 'Block "%s" does not exist with slug' % block_slug)
 
-        zip_file = block_export_json_results(block_slug)
-        with gzip.open(join(directory, f'{block_slug}.zip'), 'w+') as f:
-            f.write(zip_file.getbuffer())
+        if options['incremental']:
+            counts = block_export_incremental(block_slug, directory)
+            self.stdout.write(f"Exported {counts['sessions']} session(s) and {counts['results']} result(s)")
+            return
+
+        if options['csv']:
+            with open(join(directory, f'{block_slug}.csv'), 'w') as f:
+                for lines in iter_block_export_csv(block_slug):
+                    f.write(lines)
+            return
+
+        path = join(directory, f'{block_slug}.zip')
+        if options['no_gzip']:
+            block_export_json_to_file(block_slug, path, jsonl=options['jsonl'])
+            return
+        # the zip archive is gzip-compressed, as existing consumers of this export expect
+        with gzip.open(path, 'wb') as f:
+            for part in iter_block_export(block_slug, 'jsonl' if options['jsonl'] else 'json'):
+                f.write(part)
@@ -1,10 +1,24 @@
 import csv
+import gzip
+import json
+from io import BytesIO, StringIO
 from os.path import join
 from os import remove
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from zipfile import ZipFile
 
 from django.conf import settings
 from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from experiment.models import Block, ExportWatermark
+from experiment.utils import INCREMENTAL_EXPORT_LAG
+from participant.models import Participant
+from result.models import Result
+from session.models import Session
 
 
 class CompilePlaylistTest(TestCase):
@@ -26,3 +40,68 @@ class CompilePlaylistTest(TestCase):
                         self.assertEqual(row['group'], '0')
         finally:
             remove(filename)  # Make sure csv file is deleted even if tests fail
+
+
+class ExportBlockTest(TestCase):
+    fixtures = ["playlist", "experiment"]
+
+    def test_exportblock_csv(self):
+        session = Session.objects.create(
+            block=Block.objects.get(slug='huang_2022'), participant=Participant.objects.create()
+        )
+        Result.objects.create(session=session, question_key='test', given_response='yes')
+        with TemporaryDirectory() as directory:
+            call_command('exportblock', 'huang_2022', directory, csv=True)
+            with open(join(directory, 'huang_2022.csv')) as csv_file:
+                rows = list(csv.DictReader(csv_file))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['given_response'], 'yes')
+
+    def test_exportblock_json(self):
+        with TemporaryDirectory() as directory:
+            call_command('exportblock', 'huang_2022', directory)
+            # by default, the zip archive is gzip-compressed
+            with gzip.open(join(directory, 'huang_2022.zip')) as gzip_file:
+                with ZipFile(BytesIO(gzip_file.read())) as export_zip:
+                    self.assertIn('sessions.json', export_zip.namelist())
+            call_command('exportblock', 'huang_2022', directory, jsonl=True, no_gzip=True)
+            with ZipFile(join(directory, 'huang_2022.zip')) as export_zip:
+                self.assertIn('sessions.jsonl', export_zip.namelist())
+
+    @patch('experiment.utils.INCREMENTAL_EXPORT_LAG', timedelta(0))
+    def test_exportblock_incremental(self):
+        block = Block.objects.get(slug='huang_2022')
+        session = Session.objects.create(block=block, participant=Participant.objects.create())
+        first = Result.objects.create(session=session, question_key='first')
+        with TemporaryDirectory() as directory:
+            call_command('exportblock', 'huang_2022', directory, incremental=True, stdout=StringIO())
+            self.assertTrue(ExportWatermark.objects.filter(block=block).exists())
+            first.given_response = 'yes'
+            first.save()
+            Result.objects.create(session=session, question_key='second')
+            session.finish()
+            call_command('exportblock', 'huang_2022', directory, incremental=True, stdout=StringIO())
+            day_directory = join(directory, 'huang_2022', timezone.localdate().isoformat())
+            with open(join(day_directory, 'results.jsonl')) as results_file:
+                results = [json.loads(line) for line in results_file]
+            with open(join(day_directory, 'sessions.jsonl')) as sessions_file:
+                sessions = [json.loads(line) for line in sessions_file]
+        self.assertEqual([result['fields']['question_key'] for result in results], ['first', 'first', 'second'])
+        # the result is exported again when it is answered
+        self.assertIsNone(results[0]['fields']['given_response'])
+        self.assertEqual(results[1]['fields']['given_response'], 'yes')
+        # the session is exported again when it is finished
+        self.assertEqual(len(sessions), 2)
+        self.assertIsNone(sessions[0]['fields']['finished_at'])
+        self.assertIsNotNone(sessions[1]['fields']['finished_at'])
+
+    def test_exportblock_incremental_lag(self):
+        block = Block.objects.get(slug='huang_2022')
+        session = Session.objects.create(block=block, participant=Participant.objects.create())
+        Result.objects.create(session=session, question_key='first')
+        with TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command('exportblock', 'huang_2022', directory, incremental=True, stdout=out)
+        # rows of the last minutes are left to the next export
+        self.assertIn('Exported 0 session(s) and 0 result(s)', out.getvalue())
+        self.assertLess(block.export_watermark.exported_until, timezone.now() - INCREMENTAL_EXPORT_LAG / 2)
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiment', '0076_experiment_replayable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exported_until', models.DateTimeField()),
+                ('block', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='export_watermark', to='experiment.block')),
+            ],
+        ),
+    ]
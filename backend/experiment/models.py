@@ -198,7 +198,8 @@ class Block(models.Model):
     playlist_count.short_description = "Playlists"
 
     def get_rules(self) -> "experiment.rules.base.Base":
-        """Get instance of rules class to be used for this session
+        """Get instance of rules class to be used for this session.
+        Rules are stateless, so the instance is shared by all blocks with the same rules
 
         Returns:
             Rules
@@ -209,8 +210,7 @@ class Block(models.Model):
         if self.rules not in BLOCK_RULES:
             raise ValueError(f"Rules do not exist (anymore): {self.rules} for block {self.name} ({self.slug})")
 
-        cl = BLOCK_RULES[self.rules]
-        return cl()
+        return BLOCK_RULES.get_instance(self.rules)
 
     def max_score(self) -> int:
         """Get max score from all sessions with a positive score
@@ -281,6 +281,21 @@ class Feedback(models.Model):
     block = models.ForeignKey(Block, on_delete=models.CASCADE)
 
 
+class ExportWatermark(models.Model):
+    """Timestamp up to which the data of a block has been exported by an incremental export
+
+    Attributes:
+        block (Block): Associated block
+        exported_until (datetime): Sessions and results created or changed up to this moment have been exported
+    """
+
+    block = models.OneToOneField(Block, on_delete=models.CASCADE, related_name="export_watermark")
+    exported_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.block} exported until {self.exported_until}"
+
+
 class SocialMediaConfig(models.Model):
     """Social media config for an experiment
 
@@ -1,81 +1,45 @@
-from .anisochrony import Anisochrony
-from .beat_alignment import BeatAlignment
-from .categorization import Categorization
-from .congosamediff import CongoSameDiff
-from .duration_discrimination import DurationDiscrimination
-from .duration_discrimination_tone import DurationDiscriminationTone
-from .eurovision_2020 import Eurovision2020
-from .h_bat import HBat
-from .h_bat_bfit import HBatBFIT
-from .hbat_bst import BST
-from .hooked import Hooked
-from .huang_2022 import Huang2022
-from .kuiper_2020 import Kuiper2020
-from .likert import Likert
-from .matching_pairs import MatchingPairsGame
-from .matching_pairs_2025 import MatchingPairs2025
-from .musical_preferences import MusicalPreferences
-from .questionnaire import Questionnaire
-from .rhythm_battery_final import RhythmBatteryFinal
-from .rhythm_battery_intro import RhythmBatteryIntro
-from .rhythm_discrimination import RhythmDiscrimination
-from .speech2song import Speech2Song
-from .tele_tunes import HookedTeleTunes
-from .thats_my_song import ThatsMySong
-from .toontjehoger_1_mozart import ToontjeHoger1Mozart
-from .toontjehoger_2_preverbal import ToontjeHoger2Preverbal
-from .toontjehoger_3_plink import ToontjeHoger3Plink
-from .toontjehoger_4_absolute import ToontjeHoger4Absolute
-from .toontjehoger_5_tempo import ToontjeHoger5Tempo
-from .toontjehoger_6_relative import ToontjeHoger6Relative
-from .tafc import TwoAlternativeForced
-from .toontjehogerkids_1_mozart import ToontjeHogerKids1Mozart
-from .toontjehogerkids_2_preverbal import ToontjeHogerKids2Preverbal
-from .toontjehogerkids_3_plink import ToontjeHogerKids3Plink
-from .toontjehogerkids_4_absolute import ToontjeHogerKids4Absolute
-from .toontjehogerkids_5_tempo import ToontjeHogerKids5Tempo
-from .toontjehogerkids_6_relative import ToontjeHogerKids6Relative
+from .registry import RulesRegistry
 
 # Rules available to this application
-# If you create new Rules, add them to the list
-# so they can be referred to by the admin
+# If you create new Rules, add their ID and `module.ClassName` to the dictionary
+# so they can be referred to by the admin. Rules modules are only imported when they are used
 
-BLOCK_RULES = {
-    Anisochrony.ID: Anisochrony,
-    BeatAlignment.ID: BeatAlignment,
-    BST.ID: BST,
-    Categorization.ID: Categorization,
-    CongoSameDiff.ID: CongoSameDiff,
-    DurationDiscrimination.ID: DurationDiscrimination,
-    DurationDiscriminationTone.ID: DurationDiscriminationTone,
-    Eurovision2020.ID: Eurovision2020,
-    HBat.ID: HBat,
-    HBatBFIT.ID: HBatBFIT,
-    Hooked.ID: Hooked,
-    HookedTeleTunes.ID: HookedTeleTunes,
-    Huang2022.ID: Huang2022,
-    Kuiper2020.ID: Kuiper2020,
-    Likert.ID: Likert,
-    MatchingPairsGame.ID: MatchingPairsGame,
-    MatchingPairs2025.ID: MatchingPairs2025,
-    MusicalPreferences.ID: MusicalPreferences,
-    Questionnaire.ID: Questionnaire,
-    RhythmBatteryFinal.ID: RhythmBatteryFinal,
-    RhythmBatteryIntro.ID: RhythmBatteryIntro,
-    RhythmDiscrimination.ID: RhythmDiscrimination,
-    TwoAlternativeForced.ID: TwoAlternativeForced,
-    Speech2Song.ID: Speech2Song,
-    ThatsMySong.ID: ThatsMySong,
-    ToontjeHoger1Mozart.ID: ToontjeHoger1Mozart,
-    ToontjeHoger2Preverbal.ID: ToontjeHoger2Preverbal,
-    ToontjeHoger3Plink.ID: ToontjeHoger3Plink,
-    ToontjeHoger4Absolute.ID: ToontjeHoger4Absolute,
-    ToontjeHoger5Tempo.ID: ToontjeHoger5Tempo,
-    ToontjeHoger6Relative.ID: ToontjeHoger6Relative,
-    ToontjeHogerKids1Mozart.ID: ToontjeHogerKids1Mozart,
-    ToontjeHogerKids2Preverbal.ID: ToontjeHogerKids2Preverbal,
-    ToontjeHogerKids3Plink.ID: ToontjeHogerKids3Plink,
-    ToontjeHogerKids4Absolute.ID: ToontjeHogerKids4Absolute,
-    ToontjeHogerKids5Tempo.ID: ToontjeHogerKids5Tempo,
-    ToontjeHogerKids6Relative.ID: ToontjeHogerKids6Relative,
-}
+BLOCK_RULES = RulesRegistry(__name__, {
+    "ANISOCHRONY": "anisochrony.Anisochrony",
+    "BEAT_ALIGNMENT": "beat_alignment.BeatAlignment",
+    "BST": "hbat_bst.BST",
+    "CATEGORIZATION": "categorization.Categorization",
+    "CONGOSAMEDIFF": "congosamediff.CongoSameDiff",
+    "DURATION_DISCRIMINATION": "duration_discrimination.DurationDiscrimination",
+    "DURATION_DISCRIMINATION_TONE": "duration_discrimination_tone.DurationDiscriminationTone",
+    "EUROVISION_2020": "eurovision_2020.Eurovision2020",
+    "H_BAT": "h_bat.HBat",
+    "H_BAT_BFIT": "h_bat_bfit.HBatBFIT",
+    "HOOKED": "hooked.Hooked",
+    "HOOKED_TELETUNES": "tele_tunes.HookedTeleTunes",
+    "HUANG_2022": "huang_2022.Huang2022",
+    "KUIPER_2020": "kuiper_2020.Kuiper2020",
+    "LIKERT_EXPERIMENT": "likert.Likert",
+    "MATCHING_PAIRS": "matching_pairs.MatchingPairsGame",
+    "MATCHING_PAIRS_2025": "matching_pairs_2025.MatchingPairs2025",
+    "MUSICAL_PREFERENCES": "musical_preferences.MusicalPreferences",
+    "QUESTIONNAIRE": "questionnaire.Questionnaire",
+    "RHYTHM_BATTERY_FINAL": "rhythm_battery_final.RhythmBatteryFinal",
+    "RHYTHM_BATTERY_INTRO": "rhythm_battery_intro.RhythmBatteryIntro",
+    "RHYTHM_DISCRIMINATION": "rhythm_discrimination.RhythmDiscrimination",
+    "TWO_ALTERNATIVE_FORCED": "tafc.TwoAlternativeForced",
+    "SPEECH_TO_SONG": "speech2song.Speech2Song",
+    "THATS_MY_SONG": "thats_my_song.ThatsMySong",
+    "TOONTJE_HOGER_1_MOZART": "toontjehoger_1_mozart.ToontjeHoger1Mozart",
+    "TOONTJE_HOGER_2_PREVERBAL": "toontjehoger_2_preverbal.ToontjeHoger2Preverbal",
+    "TOONTJE_HOGER_3_PLINK": "toontjehoger_3_plink.ToontjeHoger3Plink",
+    "TOONTJE_HOGER_4_ABSOLUTE": "toontjehoger_4_absolute.ToontjeHoger4Absolute",
+    "TOONTJE_HOGER_5_TEMPO": "toontjehoger_5_tempo.ToontjeHoger5Tempo",
+    "TOONTJE_HOGER_6_RELATIVE": "toontjehoger_6_relative.ToontjeHoger6Relative",
+    "TOONTJE_HOGER_KIDS_1_MOZART": "toontjehogerkids_1_mozart.ToontjeHogerKids1Mozart",
+    "TOONTJE_HOGER_KIDS_2_PREVERBAL": "toontjehogerkids_2_preverbal.ToontjeHogerKids2Preverbal",
+    "TOONTJE_HOGER_KIDS_3_PLINK": "toontjehogerkids_3_plink.ToontjeHogerKids3Plink",
+    "TOONTJE_HOGER_KIDS_4_ABSOLUTE": "toontjehogerkids_4_absolute.ToontjeHogerKids4Absolute",
+    "TOONTJE_HOGER_KIDS_5_TEMPO": "toontjehogerkids_5_tempo.ToontjeHogerKids5Tempo",
+    "TOONTJE_HOGER_KIDS_6_RELATIVE": "toontjehogerkids_6_relative.ToontjeHogerKids6Relative",
+})
@@ -1,8 +1,10 @@
 import logging
+from datetime import datetime, timedelta
 from typing import Optional, Union
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 
@@ -10,10 +12,9 @@ from experiment.actions.types import FeedbackInfo
 from experiment.actions.final import Final
 from experiment.actions.form import Form
 from experiment.actions.trial import Trial
-from question.utils import get_unanswered_questions
+from question.utils import plan_profile_questions
 from result.models import Result
 from result.score import SCORING_RULES
-from result.utils import prepare_profile_result
 from section.models import Playlist
 from session.models import Session
 
@@ -25,6 +26,8 @@ class BaseRules(object):
 
     contact_email = settings.CONTACT_MAIL
     counted_result_keys = []
+    # unfinished sessions which started longer ago are closed by the `closestalesessions` command, `None` keeps them open
+    session_timeout: Optional[timedelta] = None
 
     def feedback_info(self) -> FeedbackInfo:
         """
@@ -74,34 +77,19 @@ class BaseRules(object):
             list of `Trial` actions with unanswered questions
         """
         trials = []
-        question_lists = session.block.questionlist_set.all()
-        if n_questions is None:
-            n_questions = sum(ql.questions.count() for ql in question_lists)
-        for ql in question_lists:
-            questions = (
-                ql.questions.order_by("?") if ql.randomize else ql.get_questions()
+        for question_obj, profile_result in plan_profile_questions(
+            session.participant, session.block, n_questions
+        ):
+            question = question_obj.convert_to_action()
+            question.result_id = profile_result.id
+            feedback_form = (
+                Form([question], skip_button=None)
+                if question_obj.is_skippable
+                else Form([question])
             )
-            question_iterator = get_unanswered_questions(
-                session.participant, questions.all()
+            trials.append(
+                Trial(title=_("Questionnaire"), feedback_form=feedback_form),
             )
-            while len(trials) < n_questions:
-                try:
-                    question_obj = next(question_iterator)
-                    profile_result = prepare_profile_result(
-                        question_obj.key, session.participant
-                    )
-                    question = question_obj.convert_to_action()
-                    question.result_id = profile_result.id
-                    feedback_form = (
-                        Form([question], skip_button=None)
-                        if question_obj.is_skippable
-                        else Form([question])
-                    )
-                    trials.append(
-                        Trial(title=_("Questionnaire"), feedback_form=feedback_form),
-                    )
-                except StopIteration:
-                    break
         if len(trials) > 1:
             for index, trial in enumerate(trials):
                 trial.title = _("Questionnaire %(index)i / %(total)i") % {
@@ -141,6 +129,29 @@ class BaseRules(object):
         """
         return 0
 
+    def get_stale_sessions(self, block, started_before: datetime) -> QuerySet:
+        """Get the unfinished sessions of a block which started before a moment.
+        Override this if closed sessions stay unfinished, to leave them out
+
+        Args:
+            block: the block of the sessions
+            started_before: sessions which started before this moment are stale
+
+        Returns:
+            queryset of stale sessions
+        """
+        return block.sessions.filter(finished_at=None, started_at__lt=started_before)
+
+    def close_stale_sessions(self, sessions: list[Session]):
+        """Close a batch of stale sessions, found by `get_stale_sessions`. Called by the `closestalesessions` command,
+        in a transaction which holds a lock on the sessions, so they can be saved in bulk.
+        Override this in rules which set a `session_timeout`, e.g. to release the group of a session
+
+        Args:
+            sessions: the stale sessions of one block
+        """
+        pass
+
     def final_score_message(self, session: Session) -> str:
         """Create final score message for given session, base on score per result
         Override this to display different text on the final screen.
@@ -198,8 +209,10 @@ class BaseRules(object):
             {"rank": ranks["PLATINUM"], "min_percentile": 90.0},  # ~ stanine 8
             {"rank": ranks["DIAMOND"], "min_percentile": 95.0},  # ~ stanine 9
         ]
-        filter_condition = {"finished_at__isnull": False} if exclude_unfinished else {}
-        percentile = session.percentile_rank(filter_condition)
+        if exclude_unfinished:
+            percentile = session.finished_percentile_rank()
+        else:
+            percentile = session.percentile_rank({})
 
         # Check the buckets in reverse order
         # If the percentile rank is higher than the min_percentile
@@ -226,9 +239,7 @@ class BaseRules(object):
             errors.append("The block must have a playlist.")
             return errors
 
-        sections = playlist.section_set.all()
-
-        if not sections:
+        if not playlist.profile.section_count:
             errors.append("The block must have at least one section.")
 
         try:
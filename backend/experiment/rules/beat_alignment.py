@@ -178,16 +178,15 @@ class BeatAlignment(BaseRules):
     def validate_playlist(self, playlist: Playlist):
         errors = []
         errors += super().validate_playlist(playlist)
-        sections = playlist.section_set.all()
-        n_examples = sections.filter(song__name__startswith="ex").count()
+        profile = playlist.profile
+        n_examples = profile.count_song_name_prefix("ex")
         if n_examples != 3:
             errors.append(
                 "There should be three example files, with associated song objects whose names start with `ex`"
             )
-        trial_stimuli = sections.exclude(song__name__startswith="ex")
-        if trial_stimuli.count() != 17:
+        if profile.section_count - n_examples != 17:
             errors.append("There should be 17 files to be played during the experiment")
-        song_names = trial_stimuli.values_list("song__name", flat=True)
+        song_names = [name for name in profile.song_names if not (name and name.startswith("ex"))]
         try:
             groups, tags = zip(*[s.split("_") for s in song_names])
             try:
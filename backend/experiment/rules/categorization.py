@@ -1,8 +1,10 @@
 import random
+from collections import Counter
+from datetime import timedelta
 
-from django.utils import timezone
 from django.template.loader import render_to_string
 from django.db.models import Avg
+from django.utils import timezone
 
 from experiment.actions.button import Button
 from experiment.actions.form import Form
@@ -12,16 +14,22 @@ from experiment.actions.question import ButtonArrayQuestion
 from experiment.actions.score import Score
 from experiment.actions.trial import Trial
 from experiment.actions.wrappers import TwoAlternativeForced
-from session.models import Session
+from result.models import Result
+from session.models import GroupCounter, Session
 
 from .base import BaseRules
 
 SCORE_AVG_MIN_TRAINING = 0.8
+GROUPS = ["S1", "S2", "C1", "C2"]
+# sessions in these phases no longer hold their group
+RELEASED_PHASES = ["ABORTED", "FAILED_TRAINING", "CLOSED_BROWSER"]
 
 
 class Categorization(BaseRules):
     ID = "CATEGORIZATION"
     default_consent_file = "consent/consent_categorization.html"
+    # sessions left unfinished for a day, e.g. by closing the browser, release their group
+    session_timeout = timedelta(hours=24)
 
     def __init__(self):
         self.question_lists = [
@@ -70,6 +78,7 @@ class Categorization(BaseRules):
                 # Delete results and json from session and exit
                 if profile.given_response == "aborted":
                     session.result_set.all().delete()
+                    self.release_group(session)
                     json_data = {"phase": "ABORTED", "training_rounds": json_data["training_rounds"]}
                     session.save_json_data(json_data)
                     session.finish()
@@ -129,6 +138,7 @@ class Categorization(BaseRules):
                 # Failed the training? exit experiment
                 if json_data["training_rounds"] == 40:
                     # Clear group from session for reuse
+                    self.release_group(session)
                     end_data = {
                         "phase": "FAILED_TRAINING",
                     }
@@ -219,45 +229,10 @@ class Categorization(BaseRules):
         BLUE / ORANGE = Correct response for Pair 1A, Pair 2A
         """
 
-        # Check for unfinished sessions older then 24 hours caused by closed browser
-        all_sessions = (
-            session.block.sessions.filter(finished_at=None)
-            .filter(started_at__lte=timezone.now() - timezone.timedelta(hours=24))
-            .exclude(json_data__contains="ABORTED")
-            .exclude(json_data__contains="FAILED_TRAINING")
-            .exclude(json_data__contains="CLOSED_BROWSER")
+        # Assign the group with the fewest sessions, the first assignment counts the sessions assigned before
+        group = GroupCounter.objects.assign(
+            session.block_id, GROUPS, initial_counts=lambda: self.count_groups(session.block)
         )
-        for closed_session in all_sessions:
-            # Release the group for assignment to a new participant
-            closed_json_data = {"phase": "CLOSED_BROWSER"}
-            # Delete results
-            closed_session.save_json_data(closed_json_data)
-            closed_session.result_set.all().delete()
-            closed_session.save()
-
-        # Count sessions per assigned group
-        used_groups = [
-            session.block.sessions.filter(json_data__contains="S1").count(),
-            session.block.sessions.filter(json_data__contains="S2").count(),
-            session.block.sessions.filter(json_data__contains="C1").count(),
-            session.block.sessions.filter(json_data__contains="C2").count(),
-        ]
-
-        # Check wether a group falls behind in the count
-        if max(used_groups) - min(used_groups) > 1:
-            # assign the group that falls behind
-            group_index = used_groups.index(min(used_groups))
-            if group_index == 0:
-                group = "S1"
-            elif group_index == 1:
-                group = "S2"
-            elif group_index == 2:
-                group = "C1"
-            elif group_index == 3:
-                group = "C2"
-        else:
-            # Assign a random group
-            group = random.choice(["S1", "S2", "C1", "C2"])
         # Assign a random correct response color for 1A, 2A
         # Set expected resonse accordingly
         colors = ['colorNeutral1', 'colorNeutral2']
@@ -288,6 +263,38 @@ class Categorization(BaseRules):
 
         return json_data
 
+    def count_groups(self, block) -> dict[str, int]:
+        """Count sessions per assigned group, leaving out the sessions which released their group"""
+        assigned_sessions = block.sessions.all()
+        for phase in RELEASED_PHASES:
+            assigned_sessions = assigned_sessions.exclude(json_data__contains={"phase": phase})
+        return {group: assigned_sessions.filter(json_data__contains={"group": group}).count() for group in GROUPS}
+
+    def release_group(self, session):
+        """Make the group of a session available for assignment to a new participant"""
+        group = session.json_data.get("group")
+        if group:
+            GroupCounter.objects.release(session.block_id, group)
+
+    def get_stale_sessions(self, block, started_before):
+        sessions = super().get_stale_sessions(block, started_before)
+        for phase in RELEASED_PHASES:
+            sessions = sessions.exclude(json_data__contains={"phase": phase})
+        return sessions
+
+    def close_stale_sessions(self, sessions):
+        """Sessions left unfinished, e.g. by closing the browser, release their group and lose their results"""
+        released = Counter(session.json_data.get("group") for session in sessions)
+        now = timezone.now()
+        for session in sessions:
+            session.json_data["phase"] = "CLOSED_BROWSER"
+            session.updated_at = now
+        Session.objects.bulk_update(sessions, ["json_data", "updated_at"])
+        Result.objects.filter(session__in=sessions).delete()
+        for group, count in released.items():
+            if group:
+                GroupCounter.objects.release(sessions[0].block_id, group, count)
+
     def plan_phase(self, session):
         json_data = session.json_data
         if "training" in json_data["phase"]:
@@ -1,9 +1,10 @@
 import itertools
+import math
 import re
 
 from django.utils.translation import gettext_lazy as _
 from section.models import Playlist, Section
-from session.models import Session
+from session.models import SequenceCounter, Session
 from experiment.actions.explainer import Explainer
 from experiment.actions.final import Final
 from experiment.actions.form import Form
@@ -44,11 +45,11 @@ class CongoSameDiff(BaseRules):
             groups = real_trial_variants.values_list('group', flat=True).order_by().distinct()
             variants = real_trial_variants.values_list('tag', flat=True).order_by().distinct()
 
-            # get the participant's group variant based on the participant's id # else default to random number between 1 and variants_amount
-            participant_id = session.participant.id
-            group = groups[participant_id % len(groups)]
+            # get the participant's group variant based on the session's balanced assignment
+            assignment = self.get_assignment(session, len(groups), len(variants))
+            group = groups[assignment % len(groups)]
             variant_tag = self.get_participant_group_variant(
-                participant_id,
+                assignment,
                 round_number,
                 groups,
                 variants
@@ -66,7 +67,6 @@ class CongoSameDiff(BaseRules):
         else:
             # practice is not done yet;
             # load the practice trials, count all results
-            self.counted_result_keys = []
             round_number = session.get_rounds_passed(apply_results_filter=False)
             practice_trials_subset = session.playlist.section_set.filter(
                 tag__contains='practice'
@@ -198,45 +198,64 @@ class CongoSameDiff(BaseRules):
         errors += super().validate_playlist(playlist)  # Call the base class validate_playlist to perform common checks
 
         # All sections need to have a group value
-        sections = playlist.section_set.all()
-        for section in sections:
-            file_name = section.song.name if section.song else 'No name'
+        profile = playlist.profile
+        for row in profile.rows:
+            file_name = row['name'] if row['name'] is not None else 'No name'
             # every section.group should consist of a number
             regex_pattern = r'^\d+$'
-            if not section.group or not re.search(regex_pattern, section.group):
+            if not row['group'] or not re.search(regex_pattern, row['group']):
                 errors.append(f'Section {file_name} should have a group value containing only digits')
             # the section song name should not be empty
-            if not section.song.name:
+            if not row['name']:
                 errors.append(f'Section {file_name} should have a name that will be used for the result key')
 
         # It also needs at least one section with the tag 'practice'
-        if not sections.filter(tag__contains='practice').exists():
+        if not any('practice' in tag for tag in profile.tags):
             errors.append('At least one section should have the tag "practice"')
 
         # It should also contain at least one section without the tag 'practice'
-        if not sections.exclude(tag__contains='practice').exists():
+        if all('practice' in tag for tag in profile.tags):
             errors.append('At least one section should not have the tag "practice"')
 
         # Every non-practice group should have the same number of variants
         # that should be labeled with a single uppercase letter
-        groups = sections.values('group').distinct()
-        variants = sections.exclude(tag__contains='practice').values('tag')
-        unique_variants = set([variant['tag'] for variant in variants])
+        unique_variants = sorted(tag for tag in profile.tags if 'practice' not in tag)
         variants_count = len(unique_variants)
-        for group in groups:
-            group_variants = sections.filter(group=group['group']).exclude(tag__contains='practice').values('tag').distinct()
+        for group in sorted(profile.groups):
+            group_variants = profile.tags_of_group(group, exclude='practice')
 
             for variant in group_variants:
-                if not re.search(r'^[A-Z]$', variant['tag']):
-                    errors.append(f'Group {group["group"]} should have variants with a single uppercase letter (A-Z), but has {variant["tag"]}')
+                if not re.search(r'^[A-Z]$', variant):
+                    errors.append(f'Group {group} should have variants with a single uppercase letter (A-Z), but has {variant}')
 
-            if group_variants.count() != variants_count:
-                group_variants_stringified = ', '.join([variant['tag'] for variant in group_variants])
+            if len(group_variants) != variants_count:
+                group_variants_stringified = ', '.join(group_variants)
                 total_variants_stringified = ', '.join(unique_variants)
-                errors.append(f'Group {group["group"]} should have the same number of variants as the total amount of variants ({variants_count}; {total_variants_stringified}) but has {group_variants.count()} ({group_variants_stringified})')
+                errors.append(f'Group {group} should have the same number of variants as the total amount of variants ({variants_count}; {total_variants_stringified}) but has {len(group_variants)} ({group_variants_stringified})')
 
         return errors
 
+    def get_assignment(self, session: Session, groups_count: int, variants_count: int) -> int:
+        """Assign a combination of group and variant order to the participant once per block, balanced over the
+        participants of the block. The assignment takes the place of the participant id in `get_participant_group_variant`"""
+        assignment = session.json_data.get('assignment')
+        if assignment is not None:
+            return assignment
+        # a participant keeps the assignment of their earlier sessions in the block
+        assignment = (
+            Session.objects.filter(
+                block_id=session.block_id, participant_id=session.participant_id, json_data__has_key='assignment'
+            )
+            .values_list('json_data__assignment', flat=True)
+            .first()
+        )
+        if assignment is None:
+            # consecutive participants take consecutive combinations, which cycle through all groups and variant orders
+            combinations = math.lcm(groups_count, math.factorial(variants_count))
+            assignment = SequenceCounter.objects.next_value(session.block_id, 'assignment') % combinations
+        session.save_json_data({'assignment': assignment})
+        return assignment
+
     def get_participant_group_variant(self, participant_id: int, round_number: int, groups: list[int], variants: list[int]) -> tuple[int, str]:
         ''' A participant is part of a group (1, 2, ...)'''
         ''' They will be presented with variants (A, B, C, D), registered as tags'''
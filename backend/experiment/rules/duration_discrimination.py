@@ -334,11 +334,11 @@ class DurationDiscrimination(BaseRules, PracticeMixin):
     def validate_playlist(self, playlist: Playlist):
         errors = []
         errors += super().validate_playlist(playlist)
-        sections = playlist.section_set.all()
-        if sections.count() is not self.section_count:
+        profile = playlist.profile
+        if profile.section_count != self.section_count:
             errors.append("The playlist should contain 247 sections")
         try:
-            numerical_song_names = [int(section.song_name()) for section in sections]
+            numerical_song_names = [int(name or "") for name in profile.song_names]
             if self.start_diff not in numerical_song_names:
                 errors.append(
                     f"The file for the starting difference of {self.start_diff} is missing"
@@ -207,10 +207,10 @@ class HBat(BaseRules, PracticeMixin):
     def validate_playlist(self, playlist: Playlist):
         errors = []
         errors += super().validate_playlist(playlist)
-        sections = playlist.section_set.all()
-        if sections.count() != 32:
+        profile = playlist.profile
+        if profile.section_count != 32:
             errors.append("This block should have a playlist with 32 sections")
-        groups, tags = zip(*[(s.group, s.tag) for s in sections])
+        groups, tags = profile.groups, profile.tags
         try:
             group_numbers = sorted(list(set([int(g) for g in groups])))
             if group_numbers != [*range(1, 17)]:
@@ -14,7 +14,7 @@ from experiment.actions.redirect import Redirect
 from experiment.actions.trial import Trial
 from experiment.actions.wrappers import boolean_question
 from experiment.serializers import get_theme_config
-from question.models import ChoiceList
+from question.choices import get_choices
 from result.utils import prepare_result
 from result.models import Result
 from section.models import Section
@@ -246,7 +246,7 @@ class MusicalPreferences(BaseRules):
         likert = TextRangeQuestion(
             text=_("2. How much do you like this song?"),
             key=like_key,
-            choices=ChoiceList.objects.get(pk='LIKERT_ICONS_7').to_dict(),
+            choices=get_choices('LIKERT_ICONS_7'),
             result_id=prepare_result(
                 like_key, session, section=section, scoring_rule="LIKERT"
             ),
@@ -0,0 +1,63 @@
+from collections.abc import Iterator, Mapping
+
+from django.utils.module_loading import import_string
+
+
+class RulesRegistry(Mapping):
+    """Rules classes by their ID, imported lazily
+
+    A rules module, with the actions and questions it depends on, is only imported when its rules are requested
+    for the first time, so starting a worker does not import all of them.
+
+    Args:
+        package: the package containing the rules modules
+        paths: the `module.ClassName` of the rules class, relative to `package`, by rules ID
+    """
+
+    def __init__(self, package: str, paths: dict[str, str]):
+        self.package = package
+        self.paths = paths
+        self._classes = {}
+        self._instances = {}
+
+    def __getitem__(self, rules_id: str) -> type:
+        try:
+            return self._classes[rules_id]
+        except KeyError:
+            pass
+        rules_class = import_string(f"{self.package}.{self.paths[rules_id]}")
+        self._classes[rules_id] = rules_class
+        return rules_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, rules_id: object) -> bool:
+        return rules_id in self.paths
+
+    def class_name(self, rules_id: str) -> str:
+        """
+        Returns:
+            the name of the rules class, without importing it
+        """
+        return self.paths[rules_id].rsplit(".", 1)[-1]
+
+    def get_instance(self, rules_id: str):
+        """Rules do not keep state between calls, so one instance per rules ID is shared within a process
+
+        Returns:
+            the shared instance of the rules
+
+        Raises:
+            KeyError: if no rules with this ID are registered
+        """
+        try:
+            return self._instances[rules_id]
+        except KeyError:
+            pass
+        rules = self[rules_id]()
+        self._instances[rules_id] = rules
+        return rules
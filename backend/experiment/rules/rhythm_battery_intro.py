@@ -8,7 +8,7 @@ from experiment.actions.form import Form
 from experiment.actions.playback import Autoplay, PlaybackSection
 from experiment.actions.question import ButtonArrayQuestion
 from experiment.actions.trial import Trial
-from question.models import ChoiceList
+from question.choices import get_choices
 from result.utils import prepare_result
 from session.models import Session
 
@@ -89,7 +89,7 @@ class RhythmBatteryIntro(BaseRules):
                     ButtonArrayQuestion(
                         key=key,
                         text=_("Are you wearing headphones?"),
-                        choices=ChoiceList.objects.get(pk="BOOLEAN").to_dict(),
+                        choices=get_choices("BOOLEAN"),
                         result_id=result_pk,
                     )
                 ],
@@ -300,12 +300,12 @@ class RhythmDiscrimination(BaseRules, PracticeMixin):
     def validate_playlist(self, playlist: Playlist):
         errors = []
         errors += super().validate_playlist(playlist)
-        sections = playlist.section_set.all()
-        if not sections.count():
+        profile = playlist.profile
+        if not profile.section_count:
             return errors
-        if sections.count() != 720:
+        if profile.section_count != 720:
             errors.append("The block needs a playlist with 720 sections")
-        tags, groups = zip(*[(s.tag, s.group) for s in sections])
+        tags, groups = profile.tags, profile.groups
         try:
             tag_numbers = sorted(list(set([int(t) for t in tags])))
             if tag_numbers != [150, 160, 170, 180, 190, 200]:
@@ -324,19 +324,19 @@ class RhythmDiscrimination(BaseRules, PracticeMixin):
 
         metric_standard = STIMULI["metric"]["standard"]
         for m in metric_standard:
-            if sections.filter(song__name__startswith=m).count() != 12:
+            if profile.count_song_name_prefix(m) != 12:
                 errors.append(pattern_error(m))
         metric_deviant = STIMULI["metric"]["deviant"]
         for m in metric_deviant:
-            if sections.filter(song__name__startswith=m).count() != 12:
+            if profile.count_song_name_prefix(m) != 12:
                 errors.append(pattern_error(m))
         nonmetric_standard = STIMULI["nonmetric"]["standard"]
         for n in nonmetric_standard:
-            if sections.filter(song__name__startswith=n).count() != 12:
+            if profile.count_song_name_prefix(n) != 12:
                 errors.append(pattern_error(n))
         nonmetric_deviant = STIMULI["nonmetric"]["deviant"]
         for n in nonmetric_deviant:
-            if sections.filter(song__name__startswith=n).count() != 12:
+            if profile.count_song_name_prefix(n) != 12:
                 errors.append(pattern_error(n))
 
         return errors
@@ -140,3 +140,15 @@ class CategorizationRuleTest(TestCase):
         self.assertEqual(self.session.json_data.get('phase'), 'training-1A')
         self.assertEqual(self.session.json_data.get('training_rounds'), '0')
         self.assertEqual(self.session.json_data.get('phase'), 'training-1A')
+
+    def test_plan_experiment_balances_groups(self):
+        # S1 falls behind: the sessions which released their group do not count
+        for group in ['S2', 'C1', 'C2']:
+            for _ in range(2):
+                Session.objects.create(block=self.block, participant=self.participant, json_data={'group': group})
+        for phase in ['ABORTED', 'FAILED_TRAINING', 'CLOSED_BROWSER']:
+            Session.objects.create(
+                block=self.block, participant=self.participant, json_data={'group': 'S1', 'phase': phase}
+            )
+        json_data = self.rules.plan_experiment(self.session)
+        self.assertEqual(json_data['group'], 'S1')
@@ -6,7 +6,7 @@ from experiment.models import Block, Experiment, Phase
 from participant.models import Participant
 from result.models import Result
 from section.models import Playlist, Section, Song
-from session.models import Session
+from session.models import GroupCounter, SequenceCounter, Session
 from experiment.actions.explainer import Explainer
 from experiment.actions.final import Final
 from experiment.actions.trial import Trial
@@ -106,6 +106,30 @@ class CongoSameDiffTest(TestCase):
         )
         self.assertIn('NORMAL', non_practice_action.feedback_form.form[0].key)
 
+    def test_assignment_is_balanced(self):
+        congo_same_diff = CongoSameDiff()
+        # a real group named like the sequence does not interfere with it
+        GroupCounter.objects.create(block=self.block, group='assignment', count=5)
+        # 2 groups and 4 variants give 24 combinations of group and variant order
+        assignments = [
+            congo_same_diff.get_assignment(
+                Session.objects.create(block=self.block, participant=Participant.objects.create()), 2, 4
+            )
+            for _ in range(24)
+        ]
+        self.assertEqual(sorted(assignments), list(range(24)))
+        self.assertEqual(SequenceCounter.objects.get(block=self.block, name='assignment').value, 24)
+        self.assertEqual(GroupCounter.objects.get(block=self.block, group='assignment').count, 5)
+        # the sequence starts over
+        session = Session.objects.create(block=self.block, participant=Participant.objects.create())
+        self.assertEqual(congo_same_diff.get_assignment(session, 2, 4), 0)
+        # a session keeps its assignment, and so does a participant in their next session
+        assignment = congo_same_diff.get_assignment(self.session, 2, 4)
+        self.assertEqual(congo_same_diff.get_assignment(self.session, 2, 4), assignment)
+        next_session = Session.objects.create(block=self.block, participant=self.participant)
+        self.assertEqual(congo_same_diff.get_assignment(next_session, 2, 4), assignment)
+        self.assertEqual(SequenceCounter.objects.get(block=self.block, name='assignment').value, 26)
+
     def test_get_next_trial(self):
         congo_same_diff = CongoSameDiff()
         subset = self.session.playlist.section_set.exclude(tag__contains='practice')
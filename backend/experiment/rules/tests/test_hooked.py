@@ -13,6 +13,7 @@ from experiment.models import (
     Phase,
     SocialMediaConfig,
 )
+from experiment.rules import BLOCK_RULES
 from participant.models import Participant
 from question.banks import get_question_bank
 from result.models import Result
@@ -157,7 +158,8 @@ class HookedTest(TestCase):
         block = Block.objects.create(slug="Test-Eurovision", rules="EUROVISION_2020", rounds=n_rounds)
 
         session = Session.objects.create(block=block, participant=self.participant, playlist=self.playlist)
-        rules = session.block_rules()
+        # a new instance: the one returned by `block_rules` is shared
+        rules = BLOCK_RULES[block.rules]()
         rules.question_offset = 3
         mock_session_type = Mock(return_value=session_type)
         rules.get_session_type = mock_session_type
@@ -237,7 +239,8 @@ class HookedTest(TestCase):
         )
         playlist._update_sections()
         session = Session.objects.create(block=block, participant=self.participant, playlist=playlist)
-        rules = session.block_rules()
+        # a new instance: the one returned by `block_rules` is shared
+        rules = BLOCK_RULES[block.rules]()
         rules.question_offset = 3
         mock_session_type = Mock(return_value=session_type)
         rules.get_session_type = mock_session_type
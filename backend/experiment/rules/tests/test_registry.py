@@ -0,0 +1,24 @@
+from django.test import TestCase
+
+from experiment.models import Block
+from experiment.rules import BLOCK_RULES
+
+
+class RulesRegistryTest(TestCase):
+
+    def test_registered_rules(self):
+        for rules_id in BLOCK_RULES:
+            rules_class = BLOCK_RULES[rules_id]
+            self.assertEqual(rules_class.ID, rules_id)
+            self.assertEqual(BLOCK_RULES.class_name(rules_id), rules_class.__name__)
+        with self.assertRaises(KeyError):
+            BLOCK_RULES['NON_EXISTING_RULES']
+
+    def test_shared_instance(self):
+        block = Block.objects.create(rules='H_BAT', slug='hbat')
+        other_block = Block.objects.create(rules='H_BAT', slug='other_hbat')
+        rules = block.get_rules()
+        self.assertIs(rules, other_block.get_rules())
+        self.assertIs(rules, BLOCK_RULES.get_instance('H_BAT'))
+        self.assertIsInstance(rules, BLOCK_RULES['H_BAT'])
+        self.assertIsNot(rules, Block.objects.create(rules='BST', slug='bst').get_rules())
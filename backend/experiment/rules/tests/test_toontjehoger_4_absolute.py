@@ -13,12 +13,12 @@ from experiment.rules.toontjehoger_4_absolute import ToontjeHoger4Absolute
 class TestToontjeHoger4Absolute(TestCase):
 
     def setUp(self):
-        # Mock the file_exists_validator function from section.models
+        # Mock the find_missing_files function from section.models
         # instead of section.validators as it is imported in the Playlist class
         # which is in the section.models module
-        patcher = patch('section.models.file_exists_validator')
-        self.mock_file_exists_validator = patcher.start()
-        self.mock_file_exists_validator.return_value = None
+        patcher = patch('section.models.find_missing_files')
+        self.mock_find_missing_files = patcher.start()
+        self.mock_find_missing_files.return_value = []
         self.addCleanup(patcher.stop)
 
     def test_initializes_correctly(self):
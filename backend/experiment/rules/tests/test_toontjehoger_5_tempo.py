@@ -12,12 +12,12 @@ from session.models import Session
 class TestToontjeHoger5Tempo(TestCase):
 
     def setUp(self):
-        # Mock the file_exists_validator function from section.models
+        # Mock the find_missing_files function from section.models
         # instead of section.validators as it is imported in the Playlist class
         # which is in the section.models module
-        patcher = patch('section.models.file_exists_validator')
-        self.mock_file_exists_validator = patcher.start()
-        self.mock_file_exists_validator.return_value = None
+        patcher = patch('section.models.find_missing_files')
+        self.mock_find_missing_files = patcher.start()
+        self.mock_find_missing_files.return_value = []
         self.addCleanup(patcher.stop)
 
     def test_validate_playlist_valid(self):
@@ -139,12 +139,12 @@ class ToontjeHogerKids5TempoTest(TestCase):
         cls.playlist._update_sections()
 
     def setUp(self):
-        # Mock the file_exists_validator function from section.models
+        # Mock the find_missing_files function from section.models
         # instead of section.validators as it is imported in the Playlist class
         # which is in the section.models module
-        patcher = patch('section.models.file_exists_validator')
-        self.mock_file_exists_validator = patcher.start()
-        self.mock_file_exists_validator.return_value = None
+        patcher = patch('section.models.find_missing_files')
+        self.mock_find_missing_files = patcher.start()
+        self.mock_find_missing_files.return_value = []
         self.addCleanup(patcher.stop)
 
     # Toontje Hoger Kids 5 Tempo does not have the strict tag validation
@@ -246,11 +246,11 @@ class ToontjeHoger1Mozart(BaseRules):
         errors += super().validate_playlist(playlist)
 
         # Check if playlist has 2 sections
-        if playlist.section_set.count() != 2:
+        if playlist.profile.section_count != 2:
             errors.append("The playlist should have 2 sections")
 
         # Check if sections have different groups
-        groups = [section.group for section in playlist.section_set.all()]
+        groups = list(playlist.profile.groups.elements())
         if len(set(groups)) != 2:
             errors.append("The sections should have different groups")
 
@@ -40,25 +40,23 @@ class ToontjeHoger2Preverbal(BaseRules):
         AML,Walvis,0.0,1.0,/toontjehoger/preverbal/2_walvis.mp3,b,1
         ```
         '''
-        sections = playlist.section_set.all()
+        profile = playlist.profile
         errors = []
-        if len(sections) != 5:
+        if profile.section_count != 5:
             errors.append('The playlist should contain exactly 5 sections')
 
-        first_round_sections = sections.filter(group='1')
-        if first_round_sections.count() != 3:
+        if profile.groups['1'] != 3:
             errors.append(
                 'There should be 3 sections with group 1 (first round)')
-        if sorted(first_round_sections.values_list('tag', flat=True).distinct()) != ['a', 'b', 'c']:
+        if profile.tags_of_group('1') != ['a', 'b', 'c']:
             errors.append(
                 'The first round sections should have tags a, b, c'
             )
 
-        second_round_sections = sections.filter(group='2')
-        if second_round_sections.count() != 2:
+        if profile.groups['2'] != 2:
             errors.append(
                 'There should be 2 sections with group 2 (second round)')
-        if sorted(second_round_sections.values_list('tag', flat=True).distinct()) != ['a', 'b']:
+        if profile.tags_of_group('2') != ['a', 'b']:
             errors.append(
                 'The second round sections should have tags a, b'
             )
@@ -18,6 +18,7 @@ from experiment.actions.utils import get_experiment_url
 from experiment.utils import non_breaking_spaces
 from result.utils import prepare_result
 from section.models import Playlist, Section
+from section.profile import PlaylistProfile
 from session.models import Session
 from .base import BaseRules
 
@@ -43,21 +44,20 @@ class ToontjeHoger3Plink(BaseRules):
         ```
         """
         errors = []
-        sections = playlist.section_set.all()
-        if not [s.song for s in sections]:
+        profile = playlist.profile
+        if not profile.section_count:
             errors.append("Sections should have associated song objects.")
-        artist_titles = sections.values_list("song__name", "song__artist").distinct()
-        if len(artist_titles) != len(sections):
+        if len(profile.songs) != profile.section_count:
             errors.append("Sections should have unique combinations of song.artist and song.name fields.")
-        errors += self.validate_era_and_mood(sections)
+        errors += self.validate_era_and_mood(profile)
         return errors
 
-    def validate_era_and_mood(self, sections):
+    def validate_era_and_mood(self, profile: PlaylistProfile):
         errors = []
-        eras = sorted(sections.order_by("tag").values_list("tag", flat=True).distinct())
+        eras = sorted(profile.tags)
         if not all(re.match(r"[0-9]0s", e) for e in eras):
             errors.append("The sections should be tagged with an era in the format [0-9]0s, e.g., 90s")
-        moods = sorted(sections.order_by("group").values_list("group", flat=True).distinct())
+        moods = sorted(profile.groups)
         if "droevig" not in moods:
             errors.append("The sections' groups should be indications of the songs' moods in Dutch")
         return errors
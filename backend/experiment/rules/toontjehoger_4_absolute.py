@@ -197,7 +197,7 @@ class ToontjeHoger4Absolute(BaseRules):
         return [*score, final, info]
 
     def validate_playlist_groups(self, groups):
-        group_count = groups.count()
+        group_count = len(groups)
         if group_count < self.N_ROUNDS:
             return [
                 f"There should be at least {self.N_ROUNDS} distinct groups in the playlist. This playlist has only {group_count} groups"
@@ -211,19 +211,14 @@ class ToontjeHoger4Absolute(BaseRules):
         errors = super().validate_playlist(playlist)
 
         # Get group values from sections, ordered by group
-        groups = playlist.section_set.values_list('group', flat=True).distinct()
+        groups = sorted(playlist.profile.groups)
 
         # Check if the groups are sequential and unique
         errors += self.validate_playlist_groups(groups)
 
         for group in groups:
             # Check if the tags are 'a', 'b' or 'c'
-            tags = list(
-                playlist.section_set.filter(group=group)
-                .values_list('tag', flat=True)
-                .distinct()
-                .order_by('tag')
-            )
+            tags = playlist.profile.tags_of_group(group)
 
             if tags != ['a', 'b', 'c']:
                 errors.append(
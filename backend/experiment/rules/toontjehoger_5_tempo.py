@@ -79,12 +79,10 @@ class ToontjeHoger5Tempo(BaseRules):
         previous_pieces = session.result_set.filter(section__isnull=False).values_list(
             "section__song__name", flat=True
         )
-        original_section = (
-            session.playlist.section_set.filter(tag__startswith=genre)
-            .exclude(song__name__in=previous_pieces)
-            .filter(group="or")
-            .order_by("?")
-        ).first()
+        original_section = session.playlist.get_section(
+            filter_by={"tag__startswith": genre, "group": "or"},
+            exclude={"song__name__in": previous_pieces},
+        )
         changed_section = self.get_section_changed(session, original_section.song)
         sections = [original_section, changed_section]
         random.shuffle(sections)
@@ -259,13 +257,12 @@ class ToontjeHoger5Tempo(BaseRules):
 
     def validate_playlist(self, playlist: Playlist):
         errors = super().validate_playlist(playlist)
-        sections = playlist.section_set.all()
-        groups = sorted(list(set([section.group for section in sections])))
+        groups = sorted(playlist.profile.groups)
 
         if groups != ["ch", "or"]:
             errors.append("The playlist must contain two groups: 'or' and 'ch'. Found: {}".format(groups))
 
-        tags = sorted(list(set([section.tag for section in sections])))
+        tags = sorted(playlist.profile.tags)
 
         # Check if all tags are valid
         errors += self.validate_tags(tags)
@@ -38,10 +38,10 @@ class ToontjeHoger6Relative(BaseRules):
         ```
         '''
         errors = super().validate_playlist(playlist)
-        sections = playlist.section_set.all()
-        if sections.count() != 3:
+        profile = playlist.profile
+        if profile.section_count != 3:
             errors.append('There should be three sections in the playlist')
-        if sorted([s.tag for s in sections]) != ['a', 'b', 'c']:
+        if sorted(profile.tags.elements()) != ['a', 'b', 'c']:
             errors.append('The sections should have the tags a, b, c')
         return errors
 
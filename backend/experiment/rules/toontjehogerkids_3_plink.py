@@ -16,6 +16,7 @@ from experiment.actions.utils import get_experiment_url
 from experiment.utils import non_breaking_spaces
 from result.utils import prepare_result
 from section.models import Section
+from section.profile import PlaylistProfile
 from session.models import Session
 from .toontjehoger_1_mozart import toontjehoger_ranks
 from .toontjehoger_3_plink import ToontjeHoger3Plink
@@ -33,7 +34,8 @@ class ToontjeHogerKids3Plink(ToontjeHoger3Plink):
     SCORE_EXTRA_2_CORRECT = 4
     SCORE_EXTRA_WRONG = 0
 
-    def validate_era_and_mood(self, sections):
+    def validate_era_and_mood(self, profile: PlaylistProfile):
+        """The kids' version only asks for the artist and title, so sections need no era or mood"""
         return []
 
     def get_intro_explainer(self, n_rounds):
@@ -1,11 +1,12 @@
 from random import shuffle
 from typing import Optional, TypedDict, Literal
 
-from django.db.models import Sum
+from django.db.models import Count, Q, Sum
 from django_markup.markup import formatter
 from django.utils.translation import gettext_lazy as _
 
 from experiment.actions.consent import Consent
+from experiment.cache import cached_serialization
 from image.serializers import serialize_image
 from participant.models import Participant
 from session.models import Session
@@ -22,7 +23,7 @@ def serialize_actions(actions):
 
 
 def serialize_experiment(experiment: Experiment) -> dict:
-    """Serialize experiment
+    """Serialize experiment, cached until experiment content is edited
 
     Args:
         experiment: Experiment instance
@@ -30,7 +31,10 @@ def serialize_experiment(experiment: Experiment) -> dict:
     Returns:
         Basic info about an experiment
     """
+    return cached_serialization("experiment", experiment.pk, lambda: _serialize_experiment(experiment))
 
+
+def _serialize_experiment(experiment: Experiment) -> dict:
     serialized = {
         "slug": experiment.slug,
         "name": experiment.name,
@@ -82,12 +86,51 @@ def serialize_social_media_config(
     }
 
 
-def serialize_phase(phase: Phase, participant: Participant, times_played: int) -> dict:
+class ParticipantProgress:
+    """Started and finished session counts and summed final scores of a participant per block of an experiment,
+    fetched with one grouped query
+
+    Args:
+        experiment: Experiment instance
+        participant: Participant instance
+    """
+
+    def __init__(self, experiment: Experiment, participant: Participant):
+        rows = (
+            Session.objects.filter(participant=participant, block__phase__experiment=experiment)
+            .values("block_id")
+            .annotate(
+                started=Count("id"),
+                finished=Count("id", filter=Q(finished_at__isnull=False)),
+                score=Sum("final_score"),
+            )
+            .order_by()
+        )
+        self.blocks = {row["block_id"]: row for row in rows}
+
+    def started_session_count(self, block: Block) -> int:
+        return self.blocks.get(block.id, {}).get("started", 0)
+
+    def finished_session_count(self, block: Block) -> int:
+        return self.blocks.get(block.id, {}).get("finished", 0)
+
+    def accumulated_score(self, block: Block) -> float:
+        return self.blocks.get(block.id, {}).get("score") or 0
+
+    def min_finished_session_count(self, blocks: list[Block]) -> int:
+        return min(self.finished_session_count(block) for block in blocks)
+
+
+def serialize_phase(
+    phase: Phase, participant: Participant, times_played: int, progress: Optional[ParticipantProgress] = None
+) -> dict:
     """Serialize phase
 
     Args:
         phase: Phase instance
         participant: Participant instance
+        times_played: how often the participant has played through the experiment
+        progress: the participant's progress in the experiment, fetched if not given
 
     Returns:
         a dictionary of the dashboard (if applicable),
@@ -95,13 +138,15 @@ def serialize_phase(phase: Phase, participant: Participant, times_played: int) -
         number of sessions played
         accumlated score of the phase
     """
-    blocks = list(phase.blocks.order_by("index").all())
+    if progress is None:
+        progress = ParticipantProgress(phase.experiment, participant)
+    blocks = list(phase.blocks.all())
 
-    next_block = get_upcoming_block(phase, participant, times_played)
+    next_block = get_upcoming_block(phase, participant, times_played, progress)
     if not next_block:
         return None
 
-    session_info = get_session_info(blocks, participant)
+    session_info = get_session_info(blocks, participant, progress)
 
     if phase.randomize:
         shuffle(blocks)
@@ -131,6 +176,10 @@ def serialize_block(block_object: Block, language: str = "en") -> dict:
     Returns:
         Block info for a participant
     """
+    return cached_serialization("block", block_object.pk, lambda: _serialize_block(block_object))
+
+
+def _serialize_block(block_object: Block) -> dict:
     theme = get_theme_config(block_object)
     return {
         "slug": block_object.slug,
@@ -141,19 +190,25 @@ def serialize_block(block_object: Block, language: str = "en") -> dict:
     }
 
 
-def get_upcoming_block(phase: Phase, participant: Participant, times_played: int) -> dict:
+def get_upcoming_block(
+    phase: Phase, participant: Participant, times_played: int, progress: Optional[ParticipantProgress] = None
+) -> dict:
     """return next block with minimum finished sessions for this participant
     if all blocks have been played an equal number of times, return None
 
     Args:
         phase: Phase for which next block needs to be picked
         participant: Participant for which next block needs to be picked
+        times_played: how often the participant has played through the experiment
+        progress: the participant's progress in the experiment, fetched if not given
     """
+    if progress is None:
+        progress = ParticipantProgress(phase.experiment, participant)
     blocks = list(phase.blocks.all())
 
     if phase.randomize:
         shuffle(blocks)
-    finished_session_counts = [get_finished_session_count(block, participant) for block in blocks]
+    finished_session_counts = [progress.finished_session_count(block) for block in blocks]
 
     min_session_count = min(finished_session_counts)
     if not phase.dashboard:
@@ -192,24 +247,25 @@ def get_finished_session_count(block: Block, participant: Participant) -> int:
     return Session.objects.filter(block=block, participant=participant, finished_at__isnull=False).count()
 
 
-def get_session_info(blocks: list[Block], participant: Participant) -> dict:
+def get_session_info(
+    blocks: list[Block], participant: Participant, progress: Optional[ParticipantProgress] = None
+) -> dict:
     """Return information of the sessions played by this participant in the blocks of this phase
 
     Args:
         blocks: All blocks from the current phase
         participant: The participant currently playing
+        progress: the participant's progress in the experiment, fetched if not given
 
     Returns:
         dict with session count and accumulated score
     """
-    participant_sessions = participant.sessions.filter(
-        block__in=blocks
-    )
-    accumulated_score = participant_sessions.aggregate(
-        total_score=Sum("final_score")
-    )["total_score"] or 0
+    if progress is None:
+        participant_sessions = participant.sessions.filter(block__in=blocks)
+        accumulated_score = participant_sessions.aggregate(total_score=Sum("final_score"))["total_score"] or 0
+        return {"playedSessions": participant_sessions.count(), "accumulatedScore": accumulated_score}
 
     return {
-        "playedSessions": participant_sessions.count(),
-        "accumulatedScore": accumulated_score
+        "playedSessions": sum(progress.started_session_count(block) for block in blocks),
+        "accumulatedScore": sum(progress.accumulated_score(block) for block in blocks),
     }
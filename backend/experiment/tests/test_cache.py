@@ -0,0 +1,54 @@
+from django.test import TestCase
+from django.utils import translation
+
+from experiment.models import Block, Experiment, Phase
+from experiment.serializers import serialize_block, serialize_experiment
+from theme.models import ThemeConfig
+
+
+class SerializedContentCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.experiment = Experiment.objects.create(slug='cached', name='Cached', description='**bold**')
+        phase = Phase.objects.create(experiment=cls.experiment)
+        cls.block = Block.objects.create(slug='cached-block', name='Block', phase=phase)
+
+    def test_serialize_experiment_cached(self):
+        serialize_experiment(self.experiment)
+        with self.assertNumQueries(0):
+            serialized = serialize_experiment(self.experiment)
+        self.assertIn('<strong>bold</strong>', serialized['description'])
+
+    def test_invalidated_on_save(self):
+        self.assertEqual(serialize_block(self.block)['name'], 'Block')
+        self.block.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.block.save()
+            # the version is bumped once the change is committed
+            self.assertEqual(serialize_block(self.block)['name'], 'Block')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(serialize_block(self.block)['name'], 'Renamed')
+
+    def test_invalidated_on_theme_change(self):
+        theme = ThemeConfig.objects.create(name='Cached theme', color_primary='#000000')
+        self.experiment.theme_config = theme
+        self.experiment.save()
+        self.assertEqual(serialize_experiment(self.experiment)['theme']['colorPrimary'], '#000000')
+        theme.color_primary = '#ffffff'
+        with self.captureOnCommitCallbacks(execute=True):
+            theme.save()
+        self.assertEqual(serialize_experiment(self.experiment)['theme']['colorPrimary'], '#ffffff')
+        with self.captureOnCommitCallbacks(execute=True):
+            theme.delete()
+        self.experiment.refresh_from_db()
+        self.assertEqual(serialize_experiment(self.experiment)['theme']['name'], 'Default')
+
+    def test_cached_per_language(self):
+        self.block.name_nl = 'Blok'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.block.save()
+        with translation.override('en'):
+            self.assertEqual(serialize_block(self.block)['name'], 'Block')
+        with translation.override('nl'):
+            self.assertEqual(serialize_block(self.block)['name'], 'Blok')
@@ -7,7 +7,13 @@ from experiment.models import (
     Experiment,
     Phase,
 )
-from experiment.serializers import get_session_info, get_upcoming_block, serialize_block, serialize_phase
+from experiment.serializers import (
+    ParticipantProgress,
+    get_session_info,
+    get_upcoming_block,
+    serialize_block,
+    serialize_phase,
+)
 from experiment.tests.test_views import create_theme_config
 from image.models import Image
 from participant.models import Participant
@@ -85,6 +91,24 @@ class SerializerTest(TestCase):
         self.assertEqual(phase_info.get('playedSessions'), 2)
         self.assertEqual(phase_info.get('accumulatedScore'), 20)
 
+    def test_participant_progress(self):
+        ddi = Block.objects.get(slug="ddi")
+        Session.objects.create(participant=self.participant, block=ddi, final_score=10)
+        Session.objects.create(
+            participant=self.participant, block=ddi, final_score=5, finished_at=timezone.now()
+        )
+        Session.objects.create(participant=Participant.objects.create(), block=ddi, final_score=100)
+        with self.assertNumQueries(1):
+            progress = ParticipantProgress(self.experiment, self.participant)
+        self.assertEqual(progress.started_session_count(ddi), 2)
+        self.assertEqual(progress.finished_session_count(ddi), 1)
+        self.assertEqual(progress.accumulated_score(ddi), 15)
+        blocks = list(self.phase2.blocks.all())
+        self.assertEqual(progress.min_finished_session_count(blocks), 0)
+        with self.assertNumQueries(0):
+            phase_info = get_session_info(blocks, self.participant, progress)
+        self.assertEqual(phase_info, {"playedSessions": 2, "accumulatedScore": 15})
+
     def test_upcoming_block(self):
         block = get_upcoming_block(self.phase1, self.participant, 0)
         self.assertEqual(block.get("slug"), "rhythm_intro")
@@ -1,7 +1,9 @@
 import csv
 import json
+from io import BytesIO
 from zipfile import ZipFile
 
+from django.core import serializers
 from django.test import TestCase, Client
 
 from experiment.utils import (
@@ -10,12 +12,17 @@ from experiment.utils import (
     format_label,
     get_block_csv_export_as_response,
     get_block_json_export_as_response,
+    get_block_jsonl_export_as_response,
+    iter_block_export_csv,
+    iter_block_export,
+    iter_block_export_jsonl,
 )
 
 from experiment.models import Experiment, Phase, Block, Feedback
 from participant.models import Participant
 from session.models import Session
 from result.models import Result
+from section.models import Song
 
 
 class TestExperimentUtils(TestCase):
@@ -80,9 +87,19 @@ class TestBlockExport(TestCase):
         response = get_block_csv_export_as_response(self.block.slug)
         # test response from forced download
         self.assertEqual(response.status_code, 200)
-        self.assertIsNotNone(response.content)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content, block_export_csv_results(self.block.slug))
         self.assertEqual(response["content-type"], "text/csv")
 
+    def test_block_csv_export_chunks(self):
+        chunks = list(iter_block_export_csv(self.block.slug, chunk_size=3))
+        # header, then 10 rows in chunks of at most 3 lines
+        self.assertEqual(len(chunks), 5)
+        self.assertTrue(chunks[0].startswith("session__id,participant__id"))
+        self.assertEqual(chunks[1].count("\n"), 3)
+        self.assertEqual(chunks[-1].count("\n"), 1)
+
     def test_block_json_export(self):
         zip_buffer = block_export_json_results(self.block.slug)
         with ZipFile(zip_buffer, "r") as test_zip:
@@ -125,5 +142,44 @@ class TestBlockExport(TestCase):
         response = get_block_json_export_as_response(self.block.slug)
         # test response from forced download
         self.assertEqual(response.status_code, 200)
-        self.assertIsNotNone(response.content)
+        self.assertTrue(response.streaming)
         self.assertEqual(response["content-type"], "application/x-zip-compressed")
+        with ZipFile(BytesIO(b"".join(response.streaming_content)), "r") as test_zip:
+            these_sections = json.loads(test_zip.read("sections.json").decode("utf-8"))
+            self.assertEqual(len(these_sections), 1000)
+
+    def test_block_json_export_in_chunks(self):
+        parts = list(iter_block_export(self.block.slug, chunk_size=30))
+        self.assertGreater(len(parts), 1)
+        with ZipFile(BytesIO(b"".join(parts)), "r") as test_zip:
+            # the files hold the same json as serializing all objects at once
+            self.assertEqual(
+                test_zip.read("songs.json").decode("utf-8"),
+                serializers.serialize("json", Song.objects.order_by("pk")),
+            )
+            self.assertEqual(
+                test_zip.read("feedback.json").decode("utf-8"),
+                serializers.serialize("json", Feedback.objects.filter(block=self.block).order_by("pk")),
+            )
+
+    def test_block_jsonl_export(self):
+        parts = list(iter_block_export_jsonl(self.block.slug, chunk_size=100))
+        self.assertGreater(len(parts), 1)
+        with ZipFile(BytesIO(b"".join(parts)), "r") as test_zip:
+            self.assertEqual(len(test_zip.namelist()), 7)
+            these_sections = test_zip.read("sections.jsonl").decode("utf-8").splitlines()
+            self.assertEqual(len(these_sections), 1000)
+            these_sessions = [
+                json.loads(line) for line in test_zip.read("sessions.jsonl").decode("utf-8").splitlines()
+            ]
+            self.assertEqual(len(these_sessions), 1)
+            self.assertEqual(these_sessions[0]["fields"]["block"], 4)
+            these_results = test_zip.read("results.jsonl").decode("utf-8").splitlines()
+            self.assertEqual(len(these_results), 5)
+
+    def test_block_jsonl_export_admin(self):
+        response = get_block_jsonl_export_as_response(self.block.slug)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with ZipFile(BytesIO(b"".join(response.streaming_content)), "r") as test_zip:
+            self.assertIn("profiles.jsonl", test_zip.namelist())
@@ -1,6 +1,7 @@
 from os.path import dirname, join
 from shutil import rmtree
 
+from django.core.cache import cache
 from django.test import override_settings, TestCase
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -44,6 +45,9 @@ class TestExperimentViews(TestCase):
         cls.block4 = Block.objects.create(slug="block4", phase=cls.final_phase)
 
     def setUp(self):
+        # serializations are cached, and the content version is only bumped when a change is committed,
+        # which does not happen within tests
+        cache.clear()
         session = self.client.session
         session["participant_id"] = self.participant.id
         session.save()
@@ -1,17 +1,22 @@
 from csv import DictWriter
-from io import BytesIO, StringIO
+from datetime import timedelta
+from io import BytesIO, TextIOWrapper
+from itertools import batched, groupby
+from os import makedirs
 from os.path import join
-from zipfile import ZipFile
+from typing import BinaryIO, Iterator
+from zipfile import ZIP_DEFLATED, ZipFile
 
 from django.db.models.query import QuerySet
-from django.db.models import F
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce, Greatest
 from django.core import serializers
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 import roman
 
 
-from experiment.models import Experiment, Block, Feedback
+from experiment.models import Experiment, Block, ExportWatermark, Feedback
 from result.models import Result
 from participant.models import Participant
 from section.models import Song, Section
@@ -139,57 +144,83 @@ def get_profiles_of_participants(
     return Result.objects.filter(participant__in=participants)
 
 
-def block_export_csv_results(block_slug: str) -> StringIO:
-    """export results and profiles in two csvs
-    This export does not provide all data, but a selection of the variables
-    expected to be of most interest for basic analyses
+class _Echo:
+    """File-like object that returns what is written to it, so csv writers can be used as generators"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+RESULT_CSV_KEYS = [
+    "session__id",
+    "participant__id",
+    "question_key",
+    "created_at",
+    "expected_response",
+    "given_response",
+    "score",
+    "section__song__name",
+    "section__song__artist",
+    "section__tag",
+    "section__group",
+]
+
+PROFILE_CSV_KEYS = [
+    "participant__id",
+    "participant__country_code",
+    "question_key",
+    "created_at",
+    "expected_response",
+    "given_response",
+    "score",
+]
+
+
+def iter_block_export_csv(block_slug: str, chunk_size: int = 2000) -> Iterator[str]:
+    """Export results and profiles of a block as csv, in chunks of lines
+    Rows are fetched from the database with a server-side cursor,
+    so memory use does not depend on the size of the block
+
+    Args:
+        block_slug: slug of the block to export
+        chunk_size: number of rows to fetch from the database, and to yield, at once
+
+    Returns:
+        generator of strings, each containing up to `chunk_size` csv lines
     """
     this_block = Block.objects.get(slug=block_slug)
     all_sessions = this_block.sessions.order_by("pk")
-    all_results = get_results_of_sessions(all_sessions)
-    result_output_keys = [
-        "session__id",
-        "participant__id",
-        "question_key",
-        "created_at",
-        "expected_response",
-        "given_response",
-        "score",
-        "section__song__name",
-        "section__song__artist",
-        "section__tag",
-        "section__group",
-    ]
-    results_output = list(
-        all_results.annotate(participant__id=F("session__participant")).values(
-            *result_output_keys
-        )
+    all_results = get_results_of_sessions(all_sessions).annotate(
+        participant__id=F("session__participant")
     )
     all_participants = get_participants_of_sessions(all_sessions)
     all_profiles = get_profiles_of_participants(all_participants)
-    profile_output_keys = [
-        "participant__id",
-        "participant__country_code",
-        "question_key",
-        "created_at",
-        "expected_response",
-        "given_response",
-        "score",
-    ]
-    profiles_output = list(all_profiles.values(*profile_output_keys))
-    combined_output = [*results_output, *profiles_output]
-    fieldnames = list(set([*profile_output_keys, *result_output_keys]))
-    csv_buffer = StringIO()
-    writer = DictWriter(csv_buffer, fieldnames=fieldnames, lineterminator="\n")
-    writer.writeheader()
-    writer.writerows(combined_output)
-    return csv_buffer.getvalue()
-
-
-def get_block_csv_export_as_response(block_slug: str) -> HttpResponse:
-    '''Create a download response for the admin experimenter dashboard'''
-    csv_string = block_export_csv_results(block_slug)
-    response = HttpResponse(csv_string)
+    fieldnames = list(dict.fromkeys([*RESULT_CSV_KEYS, *PROFILE_CSV_KEYS]))
+    writer = DictWriter(_Echo(), fieldnames=fieldnames, lineterminator="\n")
+    yield writer.writeheader()
+    lines = []
+    for queryset, keys in ((all_results, RESULT_CSV_KEYS), (all_profiles, PROFILE_CSV_KEYS)):
+        for row in queryset.values(*keys).iterator(chunk_size=chunk_size):
+            lines.append(writer.writerow(row))
+            if len(lines) >= chunk_size:
+                yield "".join(lines)
+                lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def block_export_csv_results(block_slug: str) -> str:
+    """export results and profiles in two csvs
+    This export does not provide all data, but a selection of the variables
+    expected to be of most interest for basic analyses
+    For large blocks, use `iter_block_export_csv` instead, which does not keep the whole export in memory
+    """
+    return "".join(iter_block_export_csv(block_slug))
+
+
+def get_block_csv_export_as_response(block_slug: str) -> StreamingHttpResponse:
+    '''Create a streaming download response for the admin experimenter dashboard'''
+    response = StreamingHttpResponse(iter_block_export_csv(block_slug))
     response["Content-Type"] = "text/csv"
     response["Content-Disposition"] = (
         'attachment; filename="'
@@ -201,64 +232,140 @@ def get_block_csv_export_as_response(block_slug: str) -> HttpResponse:
     return response
 
 
-def block_export_json_results(block_slug: str) -> ZipFile:
-    """Export block JSON data as zip archive"""
-
-    this_block = Block.objects.get(slug=block_slug)
-    all_feedback = Feedback.objects.filter(block=this_block)
-
-    # Collect data
-    all_sessions = this_block.sessions.order_by("pk")
+def _block_export_tables(block: Block) -> list[tuple[str, QuerySet]]:
+    """The tables of a block export, as (file name without extension, queryset)"""
+    all_sessions = block.sessions.order_by("pk")
     all_results = get_results_of_sessions(all_sessions)
     all_participants = get_participants_of_sessions(all_sessions)
     all_profiles = get_profiles_of_participants(all_participants)
-    all_sections = Section.objects.filter(playlist__in=this_block.playlists.all())
+    all_sections = Section.objects.filter(playlist__in=block.playlists.all())
     all_songs = Song.objects.filter(section__in=all_sections).distinct()
+    all_feedback = Feedback.objects.filter(block=block)
+    return [
+        ("sessions", all_sessions),
+        ("participants", all_participants),
+        ("profiles", all_profiles.order_by("participant", "pk")),
+        ("results", all_results.order_by("session")),
+        ("sections", all_sections.order_by("playlist", "pk")),
+        ("songs", all_songs.order_by("pk")),
+        ("feedback", all_feedback.order_by("pk")),
+    ]
+
+
+def _write_block_export(
+    target: BinaryIO, block_slug: str, serialization_format: str = "json", chunk_size: int = 2000
+) -> Iterator[None]:
+    """Write a zip archive with one file per table of the block export to `target`.
+    Objects are fetched with a server-side cursor and serialized straight into the (compressed) zip entries.
+
+    Args:
+        target: a writable binary file-like object, does not need to be seekable
+        block_slug: slug of the block to export
+        serialization_format: "json" (one list of objects per file) or "jsonl" (one object per line)
+        chunk_size: number of objects to fetch from the database at once
 
-    # create empty zip file in memory
+    Returns:
+        generator which writes the next part of the archive each time it is advanced, after every chunk of objects
+    """
+    this_block = Block.objects.get(slug=block_slug)
+    with ZipFile(target, "w", compression=ZIP_DEFLATED) as new_zip:
+        for name, queryset in _block_export_tables(this_block):
+            with new_zip.open(f"{name}.{serialization_format}", "w", force_zip64=True) as entry:
+                stream = TextIOWrapper(entry, encoding="utf-8")
+                objects = queryset.iterator(chunk_size=chunk_size)
+                if serialization_format == "json":
+                    stream.write("[")
+                for index, chunk in enumerate(batched(objects, chunk_size)):
+                    if serialization_format == "json":
+                        # write the objects of each chunk into one list, as the json serializer would:
+                        # `[{...}, {...}]\n` without the brackets, separated by ", "
+                        if index:
+                            stream.write(", ")
+                        stream.write(serializers.serialize("json", chunk)[1:-2])
+                    else:
+                        serializers.serialize("jsonl", chunk, stream=stream)
+                    stream.flush()
+                    yield
+                if serialization_format == "json":
+                    stream.write("]\n")
+                stream.flush()
+                stream.detach()
+            yield
+    yield
+
+
+class _ZipStreamBuffer:
+    """Unseekable binary stream, collecting what is written to it until it is drained"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def block_export_json_results(block_slug: str) -> BytesIO:
+    """Export block JSON data as zip archive"""
     zip_buffer = BytesIO()
-    with ZipFile(zip_buffer, "w") as new_zip:
-        # serialize data to new json files within the zip file
-        new_zip.writestr(
-            "sessions.json", data=str(serializers.serialize("json", all_sessions))
-        )
-        new_zip.writestr(
-            "participants.json",
-            data=str(serializers.serialize("json", all_participants)),
-        )
-        new_zip.writestr(
-            "profiles.json",
-            data=str(
-                serializers.serialize(
-                    "json", all_profiles.order_by("participant", "pk")
-                )
-            ),
-        )
-        new_zip.writestr(
-            "results.json",
-            data=str(serializers.serialize("json", all_results.order_by("session"))),
-        )
-        new_zip.writestr(
-            "sections.json",
-            data=str(
-                serializers.serialize("json", all_sections.order_by("playlist", "pk"))
-            ),
-        )
-        new_zip.writestr(
-            "songs.json",
-            data=str(serializers.serialize("json", all_songs.order_by("pk"))),
-        )
-        new_zip.writestr(
-            "feedback.json",
-            data=str(serializers.serialize("json", all_feedback.order_by("pk"))),
-        )
+    for _ in _write_block_export(zip_buffer, block_slug):
+        pass
     return zip_buffer
 
 
-def get_block_json_export_as_response(block_slug: str) -> HttpResponse:
-    '''Create a download response for the admin experimenter dashboard'''
-    zip_buffer = block_export_json_results(block_slug)
-    response = HttpResponse(zip_buffer.getbuffer())
+def block_export_json_to_file(block_slug: str, path: str, jsonl: bool = False):
+    """Export block data as zip archive directly to a file on disk, with bounded memory use
+
+    Args:
+        block_slug: slug of the block to export
+        path: path of the zip file to write
+        jsonl: whether to write json lines (`<table>.jsonl`) instead of json lists (`<table>.json`)
+    """
+    with open(path, "wb") as f:
+        for _ in _write_block_export(f, block_slug, "jsonl" if jsonl else "json"):
+            pass
+
+
+def iter_block_export(block_slug: str, serialization_format: str = "json", chunk_size: int = 2000) -> Iterator[bytes]:
+    """Export block data as zip archive, in parts,
+    so it can be streamed to the client without keeping the archive in memory
+
+    Args:
+        block_slug: slug of the block to export
+        serialization_format: "json" (one list of objects per file) or "jsonl" (one object per line)
+        chunk_size: number of objects to fetch and serialize at once
+
+    Returns:
+        generator of consecutive parts of the zip archive
+    """
+    buffer = _ZipStreamBuffer()
+    for _ in _write_block_export(buffer, block_slug, serialization_format, chunk_size):
+        data = buffer.drain()
+        if data:
+            yield data
+
+
+def iter_block_export_jsonl(block_slug: str, chunk_size: int = 2000) -> Iterator[bytes]:
+    """Export block data as zip archive of json lines files, in parts, see `iter_block_export`"""
+    return iter_block_export(block_slug, "jsonl", chunk_size)
+
+
+def get_block_json_export_as_response(block_slug: str) -> StreamingHttpResponse:
+    '''Create a streaming download response for the admin experimenter dashboard'''
+    response = StreamingHttpResponse(iter_block_export(block_slug))
     response["Content-Type"] = "application/x-zip-compressed"
     response["Content-Disposition"] = (
         'attachment; filename="'
@@ -268,3 +375,103 @@ def get_block_json_export_as_response(block_slug: str) -> HttpResponse:
         + '.zip"'
     )
     return response
+
+
+def get_block_jsonl_export_as_response(block_slug: str) -> StreamingHttpResponse:
+    '''Create a streaming download response of json lines files for the admin experimenter dashboard'''
+    response = StreamingHttpResponse(iter_block_export_jsonl(block_slug))
+    response["Content-Type"] = "application/x-zip-compressed"
+    response["Content-Disposition"] = (
+        'attachment; filename="'
+        + block_slug
+        + "-"
+        + timezone.now().isoformat()
+        + '.zip"'
+    )
+    return response
+
+
+def _write_partitioned_jsonl(
+    objects: Iterator, partition_key, directory: str, file_name: str, chunk_size: int
+) -> int:
+    """Append objects, ordered by `partition_key`, as json lines to `<directory>/<day>/<file_name>`
+
+    Returns:
+        number of objects written
+    """
+    n_objects = 0
+    for chunk in batched(objects, chunk_size):
+        for day, day_objects in groupby(chunk, key=partition_key):
+            day_directory = join(directory, day.isoformat())
+            makedirs(day_directory, exist_ok=True)
+            with open(join(day_directory, file_name), "a", encoding="utf-8") as f:
+                serializers.serialize("jsonl", day_objects, stream=f)
+        n_objects += len(chunk)
+    return n_objects
+
+
+# how long the incremental export stays behind, so it does not miss rows of transactions which commit later
+INCREMENTAL_EXPORT_LAG = timedelta(minutes=5)
+
+
+def block_export_incremental(block_slug: str, directory: str, chunk_size: int = 2000) -> dict[str, int]:
+    """Export sessions and results of a block created or changed since the previous incremental export,
+    as json lines files partitioned by day: `<directory>/<block_slug>/<YYYY-MM-DD>/{sessions,results}.jsonl`.
+    Files of days which were exported before are appended to.
+    A session which was saved after it was exported (e.g. when it finished) is exported again,
+    in the partition of the day it was saved, and a result which was saved after it was exported (e.g. when the participant answered) is exported again,
+    in the partition of the day it was saved, so the last occurrence of a session or result holds its final state.
+
+    Args:
+        block_slug: slug of the block to export
+        directory: directory to write to
+        chunk_size: number of objects to fetch and serialize at once
+
+    Returns:
+        number of exported sessions and results
+    """
+    this_block = Block.objects.get(slug=block_slug)
+    watermark = ExportWatermark.objects.filter(block=this_block).first()
+    # rows written by transactions which are still running are committed with an earlier timestamp,
+    # leave them to the next export
+    exported_until = timezone.now() - INCREMENTAL_EXPORT_LAG
+    window = {"lte": exported_until}
+    if watermark:
+        window["gt"] = watermark.exported_until
+    block_directory = join(directory, block_slug)
+
+    def day_of(timestamp):
+        return timezone.localtime(timestamp).date()
+
+    sessions = (
+        this_block.sessions.filter(**{f"updated_at__{key}": value for key, value in window.items()})
+        .order_by("updated_at", "pk")
+    )
+    results = (
+        Result.objects.filter(session__block=this_block)
+        .filter(
+            Q(**{f"updated_at__{key}": value for key, value in window.items()})
+            # results which were not saved since `updated_at` was added
+            | Q(updated_at=None, **{f"created_at__{key}": value for key, value in window.items()})
+        )
+        .annotate(exported_at=Coalesce("updated_at", "created_at"))
+        .order_by("exported_at", "pk")
+    )
+    counts = {
+        "sessions": _write_partitioned_jsonl(
+            sessions.iterator(chunk_size=chunk_size),
+            lambda session: day_of(session.updated_at),
+            block_directory,
+            "sessions.jsonl",
+            chunk_size,
+        ),
+        "results": _write_partitioned_jsonl(
+            results.iterator(chunk_size=chunk_size),
+            lambda result: day_of(result.exported_at),
+            block_directory,
+            "results.jsonl",
+            chunk_size,
+        ),
+    }
+    ExportWatermark.objects.update_or_create(block=this_block, defaults={"exported_until": exported_until})
+    return counts
@@ -1,5 +1,6 @@
 import json
 import logging
+from typing import Optional
 
 from django.http import Http404, HttpRequest, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404
@@ -7,10 +8,11 @@ from django.utils.translation import gettext_lazy as _, get_language
 from django.views.generic.list import ListView
 from django_markup.markup import formatter
 
-from .models import Block, Experiment, Feedback
+from .models import Block, Experiment, Feedback, Phase
 from section.models import Playlist
 from session.models import Session
 from experiment.serializers import (
+    ParticipantProgress,
     serialize_block,
     serialize_experiment,
     serialize_phase,
@@ -102,41 +104,47 @@ def get_experiment(
 
     participant = get_or_create_participant(request)
 
-    phases = list(experiment.phases.order_by("index").all())
+    phases = list(experiment.phases.order_by("index").prefetch_related("blocks"))
     if not len(phases):
         return JsonResponse(
             {"error": "This experiment does not have phases and blocks configured"},
             status=500,
         )
+    progress = ParticipantProgress(experiment, participant)
     times_played_key = 'f"{slug}-xplayed"'
     times_played = request.session.get(times_played_key, 0)
+    serialized_phase = _serialize_current_phase(phases, participant, times_played, progress)
+    if not serialized_phase:
+        # if no phase was found, start from scratch with the minimum session count
+        times_played = _get_min_session_count(phases, progress)
+        request.session[times_played_key] = times_played
+        serialized_phase = _serialize_current_phase(phases, participant, times_played, progress)
+    if not serialized_phase:
+        return JsonResponse(
+            {"error": "This experiment does not have phases and blocks configured"},
+            status=500,
+        )
+    return JsonResponse(
+        {
+            **serialize_experiment(experiment),
+            **serialized_phase,
+        }
+    )
+
+
+def _serialize_current_phase(
+    phases: list[Phase], participant: Participant, times_played: int, progress: ParticipantProgress
+) -> Optional[dict]:
+    """Serialize the first phase which has a block to play next, or return None"""
     for phase in phases:
-        serialized_phase = serialize_phase(phase, participant, times_played)
+        serialized_phase = serialize_phase(phase, participant, times_played, progress)
         if serialized_phase:
-            return JsonResponse(
-                {
-                    **serialize_experiment(experiment),
-                    **serialized_phase,
-                }
-            )
-    # if no phase was found, start from scratch with the minimum session count
-    request.session[times_played_key] = _get_min_session_count(experiment, participant)
-    return get_experiment(request, slug)
-
-
-def _get_min_session_count(experiment: Experiment, participant: Participant) -> int:
-    phases = experiment.phases.all()
-    session_counts = []
-    for phase in phases:
-        session_counts.extend(
-            [
-                Session.objects.exclude(finished_at__isnull=True)
-                .filter(block=block, participant=participant)
-                .count()
-                for block in phase.blocks.all()
-            ]
-        )
-    return min(session_counts)
+            return serialized_phase
+    return None
+
+
+def _get_min_session_count(phases: list[Phase], progress: ParticipantProgress) -> int:
+    return min(progress.min_finished_session_count(list(phase.blocks.all())) for phase in phases if phase.blocks.all())
 
 
 def get_associated_blocks(pk_list):
@@ -184,7 +192,7 @@ def validate_block_playlist(request: HttpRequest, rules_id: str) -> JsonResponse
     if not playlists:
         return JsonResponse({"status": "error", "message": "The block must have a playlist."})
 
-    rules = BLOCK_RULES[rules_id]()
+    rules = BLOCK_RULES.get_instance(rules_id)
 
     if not rules.validate_playlist:
         return JsonResponse({"status": "warn", "message": "This rulesset does not have a playlist validation."})
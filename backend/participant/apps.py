@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_delete
 
 
 class ParticipantConfig(AppConfig):
     name = 'participant'
+
+    def ready(self):
+        from participant.models import Participant, remove_from_accumulative_distribution
+
+        pre_delete.connect(
+            remove_from_accumulative_distribution,
+            sender=Participant,
+            dispatch_uid='remove_from_accumulative_distribution',
+        )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from participant.models import AccumulativeScoreDistribution, Participant
+
+
+class Command(BaseCommand):
+    """Command for backfilling the accumulative scores of participants
+    Usage: python manage.py backfillaccumulativescores [--check]"""
+
+    help = 'Recompute the accumulative score of all participants from their sessions, and rebuild its distribution'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch_size',
+                            type=int,
+                            default=1000,
+                            help="Number of participants to update per query")
+        parser.add_argument('--check',
+                            action='store_true',
+                            help="Only compare the accumulative scores with the sessions, and report differences")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            n_participants, differences = check_accumulative_scores()
+            for score, expected, actual in differences:
+                self.stdout.write(f'Score {score}: {actual} participants in distribution, expected {expected}')
+            if n_participants or differences:
+                raise CommandError(
+                    f'Accumulative score is inconsistent for {n_participants} participant(s), '
+                    f'and its distribution in {len(differences)} bucket(s)'
+                )
+            self.stdout.write(self.style.SUCCESS('Accumulative scores are consistent'))
+            return
+
+        n_updated = Participant.objects.rebuild_accumulative_scores(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated the accumulative score of {n_updated} participant(s)'))
+
+
+def check_accumulative_scores() -> tuple[int, list[tuple[float, int, int]]]:
+    """Compare the accumulative scores with the sessions, and their distribution with the participants
+
+    Returns:
+        number of participants of which the `total_final_score` differs from their sessions,
+        and a list of (score, expected count, actual count) for every bucket that differs
+    """
+    n_participants = (
+        Participant.objects.with_accumulative_score().exclude(accumulative_score=F('total_final_score')).count()
+    )
+    expected = AccumulativeScoreDistribution.objects.expected_counts()
+    actual = dict(AccumulativeScoreDistribution.objects.values_list('score', 'count'))
+    differences = []
+    for score in sorted(set(expected) | set(actual)):
+        if expected.get(score, 0) != actual.get(score, 0):
+            differences.append((score, expected.get(score, 0), actual.get(score, 0)))
+    return n_participants, differences
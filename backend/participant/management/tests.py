@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from experiment.models import Block
+from participant.models import AccumulativeScoreDistribution, Participant
+from session.models import Session
+
+
+class BackfillAccumulativeScoresTest(TestCase):
+
+    def test_backfillaccumulativescores(self):
+        block = Block.objects.create(slug='test')
+        participants = Participant.objects.bulk_create([Participant(unique_hash=i) for i in range(3)])
+        Session.objects.bulk_create(
+            [Session(block=block, participant=participant, final_score=10) for participant in participants[:2]]
+        )
+        call_command('backfillaccumulativescores', stdout=StringIO())
+        self.assertEqual(Participant.objects.filter(total_final_score=10).count(), 2)
+        self.assertEqual(AccumulativeScoreDistribution.objects.get(score=10).count, 2)
+        # participants without score are not stored
+        self.assertFalse(AccumulativeScoreDistribution.objects.filter(score=0).exists())
+
+    def test_backfillaccumulativescores_check(self):
+        block = Block.objects.create(slug='test')
+        participant = Participant.objects.create()
+        Session.objects.create(block=block, participant=participant, final_score=10)
+        out = StringIO()
+        call_command('backfillaccumulativescores', check=True, stdout=out)
+        self.assertIn('consistent', out.getvalue())
+        Participant.objects.filter(pk=participant.pk).update(total_final_score=15)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('backfillaccumulativescores', check=True, stdout=out)
+        self.assertIn('Score 15.0: 0 participants in distribution, expected 1', out.getvalue())
+        call_command('backfillaccumulativescores', stdout=StringIO())
+        call_command('backfillaccumulativescores', check=True, stdout=StringIO())
+        self.assertEqual(dict(AccumulativeScoreDistribution.objects.values_list('score', 'count')), {10: 1})
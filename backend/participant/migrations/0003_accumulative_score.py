@@ -0,0 +1,52 @@
+# Generated by Django 6.0.5 on 2026-10-18 18:53
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_accumulative_scores(apps, schema_editor):
+    Participant = apps.get_model('participant', 'Participant')
+    Session = apps.get_model('session', 'Session')
+    AccumulativeScoreDistribution = apps.get_model('participant', 'AccumulativeScoreDistribution')
+    totals = (
+        Session.objects.filter(participant=models.OuterRef('pk'))
+        .values('participant')
+        .annotate(total=models.Sum('final_score'))
+        .values('total')
+    )
+    Participant.objects.update(total_final_score=Coalesce(models.Subquery(totals), 0.0))
+    # participants with a score of 0 are not stored, and scores are rounded as in `accumulative_score_bucket`
+    rows = Participant.objects.exclude(total_final_score=0).values('total_final_score').annotate(n=models.Count('id'))
+    counts = Counter()
+    for row in rows.order_by().iterator():
+        counts[round(row['total_final_score'], 2)] += row['n']
+    AccumulativeScoreDistribution.objects.bulk_create(
+        AccumulativeScoreDistribution(score=score, count=n) for score, n in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participant', '0002_participant_id_url'),
+        ('session', '0008_alter_session_block_alter_session_participant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccumulativeScoreDistribution',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='total_final_score',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.RunPython(backfill_accumulative_scores, migrations.RunPython.noop),
+    ]
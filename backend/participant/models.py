@@ -1,12 +1,20 @@
+import logging
 import uuid
+from collections import Counter
 
 from django.contrib.humanize.templatetags.humanize import naturalday
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.db.models.query import QuerySet
-from django.db.models import Sum
+from django.db.models import Count, F, Sum
 
 from question.models import QuestionList
 from result.models import Result
+from session.models import percentile_rank_in_distribution
+
+logger = logging.getLogger(__name__)
+
+# accumulative scores are bucketed by rounding them to this number of decimals
+ACCUMULATIVE_SCORE_DECIMALS = 2
 
 
 class PartipantManager(models.Manager):
@@ -14,6 +22,54 @@ class PartipantManager(models.Manager):
     def with_accumulative_score(self):
         return self.annotate(accumulative_score=Sum("sessions__final_score", default=0))
 
+    def bulk_create(self, objs, *args, **kwargs):
+        """Create participants in bulk, and count them in the `AccumulativeScoreDistribution` as `save()` does.
+        With `ignore_conflicts` or `update_conflicts` it is unknown which participants were created,
+        so the distribution is rebuilt instead
+        """
+        participants = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+            AccumulativeScoreDistribution.objects.rebuild()
+        else:
+            scores = Counter(accumulative_score_bucket(participant.total_final_score) for participant in participants
+                             if participant.total_final_score)
+            for score, n in scores.items():
+                AccumulativeScoreDistribution.objects.add(score, n)
+        return participants
+
+    def add_to_accumulative_score(self, participant_id: int, difference: float):
+        """Add `difference` to the `total_final_score` of a participant, and move it in the `AccumulativeScoreDistribution`"""
+        with transaction.atomic():
+            old_score = self.select_for_update().values_list("total_final_score", flat=True).get(pk=participant_id)
+            new_score = old_score + difference
+            AccumulativeScoreDistribution.objects.add(old_score, amount=-1)
+            self.filter(pk=participant_id).update(total_final_score=new_score)
+            AccumulativeScoreDistribution.objects.add(new_score)
+
+    def rebuild_accumulative_scores(self, batch_size: int = 1000) -> int:
+        """Recompute `total_final_score` of all participants from their sessions,
+        and rebuild the `AccumulativeScoreDistribution`
+
+        Returns:
+            number of participants of which the `total_final_score` was corrected
+        """
+        n_updated = 0
+        participants = (
+            self.with_accumulative_score()
+            .exclude(accumulative_score=F("total_final_score"))
+            .only("id", "total_final_score")
+        )
+        batch = []
+        for participant in participants.iterator(chunk_size=batch_size):
+            participant.total_final_score = participant.accumulative_score
+            batch.append(participant)
+            if len(batch) >= batch_size:
+                n_updated += self.bulk_update(batch, ["total_final_score"])
+                batch = []
+        n_updated += self.bulk_update(batch, ["total_final_score"])
+        AccumulativeScoreDistribution.objects.rebuild()
+        return n_updated
+
 
 class Participant(models.Model):
     """Main participant, base for profile and sessions
@@ -23,6 +79,7 @@ class Participant(models.Model):
         country_code (str): Country code of the participant
         access_info (str): HTTP_USER_AGENT info
         participant_id_url (str): URL code to link an experiment to a participant
+        total_final_score (float): Sum of the final scores of all sessions of the participant, kept up to date when sessions are saved, created in bulk or deleted
     """
 
     unique_hash = models.CharField(
@@ -30,11 +87,19 @@ class Participant(models.Model):
     country_code = models.CharField(max_length=3, default="")
     access_info = models.CharField(max_length=512, default="", null=True)
     participant_id_url = models.CharField(max_length=128, null=True, unique=True)
+    total_final_score = models.FloatField(db_index=True, default=0.0)
     objects = PartipantManager()
 
     def __str__(self):
         return "Participant {}".format(self.id)
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and self.total_final_score:
+            # participants without a score are only counted when ranking, so signing up does not lock a shared bucket
+            AccumulativeScoreDistribution.objects.add(self.total_final_score)
+
     def session_count(self) -> int:
         """Get the total number of started sessions by this participant
 
@@ -52,12 +117,18 @@ class Participant(models.Model):
     session_count.short_description = 'Sessions'
 
     def percentile_rank_accumulative_score(self) -> float:
-        all_participants = Participant.objects.with_accumulative_score()
-        this_score = all_participants.get(pk=self.pk).accumulative_score
-        n_participants = all_participants.count()
-        n_lte = all_participants.filter(accumulative_score__lte=this_score).count()
-        n_eq = all_participants.filter(accumulative_score=this_score).count()
-        return 100.0 * (n_lte - (0.5 * n_eq)) / n_participants
+        """Percentile rank of this participant among all participants, based on the sum of the final scores of their sessions
+
+        Returns:
+            Percentile rank, looked up in the `AccumulativeScoreDistribution`
+        """
+        this_score = Participant.objects.values_list("total_final_score", flat=True).get(pk=self.pk)
+        n_without_score = Participant.objects.filter(total_final_score=0).count()
+        return percentile_rank_in_distribution(
+            AccumulativeScoreDistribution.objects.all(),
+            accumulative_score_bucket(this_score),
+            extra_counts={0.0: n_without_score},
+        )
 
     def result_count(self) -> int:
         """Get the total number of results
@@ -191,3 +262,88 @@ class Participant(models.Model):
         """
         question_keys = question_list.questions.values_list('key')
         return self.result_set.all().filter(question_key__in=question_keys).aggregate(Sum("score"))['score__sum']
+
+
+def accumulative_score_bucket(score: float) -> float:
+    """Bucket of `score` in the `AccumulativeScoreDistribution`, so scores which only differ by rounding errors are
+    counted together
+    """
+    return round(score, ACCUMULATIVE_SCORE_DECIMALS)
+
+
+class AccumulativeScoreDistributionManager(models.Manager):
+
+    def add(self, score: float, amount: int = 1):
+        """Atomically add `amount` participants (may be negative) to the bucket of `score`.
+        Participants with a score of 0 are not stored, but counted when ranking.
+        Removing participants from a bucket which does not hold them means the distribution is out of sync,
+        e.g. after scores were changed with `update()`; this is logged, and left to `backfillaccumulativescores`
+        to repair
+        """
+        if not score:
+            return
+        buckets = self.filter(score=accumulative_score_bucket(score))
+        if amount < 0:
+            if not buckets.filter(count__gte=-amount).update(count=F("count") + amount):
+                logger.warning(
+                    "Accumulative score distribution has less than %d participant(s) with score %s, "
+                    "run `backfillaccumulativescores` to repair it",
+                    -amount,
+                    score,
+                )
+            return
+        if buckets.update(count=F("count") + amount):
+            return
+        try:
+            with transaction.atomic():
+                self.create(score=accumulative_score_bucket(score), count=amount)
+        except IntegrityError:
+            # another process created the bucket in the meantime
+            buckets.update(count=F("count") + amount)
+
+    def expected_counts(self) -> Counter:
+        """Number of participants per bucket, computed from `Participant.total_final_score`"""
+        rows = Participant.objects.exclude(total_final_score=0).values("total_final_score").annotate(n=Count("id"))
+        counts = Counter()
+        for row in rows.order_by().iterator():
+            counts[accumulative_score_bucket(row["total_final_score"])] += row["n"]
+        return counts
+
+    def rebuild(self) -> int:
+        """Recompute the distribution from `Participant.total_final_score`
+
+        Returns:
+            number of buckets written
+        """
+        counts = self.expected_counts()
+        with transaction.atomic():
+            self.all().delete()
+            created = self.bulk_create(AccumulativeScoreDistribution(score=score, count=n) for score, n in counts.items())
+        return len(created)
+
+
+def remove_from_accumulative_distribution(sender, instance: Participant, **kwargs):
+    """Signal receiver removing a participant which is about to be deleted from the `AccumulativeScoreDistribution`"""
+    score = Participant.objects.values_list("total_final_score", flat=True).filter(pk=instance.pk).first()
+    if score is not None:
+        AccumulativeScoreDistribution.objects.add(score, amount=-1)
+
+
+class AccumulativeScoreDistribution(models.Model):
+    """Number of participants per accumulative score (`Participant.total_final_score`),
+    so the accumulative percentile rank can be computed without aggregating all sessions.
+    Participants with a score of 0 are not stored, but counted when ranking.
+    Use the `backfillaccumulativescores` management command to check or (re)build it.
+
+    Attributes:
+        score (float): an accumulative score, rounded with `accumulative_score_bucket`
+        count (int): number of participants with this accumulative score
+    """
+
+    score = models.FloatField(unique=True)
+    count = models.IntegerField(default=0)
+
+    objects = AccumulativeScoreDistributionManager()
+
+    def __str__(self):
+        return f"{self.score} ({self.count})"
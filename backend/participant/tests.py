@@ -3,7 +3,7 @@ from django.utils import timezone
 
 from django.test import Client, TestCase
 from experiment.models import Block
-from participant.models import Participant
+from participant.models import AccumulativeScoreDistribution, Participant
 from participant.utils import get_participant, PARTICIPANT_KEY
 from question.models import QuestionList
 from question.banks import get_question_bank
@@ -247,6 +247,72 @@ class ParticipantTest(TestCase):
         )  # 2 participants lower or equal, 10 zero (no sessions), 1 equal, 13 total
         self.assertAlmostEqual(perc_acc, expected)
 
+    def test_accumulative_score_follows_sessions(self):
+        other_participant = Participant.objects.create()
+        Session.objects.create(block=self.block, participant=other_participant, final_score=20)
+        session = Session.objects.create(block=self.block, participant=self.participant)
+        session.final_score = 5
+        session.save()
+        session.finish(final_score=10)
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.total_final_score, 5)
+        session.final_score = 30
+        session.save()
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.total_final_score, 30)
+        # 2 participants lower or equal, 1 equal, 2 total
+        self.assertEqual(self.participant.percentile_rank_accumulative_score(), 75.0)
+
+    def test_accumulative_score_on_delete(self):
+        other_participant = Participant.objects.create()
+        sessions = [
+            Session.objects.create(block=self.block, participant=other_participant, final_score=score)
+            for score in [10, 20]
+        ]
+        Session.objects.create(block=self.block, participant=self.participant, final_score=20)
+        sessions[0].delete()
+        other_participant.refresh_from_db()
+        self.assertEqual(other_participant.total_final_score, 20)
+        self.assertEqual(AccumulativeScoreDistribution.objects.get(score=20).count, 2)
+        other_participant.delete()
+        self.assertEqual(AccumulativeScoreDistribution.objects.get(score=20).count, 1)
+        self.assertEqual(self.participant.percentile_rank_accumulative_score(), 50.0)
+
+    def test_accumulative_score_distribution_out_of_sync(self):
+        session = Session.objects.create(block=self.block, participant=self.participant, final_score=10)
+        # updates bypass `save`, so the distribution has no bucket for this score
+        Participant.objects.filter(pk=self.participant.pk).update(total_final_score=15)
+        session.final_score = 20
+        with self.assertLogs('participant.models', level='WARNING'):
+            session.save()
+        self.assertEqual(Participant.objects.get(pk=self.participant.pk).total_final_score, 25)
+        # repair is left to `backfillaccumulativescores`
+        self.assertEqual(
+            dict(AccumulativeScoreDistribution.objects.filter(count__gt=0).values_list('score', 'count')),
+            {10: 1, 25: 1},
+        )
+
+    def test_accumulative_score_distribution_without_score(self):
+        with self.assertNumQueries(1):
+            Participant.objects.create()
+        Participant.objects.bulk_create([Participant() for p in range(3)])
+        self.assertFalse(AccumulativeScoreDistribution.objects.exists())
+        Session.objects.create(block=self.block, participant=self.participant, final_score=10)
+        self.assertEqual(dict(AccumulativeScoreDistribution.objects.values_list('score', 'count')), {10: 1})
+        # 4 participants without score lower, 1 equal, 5 total
+        self.assertEqual(self.participant.percentile_rank_accumulative_score(), 90.0)
+
+    def test_accumulative_score_buckets(self):
+        other_participant = Participant.objects.create()
+        Session.objects.bulk_create(
+            [Session(block=self.block, participant=other_participant, final_score=score) for score in [0.1, 0.2]]
+        )
+        Session.objects.create(block=self.block, participant=self.participant, final_score=0.3)
+        other_participant.refresh_from_db()
+        self.assertNotEqual(other_participant.total_final_score, 0.3)
+        self.assertEqual(dict(AccumulativeScoreDistribution.objects.values_list('score', 'count')), {0.3: 2})
+        self.assertEqual(self.participant.percentile_rank_accumulative_score(), 50.0)
+
     def _create_sessions(self, participant: Participant, n_sessions: int):
         Session.objects.bulk_create(
             [
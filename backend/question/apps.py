@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class QuestionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'question'
+
+    def ready(self):
+        from question.choices import invalidate_choice_lists
+        from question.models import Choice, ChoiceList
+
+        for model in [ChoiceList, Choice]:
+            post_save.connect(invalidate_choice_lists, sender=model, dispatch_uid=f'invalidate_choices_{model.__name__}')
+            post_delete.connect(invalidate_choice_lists, sender=model, dispatch_uid=f'invalidate_choices_{model.__name__}')
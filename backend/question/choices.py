@@ -0,0 +1,71 @@
+"""Process-wide registry of choice lists, so converting questions to actions does not query their choices.
+
+All choice lists are loaded at once, with the texts of their choices in every language, the first time choices are
+requested. Saving or deleting a choice list or choice bumps a version in the cache once the change is committed,
+after which each process reloads its registry. As with the serialized content cache, processes which do not share the cache reload after
+SERIALIZED_CONTENT_CACHE_TIMEOUT seconds.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from experiment.cache import bump_version, get_version
+from .models import ChoiceList
+
+CHOICE_LISTS_VERSION_KEY = "choice_lists_version"
+
+_registry = {"version": None, "loaded_at": 0.0, "choice_lists": {}}
+# threads of a process share the registry, and load it once when it is outdated
+_registry_lock = threading.Lock()
+
+
+def get_choice_lists_version() -> int:
+    """
+    Returns:
+        the current version of the choice lists
+    """
+    return get_version(CHOICE_LISTS_VERSION_KEY)
+
+
+def invalidate_choice_lists(**kwargs):
+    """Signal receiver which bumps the version of the choice lists, so all processes reload them"""
+    bump_version(CHOICE_LISTS_VERSION_KEY)
+
+
+def _get_registry() -> dict:
+    version = get_choice_lists_version()
+    with _registry_lock:
+        now = time.monotonic()
+        if (
+            _registry["version"] != version
+            or now - _registry["loaded_at"] > settings.SERIALIZED_CONTENT_CACHE_TIMEOUT
+        ):
+            # the choices hold their texts in all languages, the translated `text` is picked when they are used
+            _registry["choice_lists"] = {
+                choice_list.key: tuple(choice_list.choices.all())
+                for choice_list in ChoiceList.objects.prefetch_related("choices")
+            }
+            _registry["version"] = version
+            _registry["loaded_at"] = now
+        return _registry["choice_lists"]
+
+
+def get_choices(key: str) -> list[dict]:
+    """Get the choices of a choice list in the active language, in the format of `ChoiceList.to_dict`
+
+    Args:
+        key: the key of the choice list
+
+    Returns:
+        list of dictionaries with the `value`, `label` and `color` of each choice
+
+    Raises:
+        ChoiceList.DoesNotExist: if no choice list with this key exists
+    """
+    try:
+        choices = _get_registry()[key]
+    except KeyError:
+        raise ChoiceList.DoesNotExist(f"ChoiceList with key {key} does not exist.")
+    return [{'value': choice.key, 'label': choice.text, 'color': choice.color} for choice in choices]
@@ -80,8 +80,11 @@ class Question(models.Model):
     def convert_to_action(self) -> QuestionAction:
         """convert this Question instance to a serializable `experiment.question.action`"""
         question_type = getattr(question, self.type)
-        if self.choices:
-            choices = self.choices.to_dict()
+        if self.choices_id:
+            # imported here, as the registry module imports this one
+            from question.choices import get_choices
+
+            choices = get_choices(self.choices_id)
             question_action = question_type(
                 key=self.key, text=self.text, choices=choices
             )
@@ -1,10 +1,12 @@
 from django.test import TestCase
+from django.utils import translation
 
 from experiment.models import Block
 from participant.models import Participant
 from result.models import Result
-from question.models import Question, QuestionInList, QuestionList
-from question.utils import get_unanswered_questions
+from question.choices import get_choices
+from question.models import Choice, ChoiceList, Question, QuestionInList, QuestionList
+from question.utils import get_unanswered_questions, plan_profile_questions
 
 
 class UtilsTestCase(TestCase):
@@ -13,7 +15,7 @@ class UtilsTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.participant = Participant.objects.create(unique_hash=42)
-        block = Block.objects.create(rules='RHYTHM_BATTERY_INTRO', slug='test')
+        cls.block = block = Block.objects.create(rules='RHYTHM_BATTERY_INTRO', slug='test')
         cls.result = Result.objects.create(
             participant=cls.participant,
             question_key='dgf_gender_identity',
@@ -59,3 +61,40 @@ class UtilsTestCase(TestCase):
         )
         with self.assertRaises(StopIteration):
             question = next(question_iterator)
+
+    def test_plan_profile_questions(self):
+        # an unanswered result is reused, the answered question is skipped
+        prepared = Result.objects.create(participant=self.participant, question_key='dgf_generation')
+        # load the choice lists, which questions get from the registry
+        get_choices('GENERATION')
+        with self.assertNumQueries(3):
+            planned = plan_profile_questions(self.participant, self.block)
+            self.assertEqual([question.key for question, _ in planned], ['dgf_country_of_origin', 'dgf_generation'])
+            actions = [question.convert_to_action() for question, _ in planned]
+        self.assertEqual(actions[0].key, 'dgf_country_of_origin')
+        self.assertEqual(planned[1][1], prepared)
+        self.assertEqual(planned[0][1].question_key, 'dgf_country_of_origin')
+        self.assertEqual(Result.objects.filter(participant=self.participant).count(), 3)
+        # planning again creates no new results
+        planned = plan_profile_questions(self.participant, self.block, n_questions=1)
+        self.assertEqual(len(planned), 1)
+        self.assertEqual(Result.objects.filter(participant=self.participant).count(), 3)
+
+    def test_get_choices(self):
+        choices = get_choices('GENERATION')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_choices('GENERATION'), choices)
+        with self.assertRaises(ChoiceList.DoesNotExist):
+            get_choices('NON_EXISTING')
+        # editing a choice list reloads the registry, once the change is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            choice_list = ChoiceList.objects.create(key='TEST_CHOICES')
+            Choice.objects.create(choicelist=choice_list, key='yes', text='Yes', text_nl='Ja', index=0)
+            with self.assertRaises(ChoiceList.DoesNotExist):
+                get_choices('TEST_CHOICES')
+        self.assertEqual(get_choices('TEST_CHOICES'), [{'value': 'yes', 'label': 'Yes', 'color': ''}])
+        with translation.override('nl'):
+            self.assertEqual(get_choices('TEST_CHOICES')[0]['label'], 'Ja')
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.filter(choicelist=choice_list).delete()
+        self.assertEqual(get_choices('TEST_CHOICES'), [])
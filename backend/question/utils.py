@@ -1,7 +1,12 @@
-from typing import Generator
+import random
+from typing import Generator, Optional
 
 from django.db.models import Model, QuerySet
 
+from result.models import Result
+
+from .models import Question, QuestionInList
+
 
 def get_unanswered_questions(participant: Model, question_set: QuerySet) -> Generator:
     """Return next unasked profile question and prepare its result
@@ -19,3 +24,58 @@ def get_unanswered_questions(participant: Model, question_set: QuerySet) -> Gene
         if question_obj.key in keys_answered:
             continue
         yield question_obj
+
+
+def plan_profile_questions(
+    participant: Model, block: Model, n_questions: Optional[int] = None
+) -> list[tuple[Question, Result]]:
+    """Plan the next unanswered profile questions of a block's question lists, and prepare their results.
+    The questions are loaded in one query, shuffled in Python for randomized question lists,
+    and the profile results which do not exist yet are created with a single bulk insert
+
+    Args:
+        participant (Participant): participant who will answer the questions
+        block (Block): block with the question lists to ask
+        n_questions: maximum number of questions, `None` to plan all unanswered questions
+
+    Returns:
+        unanswered questions, in the order of the question lists, each with its prepared profile result
+    """
+    questions_in_lists = (
+        QuestionInList.objects.filter(questionlist__block=block)
+        .select_related("questionlist", "question")
+        .order_by("questionlist__index", "questionlist_id", "index")
+    )
+    question_lists = {}
+    for question_in_list in questions_in_lists:
+        question_lists.setdefault(question_in_list.questionlist, []).append(question_in_list.question)
+
+    keys = {question.key for questions in question_lists.values() for question in questions}
+    keys_answered = set()
+    unanswered_results = {}
+    for result in participant.result_set.filter(question_key__in=keys):
+        if result.given_response is not None:
+            keys_answered.add(result.question_key)
+        else:
+            unanswered_results.setdefault((result.question_key, result.scoring_rule), result)
+
+    planned = []
+    for question_list, questions in question_lists.items():
+        if question_list.randomize:
+            random.shuffle(questions)
+        planned += [question for question in questions if question.key not in keys_answered]
+    if n_questions is not None:
+        planned = planned[:n_questions]
+
+    new_results = {}
+    for question in planned:
+        lookup = (question.key, question.profile_scoring_rule)
+        if lookup not in unanswered_results and lookup not in new_results:
+            new_results[lookup] = Result(
+                question_key=question.key, participant=participant, scoring_rule=question.profile_scoring_rule
+            )
+    Result.objects.bulk_create(new_results.values())
+    unanswered_results.update(new_results)
+    return [
+        (question, unanswered_results[(question.key, question.profile_scoring_rule)]) for question in planned
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # build the index without locking the result table for writes
+    atomic = False
+
+    dependencies = [
+        ('result', '0006_remove_result_old_data'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='result',
+                    name='created_at',
+                    field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+                ),
+            ],
+            # the index Django would create for `db_index=True`, built concurrently
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE INDEX CONCURRENTLY IF NOT EXISTS "result_result_created_at_8037227e" '
+                    'ON "result_result" ("created_at");',
+                    'DROP INDEX CONCURRENTLY IF EXISTS "result_result_created_at_8037227e";',
+                ),
+            ],
+        ),
+    ]
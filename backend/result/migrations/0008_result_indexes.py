@@ -0,0 +1,44 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:46
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # build the indexes without locking the result table for writes
+    atomic = False
+
+    dependencies = [
+        ('result', '0007_alter_result_created_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(fields=['session', 'created_at'], name='result_session_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(fields=['session', 'question_key', '-created_at'], name='result_session_key_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(fields=['participant', 'question_key'], name='result_participant_key'),
+        ),
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(condition=models.Q(('section__isnull', False)), fields=['question_key', 'section'], name='result_key_section'),
+        ),
+        # the new indexes start with these columns, so their own indexes are no longer needed
+        migrations.AlterField(
+            model_name='result',
+            name='participant',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='participant.participant'),
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='session',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='session.session'),
+        ),
+    ]
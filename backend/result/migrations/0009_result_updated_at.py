@@ -0,0 +1,26 @@
+# Generated by Django 6.0.5 on 2026-10-18 20:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # build the index without locking the result table for writes
+    atomic = False
+
+    dependencies = [
+        ('result', '0008_result_indexes'),
+    ]
+
+    operations = [
+        # nullable, so existing rows are not rewritten
+        migrations.AddField(
+            model_name='result',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(fields=['updated_at'], name='result_updated_at'),
+        ),
+    ]
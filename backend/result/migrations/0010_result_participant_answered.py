@@ -0,0 +1,22 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # build the index without locking the result table for writes
+    atomic = False
+
+    dependencies = [
+        ('result', '0009_result_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='result',
+            index=models.Index(
+                condition=models.Q(('given_response__isnull', False)),
+                fields=['participant', 'question_key'],
+                name='result_participant_answered',
+            ),
+        ),
+    ]
@@ -16,6 +16,7 @@ class Result(models.Model):
         participant (Optional[Participant]): participant for which this result will be registered
         section (Optional[Section]): a section tied to the result, usually applicable for Trials with Playback
         created_at (datetime): a timestamp, set automatically at creation time
+        updated_at (datetime): a timestamp, set automatically whenever the result is saved; empty for results which were not saved since this field was added
         question_key (str): a description by which to identify the result during analysis
         expected_response (str): if there is a correct response for a given Trial, it can be logged here
         given_response (str): set as a result of the participant's response
@@ -26,17 +27,19 @@ class Result(models.Model):
 
     """
 
+    # the composite indexes in Meta, which start with these fields, also serve lookups by session or participant
     session = models.ForeignKey(
-        'session.Session', on_delete=models.CASCADE, blank=True, null=True
+        'session.Session', on_delete=models.CASCADE, blank=True, null=True, db_index=False
     )
     participant = models.ForeignKey(
-        'participant.Participant', on_delete=models.CASCADE, blank=True, null=True
+        'participant.Participant', on_delete=models.CASCADE, blank=True, null=True, db_index=False
     )
     section = models.ForeignKey(
         'section.Section', on_delete=models.SET_NULL, null=True, blank=True
     )
 
-    created_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(db_index=True, default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
     # Key of the question e.g.: AGE
     question_key = models.CharField(max_length=64, default='')
     expected_response = models.CharField(max_length=100, blank=True, null=True)
@@ -55,6 +58,26 @@ class Result(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # all results of a session in order (Session.cached_results, exports)
+            models.Index(fields=['session', 'created_at'], name='result_session_created'),
+            # the latest results of a session with a question key
+            models.Index(fields=['session', 'question_key', '-created_at'], name='result_session_key_created'),
+            # profile results of a participant, answered or prepared
+            models.Index(fields=['participant', 'question_key'], name='result_participant_key'),
+            # answered profile results of a participant (Participant.profile_results, consent)
+            models.Index(
+                fields=['participant', 'question_key'],
+                name='result_participant_answered',
+                condition=models.Q(given_response__isnull=False),
+            ),
+            # results modified since the previous incremental export
+            models.Index(fields=['updated_at'], name='result_updated_at'),
+            # results with a question key across sessions, e.g. the most liked songs
+            models.Index(
+                fields=['question_key', 'section'], name='result_key_section', condition=models.Q(section__isnull=False)
+            ),
+        ]
 
     def save_json_data(self, data: dict):
         """Merge data with json_data, overwriting duplicate keys.
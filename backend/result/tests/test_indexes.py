@@ -0,0 +1,102 @@
+import random
+from collections import Counter
+
+from django.db import connection
+from django.test import TestCase
+
+from experiment.models import Block
+from participant.models import Participant
+from result.models import Result
+from section.models import Playlist, Section
+from session.models import Session
+
+N_SESSIONS = 300
+N_PROFILE_KEYS = 40
+N_QUESTION_KEYS = 20
+
+
+class ResultIndexTest(TestCase):
+    """Check with EXPLAIN that the frequent result queries use their index on a large result table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        block = Block.objects.create(slug='index-test')
+        playlist = Playlist.objects.create(name='index-test')
+        sections = Section.objects.bulk_create([Section(playlist=playlist) for _ in range(50)])
+        participants = Participant.objects.bulk_create([Participant() for _ in range(N_SESSIONS)])
+        sessions = Session.objects.bulk_create(
+            [Session(block=block, participant=participant) for participant in participants]
+        )
+        results = [
+            Result(
+                session=session,
+                # most results are trials with a section, a few question keys are far more frequent than others
+                section=rng.choice(sections) if rng.random() < 0.8 else None,
+                question_key=f'key_{min(int(rng.expovariate(0.3)), N_QUESTION_KEYS - 1)}',
+                given_response='yes',
+            )
+            for session in sessions
+            # a few sessions are much longer than most
+            for _ in range(min(int(rng.paretovariate(1.2) * 20), 500))
+        ]
+        # profile questions are prepared for all participants, but most of them are never answered
+        results += [
+            Result(
+                participant=participant,
+                question_key=f'profile_{i}',
+                given_response='answer' if rng.random() < 0.2 else None,
+            )
+            for participant in participants
+            for i in range(N_PROFILE_KEYS)
+        ]
+        # store the results in no particular order, as they are after a while in production
+        rng.shuffle(results)
+        Result.objects.bulk_create(results)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Result._meta.db_table}')
+        cls.session = sessions[N_SESSIONS // 2]
+        cls.long_session = Counter(result.session for result in results if result.session).most_common(1)[0][0]
+        cls.participant = participants[N_SESSIONS // 2]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertNotIn(f'Seq Scan on {Result._meta.db_table}', plan)
+        self.assertIn(index_name, plan)
+
+    def test_session_results(self):
+        # for short sessions, any index on the session is as good
+        self.assertUsesIndex(
+            self.long_session.result_set.order_by('created_at', 'pk'), 'result_session_created'
+        )
+
+    def test_last_session_result_by_key(self):
+        self.assertUsesIndex(
+            self.session.result_set.filter(question_key='key_3').order_by('-created_at')[:1],
+            'result_session_key_created',
+        )
+
+    def test_answered_profile_results(self):
+        self.assertUsesIndex(
+            self.participant.profile_results().values_list('question_key', flat=True), 'result_participant_answered'
+        )
+        self.assertUsesIndex(
+            self.participant.profile_results().filter(question_key='profile_4'), 'result_participant_answered'
+        )
+
+    def test_profile_results(self):
+        self.assertUsesIndex(
+            self.participant.result_set.filter(question_key__in=['profile_1', 'profile_2']), 'result_participant_key'
+        )
+
+    def test_consent(self):
+        self.assertUsesIndex(
+            Result.objects.filter(participant=self.participant, question_key='consent', given_response='agreed'),
+            'result_participant_answered',
+        )
+
+    def test_results_with_sections_by_key(self):
+        self.assertUsesIndex(
+            Result.objects.filter(question_key='key_12', section__isnull=False).values('section'),
+            'result_key_section',
+        )
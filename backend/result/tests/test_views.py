@@ -1,7 +1,10 @@
 import json
 import logging
+from unittest.mock import patch
 
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from experiment.models import Block
 from participant.models import Participant
@@ -96,6 +99,36 @@ class ResultTest(TestCase):
         assert json_data.get('config') is not None
         assert json_data.get('decision_time') == 42
 
+    def test_handle_results_batched(self):
+        results = [
+            Result.objects.create(session=self.session, question_key=f'q{i}', scoring_rule='CORRECTNESS', expected_response='yes')
+            for i in range(5)
+        ]
+        profile_result = Result.objects.create(participant=self.participant, question_key='profile')
+        form = [{'key': r.question_key, 'value': 'yes', 'resultId': r.pk} for r in results]
+        form.append({'key': 'profile', 'value': 'blue', 'resultId': profile_result.pk})
+        with CaptureQueriesContext(connection) as few_answers:
+            handle_results({'form': form[:2], 'decision_time': 1}, self.session)
+        # loading and saving the results costs the same number of queries, however many answers there are
+        with self.assertNumQueries(len(few_answers.captured_queries)):
+            handle_results({'form': form, 'decision_time': 1}, self.session)
+        self.assertLessEqual(len(few_answers.captured_queries), 4)
+        for result in Result.objects.filter(session=self.session):
+            self.assertEqual((result.given_response, result.score), ('yes', 1))
+            self.assertEqual(result.json_data['decision_time'], 1)
+            self.assertIsNotNone(result.updated_at)
+        self.assertEqual(Result.objects.get(pk=profile_result.pk).given_response, 'blue')
+        # if one of the results does not exist, none of them is changed
+        form = [{'key': 'q0', 'value': 'no', 'resultId': results[0].pk}, {'key': 'gone', 'value': 'no', 'resultId': 424242}]
+        with self.assertRaises(Result.DoesNotExist):
+            handle_results({'form': form}, self.session)
+        self.assertEqual(Result.objects.get(pk=results[0].pk).given_response, 'yes')
+        # nor if one of them cannot be scored
+        form = [{'key': 'q0', 'value': 'no', 'resultId': results[0].pk}, {'key': 'profile', 'value': 'red', 'resultId': profile_result.pk}]
+        with patch('result.utils.apply_scoring_rule', side_effect=ValueError), self.assertRaises(ValueError):
+            handle_results({'form': form}, self.session)
+        self.assertEqual(Result.objects.get(pk=results[0].pk).given_response, 'yes')
+
     def test_score_view(self):
         request = {"session_id": self.session.id}
         response = self.client.post('/result/score/', request)
@@ -1,9 +1,14 @@
+import copy
 from typing import Any, Optional, Union
 
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
 from participant.models import Participant
 from question.models import Question
 from result.score import SCORING_RULES
-from session.models import Session
+from session.models import Session, bump_results_version
 
 from .models import Result
 from .score import ScoringData, LikertData, ChoiceData
@@ -28,6 +33,8 @@ def get_result(
     result_id = data.get("resultId")
     try:
         result = Result.objects.get(pk=result_id, session=session)
+        # saving the result will then also invalidate the session's cached results
+        result.session = session
     except Result.DoesNotExist:
         # check if a profile type result exists
         try:
@@ -37,9 +44,39 @@ def get_result(
     return result
 
 
+def get_results(session: Session, form: list[dict]) -> dict[int, Result]:
+    """Retrieve the results referred to by the elements of a form with a single query,
+    either results of `session`, or profile results tied to `session.participant`
+
+    Args:
+        session: the `Session` object for which to retrieve the results
+        form: a list of dictionaries with `resultId`, `value` and optional other keys
+
+    Returns:
+        a dictionary of `Result` objects by id
+
+    Raises:
+        Result.DoesNotExist: if a form element has no `resultId`, or a result with that id does not exist
+    """
+    result_ids = [form_element.get("resultId") for form_element in form]
+    results = Result.objects.filter(
+        Q(session=session) | Q(participant_id=session.participant_id), pk__in=[pk for pk in result_ids if pk is not None]
+    ).in_bulk()
+    missing = [pk for pk in result_ids if pk not in results]
+    if missing:
+        raise Result.DoesNotExist(f"Results {missing} do not exist for session {session.id}")
+    for result in results.values():
+        if result.session_id == session.id:
+            # let the rules work with, and change, the session instance which is handled
+            result.session = session
+    return results
+
+
 def handle_results(data: dict, session: Session):
     """
-    Given the data from the frontend, go through the `form` array and retrieve and score results
+    Given the data from the frontend, go through the `form` array and retrieve and score results.
+    The results are loaded with one query, scored in memory and saved with one bulk update of the fields which changed,
+    in a single transaction, so none of them is changed if one of them cannot be found or scored
 
     Args:
         data: the data passed from the frontend
@@ -52,14 +89,38 @@ def handle_results(data: dict, session: Session):
         form = data.pop("form")
     except KeyError:
         raise KeyError('No `form` found in request data')
-    for form_element in form:
-        result = get_result(session, form_element)
-        # save relevant data such as config and decision time (except for the popped form)
-        result.save_json_data(data)
-        result.save()
-        result = score_result(
-            form_element, session
-        )  # TODO: raise Exceptions from underlying score functions
+    with transaction.atomic():
+        results = get_results(session, form)
+        loaded = {pk: _field_values(result) for pk, result in results.items()}
+        for form_element in form:
+            result = results[form_element["resultId"]]
+            # save relevant data such as config and decision time (except for the popped form)
+            result.json_data.update(data)
+            apply_response(result, form_element, session)  # TODO: raise Exceptions from underlying score functions
+        # save every field the rules set, which may be more than the response and score
+        changed = {
+            name
+            for pk, result in results.items()
+            for name, value in _field_values(result).items()
+            if value != loaded[pk][name]
+        }
+        if changed:
+            now = timezone.now()
+            for result in results.values():
+                result.updated_at = now
+            fields = [field.name for field in Result._meta.concrete_fields if field.attname in changed]
+            Result.objects.bulk_update(results.values(), fields + ["updated_at"])
+    # bulk updates do not send the signals which keep the cached results of the session up to date
+    bump_results_version(session.id)
+
+
+def _field_values(result: Result) -> dict:
+    """Copy the values of the fields of a result, to find out which fields changed"""
+    return {
+        field.attname: copy.deepcopy(getattr(result, field.attname))
+        for field in Result._meta.concrete_fields
+        if not field.primary_key
+    }
 
 
 def prepare_profile_result(
@@ -121,6 +182,34 @@ def prepare_result(
     return result.id
 
 
+def apply_response(
+    result: Result, data: Union[ScoringData, LikertData, ChoiceData], session: Session
+):
+    """Populate the `json_data`, `given_response`, and `score` fields of a result from the frontend's `form` data,
+    without saving it
+
+    Args:
+        result: the `Result` object to populate
+        data: a dictionary with `result_id`, `value` and optional other keys
+        session: the session for which the result is registered
+    """
+    result.json_data.update(data)
+    result.given_response = data.get("value")
+    # Calculate score: by default, apply a scoring rule
+    # Can be overridden by defining calculate_score in the rules file
+    if result.session_id:
+        state = (copy.deepcopy(session.json_data), session.final_score)
+        score = session.block_rules().calculate_score(result, data)
+        if (session.json_data, session.final_score) != state:
+            # refresh session data, as it was changed within calculate_score function
+            session.refresh_from_db()
+    else:
+        # this is a profile type result, i.e., it doesn't have a session:
+        score = apply_scoring_rule(result, data)
+    # result can also be None
+    result.score = score
+
+
 def score_result(
     data: Union[ScoringData, LikertData, ChoiceData], session: Session
 ) -> Result:
@@ -136,20 +225,7 @@ def score_result(
         the retrieved and modified `Result` object
     """
     result = get_result(session, data)
-    result.save_json_data(data)
-    result.given_response = data.get("value")
-    # Calculate score: by default, apply a scoring rule
-    # Can be overridden by defining calculate_score in the rules file
-    if result.session:
-        score = session.block_rules().calculate_score(result, data)
-        # refresh session data in case anything was changed within calculate_score function
-        session.refresh_from_db()
-    else:
-        # this is a profile type result, i.e., it doesn't have a session:
-        score = apply_scoring_rule(result, data)
-    # Populate and save the result
-    # result can also be None
-    result.score = score
+    apply_response(result, data, session)
     result.save()
     return result
 
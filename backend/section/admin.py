@@ -13,10 +13,10 @@ from django.conf import settings
 from django.urls import path, reverse
 from django.utils.translation import gettext_lazy as _
 
-import audioread
 import sys
 
 from .models import Section, Playlist, Song
+from .audio_metadata import get_audio_metadata, normalize_path, scan_audio_files
 from .forms import AddSections, PlaylistAdminForm
 from .utils import get_or_create_song
 
@@ -70,10 +70,27 @@ def playlist_export(modeladmin, request, queryset: QuerySet[Playlist]):
         return response
 
 
+@admin.action(description="Render trimmed audio of the sections of selected playlists")
+def playlist_render_sections(modeladmin, request, queryset: QuerySet[Playlist]):
+    # rendering takes far longer than a request may, so it is left to the management command
+    playlist_options = " ".join(f"--playlist {playlist.pk}" for playlist in queryset)
+    messages.add_message(
+        request,
+        messages.INFO,
+        f"To render the sections of the selected playlists, run `scripts/manage rendersections {playlist_options}` "
+        "on the server",
+    )
+
+
+def _is_local_audio(playlist: Playlist, section: Section) -> bool:
+    """Whether the audio file of a section is stored in the upload folder"""
+    return not playlist.url_prefix and not str(section.filename).startswith("http")
+
+
 class PlaylistAdmin(InlineActionsModelAdminMixin, admin.ModelAdmin):
     form = PlaylistAdminForm
     change_form_template = "change_form.html"
-    actions = [playlist_export]
+    actions = [playlist_export, playlist_render_sections]
     list_display = ("name", "_section_count", "_block_count")
     search_fields = ["name", "section__song__artist", "section__song__name"]
     inline_actions = ["add_sections", "edit_sections", "export_csv"]
@@ -133,9 +150,7 @@ class PlaylistAdmin(InlineActionsModelAdminMixin, admin.ModelAdmin):
                     song = get_or_create_song(this_artist, this_name)
                 new_section.song = song
 
-                file_path = join(settings.MEDIA_ROOT, str(new_section.filename))
-                with audioread.audio_open(file_path) as f:
-                    new_section.duration = f.duration
+                new_section.duration = get_audio_metadata(str(new_section.filename)).duration
                 new_section.save()
 
             obj.save()
@@ -155,6 +170,12 @@ class PlaylistAdmin(InlineActionsModelAdminMixin, admin.ModelAdmin):
         sections = Section.objects.filter(playlist=obj)
         # Get form data for each section in the playlist
         if "_update" in request.POST:
+            # while running tests this would throw an error
+            if "test" not in sys.argv:
+                # probe only the audio files which changed since they were last probed
+                metadata = scan_audio_files(
+                    str(section.filename) for section in sections if _is_local_audio(obj, section)
+                )
             for section in sections:
                 # Create pre fix to get the right section fields
                 pre_fix = str(section.id)
@@ -172,13 +193,9 @@ class PlaylistAdmin(InlineActionsModelAdminMixin, admin.ModelAdmin):
 
                 new_duration = float(request.POST.get(pre_fix + "_duration"))
                 # while running tests this would throw an error
-                if "test" not in sys.argv:
+                if "test" not in sys.argv and _is_local_audio(obj, section):
                     # Check if the duration in the csv exceeds the actual duration of the audio file
-                    file_path = join(settings.MEDIA_ROOT, str(section.filename))
-
-                    # while running tests this would throw an error
-                    with audioread.audio_open(file_path) as f:
-                        actual_duration = f.duration
+                    actual_duration = metadata[normalize_path(section.filename)].duration
                     if new_duration > actual_duration:
                         # Add or edit this row, but show an error message containing the actual saved duration
                         section.duration = actual_duration
@@ -0,0 +1,105 @@
+"""Catalog of audio file properties (duration, sample rate, channels, ...), shared by the playlist admin and `compileplaylist`.
+
+Probing an audio file means decoding its header with audioread, which may start an ffmpeg process.
+Probed properties are stored as `AudioMetadata`, together with the size and modification time of the file,
+so a file is only probed again when it changed. Files which need probing are probed in a pool of processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os.path import join, splitext
+from typing import Iterable, Optional
+
+import audioread
+from django.conf import settings
+
+from .models import AudioMetadata
+
+AUDIO_METADATA_FIELDS = ["size", "mtime_ns", "duration", "sample_rate", "channels", "format"]
+
+
+def normalize_path(path: str) -> str:
+    """
+    Returns:
+        the path relative to MEDIA_ROOT, as stored in the catalog
+    """
+    return str(path).lstrip("/")
+
+
+def probe_audio_file(path: str) -> dict:
+    """Read the properties of an audio file. Runs in a worker process
+
+    Args:
+        path: path of the file, relative to MEDIA_ROOT
+
+    Returns:
+        a dictionary with the `AudioMetadata` fields
+    """
+    file_path = join(settings.MEDIA_ROOT, path)
+    stat = os.stat(file_path)
+    with audioread.audio_open(file_path) as f:
+        duration, sample_rate, channels = f.duration, f.samplerate, f.channels
+    return {
+        "path": path,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "duration": duration,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "format": splitext(path)[1].lstrip(".").lower(),
+    }
+
+
+def scan_audio_files(
+    paths: Iterable[str], processes: Optional[int] = None, batch_size: int = 1000
+) -> dict[str, AudioMetadata]:
+    """Get the metadata of audio files from the catalog, probing files which are new or changed since they were probed
+
+    Args:
+        paths: paths of the files, relative to MEDIA_ROOT
+        processes: number of files to probe in parallel, defaults to the number of CPUs
+        batch_size: number of catalog entries to read or write per query
+
+    Returns:
+        a dictionary of `AudioMetadata` objects by path
+
+    Raises:
+        OSError: if a file does not exist
+        audioread.DecodeError: if a file cannot be read as audio
+    """
+    paths = list(dict.fromkeys(normalize_path(path) for path in paths))
+    catalog = {}
+    for i in range(0, len(paths), batch_size):
+        catalog.update(AudioMetadata.objects.in_bulk(paths[i:i + batch_size], field_name="path"))
+
+    stale = []
+    for path in paths:
+        stat = os.stat(join(settings.MEDIA_ROOT, path))
+        entry = catalog.get(path)
+        if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+            stale.append(path)
+    if not stale:
+        return catalog
+
+    if processes == 1 or len(stale) == 1:
+        probed = [probe_audio_file(path) for path in stale]
+    else:
+        # workers only read files: they leave the database connections they inherit alone, and forked workers exit
+        # without closing them, so unlike closing them first this also works within a transaction
+        with ProcessPoolExecutor(processes) as pool:
+            probed = list(pool.map(probe_audio_file, stale, chunksize=16))
+
+    entries = AudioMetadata.objects.bulk_create(
+        [AudioMetadata(**properties) for properties in probed],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["path"],
+        update_fields=AUDIO_METADATA_FIELDS + ["scanned_at"],
+    )
+    catalog.update((entry.path, entry) for entry in entries)
+    return catalog
+
+
+def get_audio_metadata(path: str) -> AudioMetadata:
+    """Get the metadata of a single audio file from the catalog, probing it if it is new or changed"""
+    return scan_audio_files([path], processes=1)[normalize_path(path)]
@@ -0,0 +1,59 @@
+import time
+from glob import glob
+from os.path import join
+
+import audioread
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from section.audio_metadata import scan_audio_files
+from section.models import AudioMetadata
+
+
+def _probe_sequentially(paths: list[str]) -> float:
+    """Probe every file, one after the other, as was done before the catalog"""
+    total = 0.0
+    for path in paths:
+        with audioread.audio_open(join(settings.MEDIA_ROOT, path)) as f:
+            total += f.duration
+    return total
+
+
+class Command(BaseCommand):
+    """Command for comparing probing audio files one by one with scanning them into the audio metadata catalog
+    Usage: python manage.py benchmarkaudiometadata path/relative/to/upload/folder"""
+
+    help = 'Compare the duration of probing audio files sequentially, and of a cold and a warm catalog scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory',
+                            type=str,
+                            help="Directory of audio files, relative to upload folder")
+        parser.add_argument('--processes',
+                            type=int,
+                            default=None,
+                            help="Number of audio files to probe in parallel (default: number of CPUs)")
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        playlist_dir = join(settings.MEDIA_ROOT, directory)
+        paths = [
+            join(directory, audio_file)
+            for pattern in ('**/*.wav', '**/*.mp3')
+            for audio_file in glob(pattern, root_dir=playlist_dir, recursive=True)
+        ]
+        self.stdout.write(f'{len(paths)} audio files')
+
+        start = time.perf_counter()
+        _probe_sequentially(paths)
+        self.stdout.write(f'sequential probing: {time.perf_counter() - start:.2f} s')
+
+        # the cold scan probes all files again, and leaves the catalog up to date
+        AudioMetadata.objects.filter(path__in=paths).delete()
+        start = time.perf_counter()
+        scan_audio_files(paths, options['processes'])
+        self.stdout.write(f'catalog scan, cold: {time.perf_counter() - start:.2f} s')
+
+        start = time.perf_counter()
+        scan_audio_files(paths, options['processes'])
+        self.stdout.write(f'catalog scan, warm: {time.perf_counter() - start:.2f} s')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from section.play_counts import flush_play_counts
+
+
+class Command(BaseCommand):
+    """Command for adding the section plays counted in the cache to the database
+    Usage: python manage.py flushplaycounts [--all]"""
+
+    help = 'Add the section plays buffered in the cache to the play counts of the sections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk_size',
+                            type=int,
+                            default=1000,
+                            help="Number of sections to read from the cache at once")
+        parser.add_argument('--all',
+                            action='store_true',
+                            help="Read the plays of all sections, not only of those played since the last flush")
+
+    def handle(self, *args, **options):
+        n_plays = flush_play_counts(options['chunk_size'], all_sections=options['all'])
+        self.stdout.write(self.style.SUCCESS(f'Flushed {n_plays} play(s)'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from section.models import Section
+from section.renditions import render_sections
+
+
+class Command(BaseCommand):
+    """Command for rendering trimmed, loudness-normalized audio files of sections
+    Usage: python manage.py rendersections [--playlist playlist_id] [--processes 4] [--force]"""
+
+    help = 'Render the part of the audio file each section plays into a compressed rendition'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--playlist',
+                            type=int,
+                            action='append',
+                            help="Id of a playlist of which to render the sections (default: all playlists)")
+        parser.add_argument('--processes',
+                            type=int,
+                            default=None,
+                            help="Number of ffmpeg processes to run in parallel (default: number of CPUs)")
+        parser.add_argument('--force',
+                            action='store_true',
+                            help="Render again, even if a rendition exists already")
+
+    def handle(self, *args, **options):
+        sections = Section.objects.all()
+        if options['playlist']:
+            sections = sections.filter(playlist_id__in=options['playlist'])
+        report = render_sections(sections, options['processes'], options['force'])
+        for error in report['errors']:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {report['rendered']} section(s), skipped {report['skipped']} external section(s), "
+            f"{len(report['errors'])} error(s)"
+        ))
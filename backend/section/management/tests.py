@@ -0,0 +1,104 @@
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from section.models import Playlist, Section, SectionRendition
+from section.play_counts import dirty_entry_key, flush_play_counts, play_count_key, record_play
+
+
+@override_settings(BUFFER_PLAY_COUNTS=True)
+class FlushPlayCountsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        playlist = Playlist.objects.create(name='TestPlaylist')
+        self.sections = [Section.objects.create(playlist=playlist, filename=f'{i}.mp3') for i in range(3)]
+
+    def test_flushplaycounts(self):
+        for section, n_plays in zip(self.sections, [2, 0, 5]):
+            for _ in range(n_plays):
+                record_play(section.id)
+        with self.assertNumQueries(0):
+            record_play(self.sections[0].id)
+        self.assertEqual(Section.objects.get(pk=self.sections[0].id).play_count, 0)
+        out = StringIO()
+        call_command('flushplaycounts', '--chunk_size', 2, stdout=out)
+        self.assertIn('Flushed 8 play(s)', out.getvalue())
+        play_counts = [section.play_count for section in Section.objects.order_by('pk')]
+        self.assertEqual(play_counts, [3, 0, 5])
+        self.assertEqual(cache.get(play_count_key(self.sections[0].id)), 0)
+        # flushing again adds nothing
+        call_command('flushplaycounts', stdout=StringIO())
+        self.assertEqual(Section.objects.get(pk=self.sections[2].id).play_count, 5)
+
+    def test_flushplaycounts_dirty_sections(self):
+        record_play(self.sections[0].id)
+        record_play(self.sections[0].id)
+        record_play(self.sections[1].id)
+        # the first section's log entry got evicted: it is waited for once, then skipped
+        cache.delete(dirty_entry_key(1))
+        self.assertEqual(flush_play_counts(), 0)
+        self.assertEqual(flush_play_counts(), 1)
+        self.assertEqual(cache.get(play_count_key(self.sections[0].id)), 2)
+        # flushed sections are logged again when they are played again
+        record_play(self.sections[1].id)
+        self.assertEqual(flush_play_counts(), 1)
+        self.assertEqual(flush_play_counts(all_sections=True), 2)
+        play_counts = [section.play_count for section in Section.objects.order_by('pk')]
+        self.assertEqual(play_counts, [2, 2, 0])
+
+
+def fake_ffmpeg(command, **kwargs):
+    """write the name of the source file and the trimmed part to the output file"""
+    with open(command[-1], 'w') as f:
+        f.write(' '.join(command[command.index('-ss'):command.index('-i') + 2]))
+
+
+class RenderSectionsTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        for name, content in [('a.wav', 'a'), ('b.wav', 'b')]:
+            with open(os.path.join(self.media_root.name, name), 'w') as f:
+                f.write(content)
+        self.playlist = Playlist.objects.create(name='TestPlaylist')
+        self.sections = [
+            Section.objects.create(playlist=self.playlist, filename='a.wav', start_time=10, duration=5),
+            # same file and part: shares the rendition
+            Section.objects.create(playlist=self.playlist, filename='/a.wav', start_time=10, duration=5),
+            Section.objects.create(playlist=self.playlist, filename='b.wav', duration=20),
+            Section.objects.create(playlist=self.playlist, filename='http://some/audio.mp3'),
+            Section.objects.create(playlist=self.playlist, filename='missing.wav'),
+        ]
+
+    def test_rendersections(self):
+        out, err = StringIO(), StringIO()
+        with self.settings(MEDIA_ROOT=self.media_root.name), patch('subprocess.run', side_effect=fake_ffmpeg):
+            call_command('rendersections', '--processes', 1, stdout=out, stderr=err)
+        self.assertIn('Rendered 3 section(s), skipped 1 external section(s), 1 error(s)', out.getvalue())
+        self.assertIn('missing.wav', err.getvalue())
+        self.assertEqual(SectionRendition.objects.count(), 2)
+        sections = [Section.objects.get(pk=section.pk) for section in self.sections]
+        self.assertEqual(sections[0].rendition, sections[1].rendition)
+        self.assertIsNone(sections[3].rendition)
+        with self.settings(MEDIA_ROOT=self.media_root.name):
+            rendition = sections[0].get_rendition()
+            with open(os.path.join(self.media_root.name, rendition.filename)) as f:
+                self.assertIn('-ss 10.0 -t 5.0 -i', f.read())
+            self.assertEqual(sections[1].get_rendition(), rendition)
+            # a rendition no longer matches a section which plays another part or file
+            sections[0].start_time = 0
+            self.assertIsNone(sections[0].get_rendition())
+            sections[1].filename = 'b.wav'
+            self.assertIsNone(sections[1].get_rendition())
+            # nor once its source file changed
+            self.assertIsNotNone(sections[2].get_rendition())
+            with open(os.path.join(self.media_root.name, 'b.wav'), 'w') as f:
+                f.write('changed')
+            self.assertIsNone(sections[2].get_rendition())
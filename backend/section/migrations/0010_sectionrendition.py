@@ -0,0 +1,33 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('section', '0009_remove_section_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionRendition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('start_time', models.FloatField()),
+                ('duration', models.FloatField()),
+                ('filename', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_hash', 'start_time', 'duration'), name='unique_rendition')],
+            },
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='rendition',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sections', to='section.sectionrendition'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('section', '0010_sectionrendition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioMetadata',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('mtime', models.FloatField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('duration', models.FloatField()),
+                ('sample_rate', models.PositiveIntegerField()),
+                ('channels', models.PositiveSmallIntegerField()),
+                ('format', models.CharField(max_length=16)),
+                ('scanned_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Audio metadata',
+            },
+        ),
+    ]
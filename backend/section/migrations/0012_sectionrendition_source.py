@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+def delete_renditions(apps, schema_editor):
+    # renditions did not record their source file, so it is unknown whether they are still up to date;
+    # `rendersections` links the sections again, reusing the rendered files
+    SectionRendition = apps.get_model('section', 'SectionRendition')
+    SectionRendition.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('section', '0011_audiometadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_renditions, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='sectionrendition',
+            name='unique_rendition',
+        ),
+        migrations.AddField(
+            model_name='sectionrendition',
+            name='source_filename',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='sectionrendition',
+            name='source_mtime',
+            field=models.FloatField(default=0.0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='sectionrendition',
+            name='source_size',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='sectionrendition',
+            constraint=models.UniqueConstraint(fields=('source_filename', 'start_time', 'duration'), name='unique_rendition'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('section', '0012_sectionrendition_source'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='audiometadata',
+            name='content_hash',
+        ),
+        migrations.RemoveField(
+            model_name='audiometadata',
+            name='mtime',
+        ),
+        # existing entries do not match any file, so each file is probed once more
+        migrations.AddField(
+            model_name='audiometadata',
+            name='mtime_ns',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+    ]
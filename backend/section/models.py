@@ -17,18 +17,25 @@ Our examples will assume that a playlist with the following csv data has been ad
 """
 import csv
 import datetime
+from collections import defaultdict, deque
+import os
 from os.path import join
 import random
+from typing import Optional
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Window
+from django.db.models.functions import RowNumber
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import cached_property
 
-from .utils import CsvStringBuilder, get_or_create_song
+from .profile import PlaylistProfile
+from .utils import CsvStringBuilder
 from section.validators import (
-    audio_file_validator, file_exists_validator, url_prefix_validator
+    audio_file_validator, find_missing_files, missing_file_error, url_prefix_validator
 )
 
 
@@ -60,16 +67,10 @@ class Playlist(models.Model):
     CSV_ERROR = 10
 
     def clean_csv(self):
-        errors = []
         sections = Section.objects.filter(playlist=self).values_list(
             'filename', flat=True
         )
-
-        for filename in sections:
-            try:
-                file_exists_validator(filename)
-            except ValidationError as e:
-                errors.append(e)
+        errors = [missing_file_error(filename) for filename in find_missing_files(sections)]
 
         if errors:
             raise ValidationError(errors)
@@ -106,8 +107,17 @@ class Playlist(models.Model):
 
     _block_count.short_description = "Blocks"
 
+    @cached_property
+    def profile(self) -> PlaylistProfile:
+        """Numbers of sections by song, tag and group, for validating the playlist.
+        Computed once per Playlist instance
+        """
+        return PlaylistProfile(self.section_set.all())
+
     def _update_sections(self):
         """update sections associated with a Playlist object based on its `csv` field"""
+        # the sections are about to change
+        self.__dict__.pop("profile", None)
         # CSV empty
         if len(self.csv) == 0:
             # Delete all existing sections
@@ -117,9 +127,6 @@ class Playlist(models.Model):
                 'message': "No sections added. Deleted all existing sections."
             }
 
-        # Store existing sections
-        existing_sections = [section for section in self.section_set.all()]
-
         # Add new sections from csv
         try:
             reader = csv.DictReader(self.csv.splitlines(), fieldnames=(
@@ -137,8 +144,7 @@ class Playlist(models.Model):
             except ValueError:
                 return False
 
-        sections = []
-        updated = 0
+        rows = []
         lines = 0
         csv_messages = []
         global_errors = 0
@@ -161,69 +167,89 @@ class Playlist(models.Model):
                 iteration_error = True
                 global_errors += 1
 
-            # Make the changes if there are no global errors in this row
             if not iteration_error:
-                # Retrieve or create Song object
-                song = None
-                if row['artist'] or row['name']:
-                    song = get_or_create_song(row['artist'], row['name'])
-
-                # create new section
-                section = Section(playlist=self,
-                                start_time=float(row['start_time']),
-                                duration=float(row['duration']),
-                                filename=row['filename'],
-                                tag=row['tag'],
-                                group=row['group'],
-                                )
-                section.song = song
+                rows.append(row)
+
+        if global_errors:
+            return {
+                        'status': self.CSV_ERROR,
+                        'messages': csv_messages,
+                    }
+
+        with transaction.atomic():
+            songs = self._upsert_songs(rows)
+
+            # Index existing sections by filename, a filename may be used by several sections
+            existing_sections = defaultdict(deque)
+            for ex_section in self.section_set.all():
+                existing_sections[str(ex_section.filename)].append(ex_section)
+
+            sections = []
+            updated_sections = []
+            updated = 0
+            for row in rows:
+                song = songs.get((row['artist'], row['name']))
+                fields = {
+                    'start_time': float(row['start_time']),
+                    'duration': float(row['duration']),
+                    'tag': row['tag'],
+                    'group': row['group'],
+                }
+                if song:
+                    fields['song_id'] = song.id
 
                 # if same section already exists, update it with new info
-                for ex_section in existing_sections:
-                    if ex_section.filename == section.filename:
-                        if song:
-                            ex_section.song = song
-                            ex_section.save()
-                        ex_section.start_time = section.start_time
-                        ex_section.duration = section.duration
-                        ex_section.tag = section.tag
-                        ex_section.group = section.group
-                        ex_section.save()
-                        updated += 1
-
-                        # Remove from existing sections list
-                        existing_sections.remove(ex_section)
-                        section = None
-                        break
-
-                # append section
-                if section:
-                    sections.append(section)
-
-        # No global errors
-        if global_errors == 0:
+                matching_sections = existing_sections.get(row['filename'])
+                if matching_sections:
+                    ex_section = matching_sections.popleft()
+                    updated += 1
+                    if any(getattr(ex_section, field) != value for field, value in fields.items()):
+                        for field, value in fields.items():
+                            setattr(ex_section, field, value)
+                        updated_sections.append(ex_section)
+                    continue
+
+                sections.append(Section(playlist=self, filename=row['filename'], **fields))
+
+            Section.objects.bulk_update(
+                updated_sections, ['song', 'start_time', 'duration', 'tag', 'group'], batch_size=1000
+            )
 
             # Add sections
-            Section.objects.bulk_create(sections)
+            Section.objects.bulk_create(sections, batch_size=1000)
 
             # Remove obsolete sections
-            delete_ids = [ex_section.id for ex_section in existing_sections]
+            delete_ids = [
+                ex_section.id for remaining in existing_sections.values() for ex_section in remaining
+            ]
             self.section_set.filter(pk__in=delete_ids).delete()
 
             # Reset process csv option and save playlist
             self.process_csv = False
             self.save()
 
-            return {
-                'status': self.CSV_OK,
-                'message':
-                  f"Sections processed from CSV. Added: {str(len(sections))} - Updated: {str(updated)} - Removed: {str(len(delete_ids))}"
-            }
-
         return {
-                    'status': self.CSV_ERROR,
-                    'messages': csv_messages,
-                }
+            'status': self.CSV_OK,
+            'message':
+              f"Sections processed from CSV. Added: {str(len(sections))} - Updated: {str(updated)} - Removed: {str(len(delete_ids))}"
+        }
+
+    def _upsert_songs(self, rows: list[dict]) -> dict[tuple[str, str], "Song"]:
+        """Get or create the songs of csv rows with an artist or name, in one query
+
+        Returns:
+            a dictionary of Song objects by (artist, name)
+        """
+        keys = dict.fromkeys((row['artist'], row['name']) for row in rows if row['artist'] or row['name'])
+        songs = Song.objects.bulk_create(
+            [Song(artist=artist, name=name) for artist, name in keys],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['artist', 'name'],
+            # a no-op update, so the ids of existing songs are returned as well
+            update_fields=['artist'],
+        )
+        return {(song.artist, song.name): song for song in songs}
 
     def _update_admin_csv(self):
         """Update csv data for admin"""
@@ -253,7 +279,8 @@ class Playlist(models.Model):
         Attributes:
             filter_by: a dictionary defining conditions a section should meet
             exclude: a dictionary defining conditions by which to exclude sections from selection
-            song_ids: a list of identifiers of `Song` objects from which the section should be sampled
+            song_ids: a list, or a query (e.g. `Session.get_unused_song_ids()`), of identifiers of `Song` objects from which the section should be sampled.
+                If there are no such songs, the section is sampled from the whole playlist
 
         Examples:
             >>> playlist.get_section(exclude={'group': 'Disney})
@@ -266,16 +293,50 @@ class Playlist(models.Model):
             >>> playlist.get_section(song_ids=[1])
             Frozen - Let It Go (0.0 - 10.0) OR Frozen - Let It Go (30.0 - 40.0)
         """
-        if song_ids:
-            sections = self.section_set.filter(song__id__in=song_ids)
-        else:
-            sections = self.section_set
-        pks = (
-            sections.exclude(**exclude).filter(**filter_by).values_list("pk", flat=True)
-        )
-        if len(pks) == 0:
+        sections = self.sample_sections(1, filter_by, exclude, song_ids)
+        if not sections:
             raise Section.DoesNotExist
-        return self.section_set.get(pk=random.choice(pks))
+        return sections[0]
+
+    def sample_sections(
+        self, k: int, filter_by: dict = {}, exclude: dict = {}, song_ids: list = []
+    ) -> list["Section"]:
+        """Get k random sections from this playlist, without replacement, with their songs.
+        Takes the same arguments as `get_section`. Instead of loading all matching sections,
+        the matching sections are counted, and the ones at k random positions are fetched
+
+        Examples:
+            >>> playlist.sample_sections(2, {'tag': 'happy'})
+            [West Side Story - America (30.0 - 40.0), Lion King - Hakuna Matata (0.0 - 10.0)]
+
+        Returns:
+            list of at most k sections in random order, empty if no section matches
+        """
+        sections = self.section_set.exclude(**exclude).filter(**filter_by)
+        if isinstance(song_ids, models.QuerySet):
+            # resolve the song ids as a subquery, and only fall back to the whole playlist if there are none
+            n_sections = sections.filter(song__id__in=song_ids).count()
+            if n_sections or song_ids.exists():
+                sections = sections.filter(song__id__in=song_ids)
+            else:
+                n_sections = sections.count()
+        else:
+            if song_ids:
+                sections = sections.filter(song__id__in=song_ids)
+            n_sections = sections.count()
+        if n_sections == 0:
+            return []
+        positions = random.sample(range(1, n_sections + 1), min(k, n_sections))
+        if len(positions) == 1:
+            sampled = [sections.select_related("song").order_by("pk")[positions[0] - 1]]
+        else:
+            sampled = list(
+                sections.select_related("song")
+                .annotate(position=Window(RowNumber(), order_by="pk"))
+                .filter(position__in=positions)
+            )
+            random.shuffle(sampled)
+        return sampled
 
 
 class Song(models.Model):
@@ -333,6 +394,9 @@ class Section(models.Model):
     play_count = models.PositiveIntegerField(default=0)
     tag = models.CharField(max_length=128, default='0', blank=True)
     group = models.CharField(max_length=128, default='0', blank=True)
+    rendition = models.ForeignKey(
+        "SectionRendition", on_delete=models.SET_NULL, blank=True, null=True, editable=False, related_name="sections"
+    )
 
     class Meta:
         ordering = ['song__artist', 'song__name', 'start_time']
@@ -397,6 +461,25 @@ class Section(models.Model):
         """Increase play count for this section"""
         self.play_count += 1
 
+    def get_rendition(self) -> Optional["SectionRendition"]:
+        """
+        Returns:
+            the trimmed rendition of this section, if one was rendered from its current source file, start time
+            and duration, and the source file did not change since
+        """
+        rendition = self.rendition
+        if rendition is None or (rendition.start_time, rendition.duration) != (self.start_time, self.duration):
+            return None
+        if rendition.source_filename != str(self.filename).lstrip("/"):
+            return None
+        try:
+            stat = os.stat(join(settings.MEDIA_ROOT, rendition.source_filename))
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime) != (rendition.source_size, rendition.source_mtime):
+            return None
+        return rendition
+
     def absolute_url(self) -> str:
         """
         Returns:
@@ -405,3 +488,66 @@ class Section(models.Model):
         base_url = getattr(settings, 'BASE_URL', '')
         sections_url = reverse("section:section", args=[self.pk])
         return base_url.rstrip('/') + sections_url
+
+
+class SectionRendition(models.Model):
+    """A trimmed, compressed and loudness-normalized audio file of a part of a source file,
+    shared by all sections with the same source file, start time and duration (see section/renditions.py)
+
+    Attributes:
+        source_filename (str): path of the source audio file, relative to MEDIA_ROOT
+        source_size (int): size of the source file in bytes, when it was rendered
+        source_mtime (float): modification time of the source file, as a unix timestamp, when it was rendered
+        source_hash (str): sha256 hash of the source audio file
+        start_time (float): start time of the rendered part in the source file, in seconds
+        duration (float): duration of the rendered part, in seconds
+        filename (str): path of the rendition, relative to MEDIA_ROOT
+        created_at (datetime): when the rendition was rendered
+    """
+
+    source_filename = models.CharField(max_length=255)
+    source_size = models.BigIntegerField()
+    source_mtime = models.FloatField()
+    source_hash = models.CharField(max_length=64)
+    start_time = models.FloatField()
+    duration = models.FloatField()
+    filename = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source_filename", "start_time", "duration"], name="unique_rendition"),
+        ]
+
+    def __str__(self):
+        return self.filename
+
+
+class AudioMetadata(models.Model):
+    """Catalog of properties of audio files, probed once and probed again only when a file changes (see section/audio_metadata.py)
+
+    Attributes:
+        path (str): path of the audio file, relative to MEDIA_ROOT
+        size (int): size of the file in bytes
+        mtime_ns (int): modification time of the file, in nanoseconds since the epoch
+        duration (float): duration in seconds
+        sample_rate (int): sample rate in Hz
+        channels (int): number of audio channels
+        format (str): file format, e.g. "wav" or "mp3"
+        scanned_at (datetime): when the file was last probed
+    """
+
+    path = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    mtime_ns = models.BigIntegerField()
+    duration = models.FloatField()
+    sample_rate = models.PositiveIntegerField()
+    channels = models.PositiveSmallIntegerField()
+    format = models.CharField(max_length=16)
+    scanned_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Audio metadata"
+
+    def __str__(self):
+        return self.path
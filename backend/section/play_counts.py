@@ -0,0 +1,151 @@
+"""Buffered accounting of how often sections are played.
+
+Serving a section should not write to its row: with `BUFFER_PLAY_COUNTS` enabled, plays are counted in the cache,
+and added to `Section.play_count` in bulk by `flush_play_counts` (see the `flushplaycounts` management command).
+The first play of a section since the last flush appends the section to a log of dirty sections in the cache,
+so a flush only reads the counts of the sections which were played.
+"""
+
+from collections import defaultdict
+from itertools import batched
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import Section
+
+# number of entries ever appended to the log of dirty sections, and number of entries flushed
+DIRTY_COUNT_KEY = "section_play_count_dirty"
+FLUSHED_COUNT_KEY = "section_play_count_flushed"
+# the first entry which was missing at the last flush
+MISSING_ENTRY_KEY = "section_play_count_missing"
+
+
+def play_count_key(section_id: int) -> str:
+    """
+    Returns:
+        the cache key under which the unflushed plays of a section are counted
+    """
+    return f"section_play_count:{section_id}"
+
+
+def dirty_entry_key(n: int) -> str:
+    """
+    Returns:
+        the cache key of the `n`th entry of the log of dirty sections
+    """
+    return f"section_play_count_dirty:{n}"
+
+
+def _increment(key: str, delta: int = 1) -> int:
+    """Increment a counter in the cache, starting it if it does not exist (anymore)"""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout=None):
+            return delta
+        return cache.incr(key, delta)
+
+
+def record_play(section_id: int):
+    """Count a play of a section, in the cache if `BUFFER_PLAY_COUNTS` is enabled,
+    otherwise directly in the database, without reading the section first
+    """
+    if not settings.BUFFER_PLAY_COUNTS:
+        Section.objects.filter(pk=section_id).update(play_count=F("play_count") + 1)
+        return
+    if _increment(play_count_key(section_id)) == 1:
+        # first play since the last flush
+        _mark_dirty(section_id)
+
+
+def _mark_dirty(section_id: int):
+    """Append a section to the log of sections with unflushed plays"""
+    cache.set(dirty_entry_key(_increment(DIRTY_COUNT_KEY)), section_id, timeout=None)
+
+
+def flush_play_counts(chunk_size: int = 1000, all_sections: bool = False) -> int:
+    """Add the plays counted in the cache to the play counts of the sections.
+    Flushes should not run concurrently
+
+    Args:
+        chunk_size: number of sections of which the counted plays are read from the cache at once
+        all_sections: read the counted plays of all sections, not only of those in the log of dirty sections,
+            e.g. in case log entries were evicted from the cache
+
+    Returns:
+        the number of plays that were flushed
+    """
+    start = cache.get(FLUSHED_COUNT_KEY, 0)
+    end = cache.get(DIRTY_COUNT_KEY, 0)
+    if start > end:
+        # the log was evicted and started again
+        start = 0
+    if all_sections:
+        section_ids = Section.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size)
+    else:
+        section_ids, end = _read_dirty_log(start, end, chunk_size)
+    n_plays = 0
+    for batch in batched(section_ids, chunk_size):
+        n_plays += _flush_batch(batch)
+    cache.set(FLUSHED_COUNT_KEY, end, timeout=None)
+    for batch in batched(range(start + 1, end + 1), chunk_size):
+        cache.delete_many([dirty_entry_key(n) for n in batch])
+    return n_plays
+
+
+def _read_dirty_log(start: int, end: int, chunk_size: int) -> tuple[set[int], int]:
+    """Read the entries of the log of dirty sections after `start`, up to `end`
+
+    Returns:
+        the ids of the logged sections, and the last entry which was read
+    """
+    section_ids = set()
+    for batch in batched(range(start + 1, end + 1), chunk_size):
+        logged = cache.get_many([dirty_entry_key(n) for n in batch])
+        for n in batch:
+            if dirty_entry_key(n) in logged:
+                section_ids.add(logged[dirty_entry_key(n)])
+            elif cache.get(MISSING_ENTRY_KEY) != n:
+                # a play may still be writing this entry: read the log from here on again at the next flush
+                cache.set(MISSING_ENTRY_KEY, n, timeout=None)
+                return section_ids, n - 1
+            # otherwise it was missing at the last flush too, and was evicted: skip it
+    return section_ids, end
+
+
+def _flush_batch(section_ids: Iterable[int]) -> int:
+    """Move the plays counted in the cache for some sections to the database
+
+    Returns:
+        the number of plays that were flushed
+    """
+    counted = cache.get_many([play_count_key(section_id) for section_id in section_ids])
+    by_amount = defaultdict(list)
+    for section_id in section_ids:
+        amount = counted.get(play_count_key(section_id))
+        if amount:
+            # take the plays from the cache first, keeping plays counted in the meantime
+            try:
+                if cache.decr(play_count_key(section_id), amount) > 0:
+                    # played meanwhile, without being logged again
+                    _mark_dirty(section_id)
+            except ValueError:
+                # evicted after it was read: the plays that were read are still flushed
+                pass
+            by_amount[amount].append(section_id)
+    try:
+        with transaction.atomic():
+            for amount, ids in by_amount.items():
+                Section.objects.filter(pk__in=ids).update(play_count=F("play_count") + amount)
+    except Exception:
+        # give the plays back, to be flushed later
+        for amount, ids in by_amount.items():
+            for section_id in ids:
+                if _increment(play_count_key(section_id), amount) == amount:
+                    _mark_dirty(section_id)
+        raise
+    return sum(amount * len(ids) for amount, ids in by_amount.items())
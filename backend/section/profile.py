@@ -0,0 +1,59 @@
+from collections import Counter, defaultdict
+from typing import Optional
+
+from django.db.models import Count, F
+from django.db.models.query import QuerySet
+
+
+class PlaylistProfile:
+    """Numbers of sections of a playlist by song, tag and group, computed with a single grouped query,
+    so playlist validators do not have to query the sections once per condition, or load all of them
+
+    Attributes:
+        section_count (int): total number of sections
+        tags (Counter[str]): number of sections per tag
+        groups (Counter[str]): number of sections per group
+        tags_per_group (dict[str, Counter[str]]): number of sections per tag, for each group
+        song_names (Counter[Optional[str]]): number of sections per song name, None for sections without a song
+        songs (Counter[tuple[Optional[str], Optional[str]]]): number of sections per (artist, name) of their song
+        rows (list[dict]): the grouped rows, with `artist`, `name`, `tag`, `group` and `count` of the sections
+    """
+
+    def __init__(self, sections: QuerySet):
+        self.rows = list(
+            sections.order_by()
+            .values("tag", "group", artist=F("song__artist"), name=F("song__name"))
+            .annotate(count=Count("pk"))
+        )
+        self.section_count = 0
+        self.tags = Counter()
+        self.groups = Counter()
+        self.tags_per_group = defaultdict(Counter)
+        self.song_names = Counter()
+        self.songs = Counter()
+        for row in self.rows:
+            count = row["count"]
+            self.section_count += count
+            self.tags[row["tag"]] += count
+            self.groups[row["group"]] += count
+            self.tags_per_group[row["group"]][row["tag"]] += count
+            self.song_names[row["name"]] += count
+            self.songs[(row["artist"], row["name"])] += count
+
+    def count_song_name_prefix(self, prefix: str) -> int:
+        """
+        Returns:
+            the number of sections of which the song name starts with `prefix`
+        """
+        return sum(count for name, count in self.song_names.items() if name and name.startswith(prefix))
+
+    def tags_of_group(self, group: str, exclude: Optional[str] = None) -> list[str]:
+        """
+        Args:
+            group: the group of the sections
+            exclude: leave out tags containing this string
+
+        Returns:
+            the sorted, distinct tags of the sections in a group
+        """
+        return sorted(tag for tag in self.tags_per_group.get(group, ()) if not (exclude and exclude in tag))
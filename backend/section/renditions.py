@@ -0,0 +1,168 @@
+"""Trimmed, compressed and loudness-normalized renditions of sections, rendered with ffmpeg.
+
+A rendition only contains the part of the source file which a section plays, so participants do not download whole tracks.
+Sections with the same source file, start time and duration share a rendition, which records the size and modification
+time of the source file, so it is no longer served once the file changes. Rendered files are named after the hash of
+the source file, so files with the same content are rendered once. Rendering happens in a pool of processes,
+which do not touch the database.
+"""
+
+import hashlib
+import os
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os.path import dirname, exists, join, relpath
+from typing import Iterator, Optional, TypedDict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.query import QuerySet
+
+from .models import Section, SectionRendition
+
+RENDITIONS_DIR = "renditions"
+# single pass EBU R128 loudness normalization, encoded as 128 kbit/s stereo mp3
+FFMPEG_AUDIO_OPTIONS = [
+    "-af", "loudnorm=I=-16:TP=-1.5:LRA=11",
+    "-ac", "2",
+    "-ar", "44100",
+    "-c:a", "libmp3lame",
+    "-b:a", "128k",
+]
+
+# section id, path of the source file, start time, duration
+RenderJob = tuple[int, str, float, float]
+
+
+class RenderReport(TypedDict):
+    rendered: int
+    skipped: int
+    errors: list[str]
+
+
+def file_hash(path: str) -> str:
+    """
+    Returns:
+        the sha256 hash of the file at `path`
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rendition_filename(source_hash: str, start_time: float, duration: float) -> str:
+    """
+    Returns:
+        the path, relative to MEDIA_ROOT, of the rendition of a part of a source file
+    """
+    return join(RENDITIONS_DIR, source_hash[:2], f"{source_hash}_{start_time:g}_{duration:g}.mp3")
+
+
+def render_audio(source_path: str, target_path: str, start_time: float, duration: float):
+    """Render a part of an audio file with ffmpeg
+
+    Raises:
+        subprocess.CalledProcessError: if ffmpeg fails
+    """
+    os.makedirs(dirname(target_path), exist_ok=True)
+    partial_path = f"{target_path}.part"
+    command = ["ffmpeg", "-v", "error", "-y", "-ss", str(start_time)]
+    if duration:
+        command += ["-t", str(duration)]
+    command += ["-i", source_path, *FFMPEG_AUDIO_OPTIONS, "-f", "mp3", partial_path]
+    subprocess.run(command, check=True, capture_output=True)
+    # never leave half rendered files under the final name
+    os.replace(partial_path, target_path)
+
+
+def _render_job(job: RenderJob, force: bool) -> tuple[int, float, str, str]:
+    """Render the rendition for a section, unless it exists already. Runs in a worker process
+
+    Returns:
+        the size, modification time and hash of the source file, and the filename of the rendition
+    """
+    _, source_path, start_time, duration = job
+    # stat before hashing: if the file changes meanwhile, the rendition is not served
+    stat = os.stat(source_path)
+    source_hash = file_hash(source_path)
+    filename = rendition_filename(source_hash, start_time, duration)
+    target_path = join(settings.MEDIA_ROOT, filename)
+    if force or not exists(target_path):
+        render_audio(source_path, target_path, start_time, duration)
+    return stat.st_size, stat.st_mtime, source_hash, filename
+
+
+def _run_jobs(jobs: list[RenderJob], processes: Optional[int], force: bool) -> Iterator[tuple[RenderJob, object]]:
+    """Yield each job with its result, or with the exception it raised"""
+    if processes == 1:
+        for job in jobs:
+            try:
+                yield job, _render_job(job, force)
+            except (OSError, subprocess.CalledProcessError) as e:
+                yield job, e
+        return
+    # forked workers must not share the database connections of this process
+    connections.close_all()
+    with ProcessPoolExecutor(processes) as pool:
+        futures = {pool.submit(_render_job, job, force): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except (OSError, subprocess.CalledProcessError) as e:
+                yield futures[future], e
+
+
+def render_sections(sections: QuerySet[Section], processes: Optional[int] = None, force: bool = False) -> RenderReport:
+    """Render renditions for sections, and link the sections to them.
+    Sections with external files (urls, or playlists with a `url_prefix`) are skipped
+
+    Args:
+        sections: the sections to render
+        processes: number of ffmpeg processes to run in parallel, defaults to the number of CPUs
+        force: render renditions again, even if their files exist
+
+    Returns:
+        the number of rendered and skipped sections, and error messages for the sections which could not be rendered
+    """
+    report = RenderReport(rendered=0, skipped=0, errors=[])
+    jobs = []
+    for section in sections.select_related("playlist"):
+        filename = str(section.filename)
+        if not filename or filename.startswith("http") or section.playlist.url_prefix:
+            report["skipped"] += 1
+            continue
+        source_path = join(settings.MEDIA_ROOT, filename.lstrip("/"))
+        jobs.append((section.id, source_path, section.start_time, section.duration))
+
+    renditions = {}
+    section_ids = defaultdict(list)
+    for job, outcome in _run_jobs(jobs, processes, force):
+        section_id, source_path, start_time, duration = job
+        if isinstance(outcome, Exception):
+            stderr = getattr(outcome, "stderr", None)
+            detail = stderr.decode(errors="replace").strip() if stderr else str(outcome)
+            report["errors"].append(f"{source_path}: {detail}")
+            continue
+        key = (relpath(source_path, settings.MEDIA_ROOT), start_time, duration)
+        renditions[key] = outcome
+        section_ids[key].append(section_id)
+
+    for (source_filename, start_time, duration), ids in section_ids.items():
+        source_size, source_mtime, source_hash, filename = renditions[(source_filename, start_time, duration)]
+        rendition, _ = SectionRendition.objects.update_or_create(
+            source_filename=source_filename,
+            start_time=start_time,
+            duration=duration,
+            defaults={
+                "source_size": source_size,
+                "source_mtime": source_mtime,
+                "source_hash": source_hash,
+                "filename": filename,
+            },
+        )
+        Section.objects.filter(pk__in=ids).update(rendition=rendition)
+        report["rendered"] += len(ids)
+    return report
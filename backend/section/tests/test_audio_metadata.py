@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase
+
+from section.audio_metadata import get_audio_metadata, scan_audio_files
+from section.models import AudioMetadata
+
+
+class AudioMetadataTest(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        shutil.copytree(
+            os.path.join(settings.MEDIA_ROOT, 'tests', 'compileplaylist'),
+            os.path.join(media_root.name, 'audio'),
+        )
+        settings_override = self.settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.paths = [f'audio/silence_{seconds}sec.wav' for seconds in (5, 10, 15, 20)]
+
+    def test_scan_audio_files(self):
+        metadata = scan_audio_files(self.paths, processes=2)
+        self.assertEqual(AudioMetadata.objects.count(), 4)
+        entry = metadata['audio/silence_20sec.wav']
+        self.assertAlmostEqual(entry.duration, 20.02585034)
+        self.assertEqual(entry.format, 'wav')
+        # unchanged files are not probed again
+        with self.assertNumQueries(1):
+            metadata = scan_audio_files(self.paths)
+        self.assertEqual(metadata['audio/silence_5sec.wav'].sample_rate, entry.sample_rate)
+
+    def test_changed_file_is_probed_again(self):
+        entry = get_audio_metadata('/audio/silence_5sec.wav')
+        self.assertEqual(entry.path, 'audio/silence_5sec.wav')
+        shutil.copy(
+            os.path.join(settings.MEDIA_ROOT, 'audio', 'silence_10sec.wav'),
+            os.path.join(settings.MEDIA_ROOT, 'audio', 'silence_5sec.wav'),
+        )
+        entry = get_audio_metadata('audio/silence_5sec.wav')
+        self.assertAlmostEqual(entry.duration, get_audio_metadata('audio/silence_10sec.wav').duration)
+        self.assertEqual(AudioMetadata.objects.filter(path='audio/silence_5sec.wav').count(), 1)
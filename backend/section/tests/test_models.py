@@ -73,6 +73,21 @@ class PlaylistModelTest(TestCase):
         with self.assertRaises(Section.DoesNotExist):
             self.playlist.get_section(filter_by={"tag": "non-existing tag"})
 
+    def test_sample_sections(self):
+        self.playlist.csv = "".join(
+            f"Weird Al,Song {i},0.0,10.0,some/file{i}.mp3,tag{i % 2},0\n" for i in range(10)
+        )
+        self.playlist._update_sections()
+        with self.assertNumQueries(2):
+            sections = self.playlist.sample_sections(4, filter_by={"tag": "tag1"})
+            self.assertTrue(all(section.song.name for section in sections))
+        self.assertEqual(len(sections), 4)
+        self.assertEqual(len(set(sections)), 4)
+        self.assertTrue(all(section.tag == "tag1" for section in sections))
+        sections = self.playlist.sample_sections(20)
+        self.assertEqual(set(sections), set(self.playlist.section_set.all()))
+        self.assertEqual(self.playlist.sample_sections(1, filter_by={"tag": "tag2"}), [])
+
     def test_valid_csv(self):
         self.playlist.csv = (
             "Måneskin,Zitti e buoni,0.0,10.0,bat/maneskin.mp3,0,0\n"
@@ -101,6 +116,48 @@ class PlaylistModelTest(TestCase):
         self.assertEqual(sections[3].tag, "0")
         self.assertEqual(sections[3].group, "0")
 
+    def test_update_sections_existing(self):
+        self.playlist.csv = "".join(
+            f"Artist,Song {i},0.0,10.0,bat/{i}.mp3,0,0\n" for i in range(100)
+        )
+        with self.assertNumQueries(7):
+            s = self.playlist._update_sections()
+        self.assertEqual(s["message"], "Sections processed from CSV. Added: 100 - Updated: 0 - Removed: 0")
+        section_ids = {section.filename.name: section.id for section in self.playlist.section_set.all()}
+        self.playlist.csv = (
+            "Artist,Song 0,0.0,10.0,bat/0.mp3,0,0\n"
+            "Artist,Other song,5.0,10.0,bat/1.mp3,tag,0\n"
+            "Artist,New song,0.0,10.0,bat/new.mp3,0,0\n"
+        )
+        s = self.playlist._update_sections()
+        self.assertEqual(s["message"], "Sections processed from CSV. Added: 1 - Updated: 2 - Removed: 98")
+        updated = self.playlist.section_set.get(filename="bat/1.mp3")
+        self.assertEqual(updated.id, section_ids["bat/1.mp3"])
+        self.assertEqual((updated.song_name(), updated.start_time, updated.tag), ("Other song", 5.0, "tag"))
+        self.assertEqual(Song.objects.filter(artist="Artist").count(), 102)
+
+    def test_profile(self):
+        self.playlist.csv = (
+            "Artist,ex1,0.0,10.0,bat/ex1.mp3,practice,1\n"
+            "Artist,1,0.0,10.0,bat/1.mp3,A,1\n"
+            "Artist,1,0.0,10.0,bat/2.mp3,B,1\n"
+            "Other artist,2,0.0,10.0,bat/3.mp3,A,2\n"
+        )
+        self.playlist._update_sections()
+        with self.assertNumQueries(1):
+            profile = self.playlist.profile
+            self.assertEqual(profile.section_count, 4)
+            self.assertEqual(profile.groups, {"1": 3, "2": 1})
+            self.assertEqual(profile.tags["A"], 2)
+            self.assertEqual(profile.tags_of_group("1"), ["A", "B", "practice"])
+            self.assertEqual(profile.tags_of_group("1", exclude="practice"), ["A", "B"])
+            self.assertEqual(profile.count_song_name_prefix("ex"), 1)
+            self.assertEqual(len(profile.songs), 3)
+        # updating the sections discards the profile
+        self.playlist.csv = "Artist,1,0.0,10.0,bat/1.mp3,A,1\n"
+        self.playlist._update_sections()
+        self.assertEqual(self.playlist.profile.section_count, 1)
+
     def test_url_prefix_add_slash(self):
         self.playlist.url_prefix = "https://test.com"
         self.playlist.save()
@@ -0,0 +1,22 @@
+import tempfile
+from os.path import basename, join
+
+from django.test import TestCase
+
+from section.validators import find_missing_files
+
+
+class ValidatorsTest(TestCase):
+
+    def test_find_missing_files(self):
+        existing = "tests/compileplaylist/silence_5sec.wav"
+        missing = find_missing_files(
+            [existing, "tests/compileplaylist/nope.wav", "/no/directory.wav", "http://some/file.mp3", existing]
+        )
+        self.assertEqual(missing, ["tests/compileplaylist/nope.wav", "/no/directory.wav"])
+        with tempfile.TemporaryDirectory(dir="upload") as directory:
+            filename = join(basename(directory), "new.wav")
+            self.assertEqual(find_missing_files([filename]), [filename])
+            # adding a file to the directory invalidates its cached listing
+            open(join(directory, "new.wav"), "w").close()
+            self.assertEqual(find_missing_files([filename]), [])
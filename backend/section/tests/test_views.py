@@ -1,8 +1,11 @@
+import os
+
 from django.conf import settings
 from django.http import FileResponse
 from django.test import override_settings, TestCase
 
-from section.models import Playlist, Section
+from section.models import Playlist, Section, SectionRendition
+from section.play_counts import flush_play_counts
 
 
 @override_settings(TESTING=True)
@@ -19,6 +22,58 @@ class SectionViewTest(TestCase):
         self.assertEqual(Section.objects.get(pk=section.id).play_count, 1)
         self.assertEqual(type(response), FileResponse)
 
+    @override_settings(DEBUG=True, BUFFER_PLAY_COUNTS=True)
+    def test_get_section_buffered_play_count(self):
+        section = Section.objects.create(playlist=self.playlist, filename="http://some/imaginary/audio.mp3")
+        with self.assertNumQueries(1):
+            self.client.get(f"/section/{section.id}/")
+        self.assertEqual(Section.objects.get(pk=section.id).play_count, 0)
+        flush_play_counts()
+        self.assertEqual(Section.objects.get(pk=section.id).play_count, 1)
+
+    @override_settings(DEBUG=True)
+    def test_get_section_range(self):
+        section = Section.objects.create(playlist=self.playlist, filename="example.mp3")
+        with open(f"{settings.MEDIA_ROOT}/example.mp3", "rb") as f:
+            content = f.read()
+        response = self.client.get(f"/section/{section.id}/", headers={"range": "bytes=100-199"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(content)}")
+        self.assertEqual(b"".join(response.streaming_content), content[100:200])
+        response = self.client.get(f"/section/{section.id}/", headers={"range": "bytes=-10"})
+        self.assertEqual(b"".join(response.streaming_content), content[-10:])
+        response = self.client.get(f"/section/{section.id}/", headers={"range": f"bytes={len(content)}-"})
+        self.assertEqual(response.status_code, 416)
+        # a cached copy is still valid
+        etag = self.client.get(f"/section/{section.id}/")["ETag"]
+        response = self.client.get(f"/section/{section.id}/", headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(AUDIO_X_ACCEL_REDIRECT_PREFIX="/protected-upload/")
+    def test_get_section_x_accel_redirect(self):
+        section = Section.objects.create(playlist=self.playlist, filename="/some dir/example.mp3")
+        response = self.client.get(f"/section/{section.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-upload/some%20dir/example.mp3")
+        self.assertEqual(response["Content-Type"], "audio/mpeg")
+
+    def test_get_section_rendition(self):
+        stat = os.stat(f"{settings.MEDIA_ROOT}/example.mp3")
+        rendition = SectionRendition.objects.create(
+            source_filename="example.mp3",
+            source_size=stat.st_size,
+            source_mtime=stat.st_mtime,
+            source_hash="abc",
+            start_time=10,
+            duration=5,
+            filename="renditions/ab/abc_10_5.mp3",
+        )
+        section = Section.objects.create(
+            playlist=self.playlist, filename="example.mp3", start_time=10, duration=5, rendition=rendition
+        )
+        response = self.client.get(f"/section/{section.id}/")
+        self.assertEqual(response.url, settings.MEDIA_URL + rendition.filename)
+
     @override_settings(DEBUG=True)
     def test_get_section_remote(self):
         section = Section.objects.create(
@@ -1,22 +1,32 @@
+import mimetypes
+import os
+import re
 from os.path import join
+from typing import Iterator, Optional
+from urllib.parse import quote
 
-from django.http import Http404, HttpRequest, FileResponse
+from django.http import Http404, HttpRequest, HttpResponse, FileResponse, StreamingHttpResponse
 from django.conf import settings
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 from .models import Section
+from .play_counts import record_play
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
 
 
 def get_section(request: HttpRequest, section_id: int) -> Section:
     """Get section by given id"""
     try:
-        section = Section.objects.get(pk=section_id)
+        section = Section.objects.select_related("playlist", "rendition").get(pk=section_id)
 
         # Section will be served, so increase play count
         # On your local development server you can receive multiple requests on
         # a single section
-        section.add_play_count()
-        section.save()
+        record_play(section.id)
 
         # Option 1: provide a redirect to the filename
         # Could be enabled if server load is to high
@@ -31,31 +41,119 @@ def get_section(request: HttpRequest, section_id: int) -> Section:
             # Make link external using url_prefix
             return redirect(section.playlist.url_prefix + str(section.filename))
 
+        # serve the trimmed rendition of the section, if there is one
+        rendition = section.get_rendition()
+        filename = rendition.filename if rendition else str(section.filename)
+        if filename.startswith("/"):
+            # remove initial slash in filename, as otherwise os.path.join considers it an absolute path
+            filename = filename[1:]
+
+        # Option 2: let nginx send the file from an internal location
+        # Advantage: keeps url secure, low server load
+        if settings.AUDIO_X_ACCEL_REDIRECT_PREFIX:
+            response = HttpResponse(content_type=_content_type(filename))
+            response["X-Accel-Redirect"] = quote(settings.AUDIO_X_ACCEL_REDIRECT_PREFIX + filename)
+            return response
+
         # We only do this in production, as the Django dev server not correctly supports
         # The range/seeking of audio files in Chrome
         if not settings.DEBUG:
-            return redirect(settings.MEDIA_URL + str(section.filename))
+            return redirect(settings.MEDIA_URL + filename)
 
-        # Option 2: stream file through Django
+        # Option 3: stream file through Django
         # Advantage: keeps url secure, correct play_count value
         # Disadvantage: potential high server load
-        filename = str(section.filename)
-        if filename.startswith("/"):
-            # remove initial slash in filename, as otherwise os.path.join considers it an absolute path
-            filename = filename[1:]
         filepath = join(settings.MEDIA_ROOT, filename)
 
         # Uncomment to only use example file in development
         # if settings.DEBUG:
         #    filename = settings.BASE_DIR + "/upload/example.mp3"
-        response = FileResponse(open(filepath, "rb"))
-
-        # Header is required to make seeking work in Chrome
-        response['Accept-Ranges'] = 'bytes'
 
         # Response may log a ConnectionResetError on the development server
         # This has no effect on serving the file
-        return response
+        return _file_response(request, filepath)
 
     except Section.DoesNotExist:
         raise Http404("Section does not exist")
+
+
+def _content_type(filename: str) -> str:
+    content_type, _ = mimetypes.guess_type(filename)
+    return content_type or "application/octet-stream"
+
+
+def _file_response(request: HttpRequest, filepath: str) -> HttpResponse:
+    """Serve a file, honouring conditional (If-None-Match, If-Modified-Since) and Range requests,
+    so browsers can cache and seek audio files
+    """
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        raise Http404("Audio file does not exist")
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        return response
+
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if "Range" in request.headers and (if_range is None or if_range == etag):
+        byte_range = _parse_range(request.headers["Range"], size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None or byte_range == (0, size - 1):
+        response = FileResponse(open(filepath, "rb"), content_type=_content_type(filepath))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_file_range(filepath, start, end), status=206, content_type=_content_type(filepath)
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    # Header is required to make seeking work in Chrome
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Parse a single byte range of a Range header
+
+    Returns:
+        the first and last (inclusive) byte of the range, the whole file for ranges we do not support,
+        or None if the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        # multiple or malformed ranges: serve the whole file
+        return (0, size - 1)
+    first, last = match.groups()
+    if not first:
+        # suffix range: the last n bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return (max(size - length, 0), size - 1)
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return (start, end)
+
+
+def _read_file_range(filepath: str, start: int, end: int) -> Iterator[bytes]:
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
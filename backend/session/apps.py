@@ -1,5 +1,26 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_delete
 
 
 class SessionConfig(AppConfig):
     name = 'session'
+
+    def ready(self):
+        from result.models import Result
+        from session.models import (
+            Session,
+            invalidate_session_results,
+            load_counted_state,
+            remove_from_accumulative_score,
+            remove_from_score_distribution,
+        )
+
+        post_save.connect(invalidate_session_results, sender=Result, dispatch_uid='invalidate_session_results')
+        post_delete.connect(invalidate_session_results, sender=Result, dispatch_uid='invalidate_session_results')
+        pre_delete.connect(load_counted_state, sender=Session, dispatch_uid='load_counted_state')
+        post_delete.connect(
+            remove_from_score_distribution, sender=Session, dispatch_uid='remove_from_score_distribution'
+        )
+        post_delete.connect(
+            remove_from_accumulative_score, sender=Session, dispatch_uid='remove_from_accumulative_score'
+        )
@@ -0,0 +1,102 @@
+from typing import Optional, TextIO
+
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from experiment.models import Block
+from experiment.rules import BLOCK_RULES
+from result.models import Result
+
+
+class Command(BaseCommand):
+    """Command for closing unfinished sessions which passed the session timeout of their rules, to run periodically
+    Usage: python manage.py closestalesessions [--block <slug> ...] [--batch-size 500] [--archive <file>] [--dry-run]"""
+
+    help = 'Close unfinished sessions which passed the session timeout of their rules, e.g. after a closed browser'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--block',
+                            type=str,
+                            action='append',
+                            dest='blocks',
+                            help="Slug of a block to sweep (can be repeated); defaults to all blocks")
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=500,
+                            help="Number of sessions to close at once")
+        parser.add_argument('--archive',
+                            type=str,
+                            help="File to append the results of the closed sessions to, as JSON lines")
+        parser.add_argument('--dry-run',
+                            action='store_true',
+                            help="Only count the stale sessions per block")
+
+    def handle(self, *args, **options):
+        blocks = Block.objects.all()
+        if options.get('blocks'):
+            blocks = blocks.filter(slug__in=options['blocks'])
+            missing = set(options['blocks']) - set(blocks.values_list('slug', flat=True))
+            if missing:
+                raise CommandError('Block(s) do not exist: %s' % ', '.join(sorted(missing)))
+
+        if options['archive'] and not options['dry_run']:
+            with open(options['archive'], 'a') as archive:
+                closed = close_stale_sessions(blocks, options['batch_size'], archive)
+        else:
+            closed = close_stale_sessions(blocks, options['batch_size'], dry_run=options['dry_run'])
+
+        for slug, count in closed.items():
+            self.stdout.write(f'{slug}: {count} stale session(s)')
+        action = 'Found' if options['dry_run'] else 'Closed'
+        self.stdout.write(self.style.SUCCESS(f'{action} {sum(closed.values())} stale session(s)'))
+
+
+def close_stale_sessions(
+    blocks, batch_size: int = 500, archive: Optional[TextIO] = None, dry_run: bool = False
+) -> dict[str, int]:
+    """Close the unfinished sessions of blocks whose rules set a `session_timeout`, in batches
+
+    Args:
+        blocks: queryset of blocks to sweep
+        batch_size: number of sessions to close at once
+        archive: file to write the results of the closed sessions to, before the rules close them
+        dry_run: only count the stale sessions
+
+    Returns:
+        number of stale sessions by block slug, for blocks which have any
+    """
+    now = timezone.now()
+    # only import the rules which are used by the blocks
+    rules_ids = [
+        rules_id for rules_id in blocks.values_list('rules', flat=True).order_by().distinct() if rules_id in BLOCK_RULES
+    ]
+    timed_out = [rules_id for rules_id in rules_ids if BLOCK_RULES[rules_id].session_timeout is not None]
+    closed = {}
+    for block in blocks.filter(rules__in=timed_out).order_by('pk'):
+        rules = BLOCK_RULES.get_instance(block.rules)
+        stale = rules.get_stale_sessions(block, now - rules.session_timeout).order_by('pk')
+        if dry_run:
+            count = stale.count()
+        else:
+            count = 0
+            last_pk = 0
+            while True:
+                with transaction.atomic():
+                    # lock the batch, so requests cannot change its sessions while the rules close them;
+                    # sessions which are locked by a request are in use, and not stale after all
+                    batch = list(
+                        stale.filter(pk__gt=last_pk).select_for_update(skip_locked=True, of=('self',))[:batch_size]
+                    )
+                    if not batch:
+                        break
+                    if archive:
+                        results = Result.objects.filter(session__in=batch).order_by('pk')
+                        serializers.serialize('jsonl', results, stream=archive)
+                    rules.close_stale_sessions(batch)
+                count += len(batch)
+                last_pk = batch[-1].pk
+        if count:
+            closed[block.slug] = count
+    return closed
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from experiment.models import Block
+from session.models import ScoreDistribution, Session
+
+
+class Command(BaseCommand):
+    """Command for (re)building the score distribution used for percentile ranks
+    Usage: python manage.py rebuildscoredistribution [--block <slug> ...] [--check]"""
+
+    help = 'Rebuild the per-block score distribution of finished sessions, or check it against the sessions table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--block',
+                            type=str,
+                            action='append',
+                            dest='blocks',
+                            help="Slug of a block to rebuild (can be repeated); defaults to all blocks")
+        parser.add_argument('--check',
+                            action='store_true',
+                            help="Only compare the distribution with the sessions table, and report differences")
+
+    def handle(self, *args, **options):
+        block_ids = None
+        if options.get('blocks'):
+            blocks = Block.objects.filter(slug__in=options['blocks'])
+            missing = set(options['blocks']) - set(blocks.values_list('slug', flat=True))
+            if missing:
+                raise CommandError('Block(s) do not exist: %s' % ', '.join(sorted(missing)))
+            block_ids = list(blocks.values_list('id', flat=True))
+
+        if options['check']:
+            differences = check_score_distribution(block_ids)
+            for block_id, score, expected, actual in differences:
+                self.stdout.write(
+                    f'Block {block_id}, score {score}: {actual} sessions in distribution, expected {expected}'
+                )
+            if differences:
+                raise CommandError(f'Score distribution is inconsistent in {len(differences)} bucket(s)')
+            self.stdout.write(self.style.SUCCESS('Score distribution is consistent'))
+            return
+
+        n_buckets = ScoreDistribution.objects.rebuild(block_ids)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt score distribution with {n_buckets} bucket(s)'))
+
+
+def check_score_distribution(block_ids: list[int] = None) -> list[tuple[int, float, int, int]]:
+    """Compare the score distribution with exact counts from the sessions table
+
+    Returns:
+        list of (block id, score, expected count, actual count) for every bucket that differs
+    """
+    sessions = Session.objects.filter(finished_at__isnull=False, block__isnull=False)
+    buckets = ScoreDistribution.objects.all()
+    if block_ids is not None:
+        sessions = sessions.filter(block_id__in=block_ids)
+        buckets = buckets.filter(block_id__in=block_ids)
+    expected = {
+        (row['block_id'], row['final_score']): row['n']
+        for row in sessions.values('block_id', 'final_score').annotate(n=Count('id')).order_by()
+    }
+    actual = {
+        (row['block_id'], row['score']): row['count']
+        for row in buckets.values('block_id', 'score', 'count')
+    }
+    differences = []
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key, 0) != actual.get(key, 0):
+            differences.append((*key, expected.get(key, 0), actual.get(key, 0)))
+    return differences
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from experiment.models import Block
+from participant.models import Participant
+from result.models import Result
+from session.models import GroupCounter, ScoreDistribution, Session
+
+
+class RebuildScoreDistributionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.block = Block.objects.create(slug='test')
+        participant = Participant.objects.create()
+        for score in [1, 2, 2, 5]:
+            Session.objects.create(
+                block=cls.block, participant=participant, final_score=score, finished_at=timezone.now()
+            )
+        Session.objects.create(block=cls.block, participant=participant, final_score=8)
+
+    def test_rebuildscoredistribution(self):
+        ScoreDistribution.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuildscoredistribution', check=True, stdout=StringIO())
+        call_command('rebuildscoredistribution', block=['test'], stdout=StringIO())
+        self.assertEqual(ScoreDistribution.objects.count(), 3)
+        self.assertEqual(ScoreDistribution.objects.get(score=2).count, 2)
+        out = StringIO()
+        call_command('rebuildscoredistribution', check=True, stdout=out)
+        self.assertIn('consistent', out.getvalue())
+
+    def test_unknown_block(self):
+        with self.assertRaises(CommandError):
+            call_command('rebuildscoredistribution', block=['nonexistent'], stdout=StringIO())
+
+
+class CloseStaleSessionsTest(TestCase):
+    fixtures = ["choice_lists", "demographics"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.block = Block.objects.create(slug='categorization', rules='CATEGORIZATION')
+        other_block = Block.objects.create(slug='other', rules='H_BAT')
+        participant = Participant.objects.create()
+        two_days_ago = timezone.now() - timezone.timedelta(days=2)
+        cls.stale = [
+            Session.objects.create(
+                block=cls.block, participant=participant, started_at=two_days_ago, json_data={'group': group}
+            )
+            for group in ['S1', 'S1', 'C2']
+        ]
+        for session in cls.stale:
+            Result.objects.create(session=session, question_key='training', given_response='A')
+        cls.active = Session.objects.create(block=cls.block, participant=participant, json_data={'group': 'S1'})
+        cls.finished = Session.objects.create(
+            block=cls.block, participant=participant, started_at=two_days_ago, finished_at=timezone.now()
+        )
+        # rules without a session timeout keep their sessions open
+        cls.other = Session.objects.create(block=other_block, participant=participant, started_at=two_days_ago)
+        GroupCounter.objects.bulk_create([
+            GroupCounter(block=cls.block, group='S1', count=3),
+            GroupCounter(block=cls.block, group='C2', count=1),
+        ])
+
+    def test_closestalesessions(self):
+        out = StringIO()
+        call_command('closestalesessions', dry_run=True, stdout=out)
+        self.assertIn('Found 3 stale session(s)', out.getvalue())
+        self.assertEqual(Result.objects.count(), 3)
+
+        out = StringIO()
+        call_command('closestalesessions', batch_size=2, stdout=out)
+        self.assertIn('categorization: 3 stale session(s)', out.getvalue())
+        for session in self.stale:
+            session.refresh_from_db()
+            self.assertEqual(session.json_data['phase'], 'CLOSED_BROWSER')
+            self.assertIsNone(session.finished_at)
+        self.assertFalse(Result.objects.exists())
+        self.assertEqual(GroupCounter.objects.get(group='S1').count, 1)
+        self.assertEqual(GroupCounter.objects.get(group='C2').count, 0)
+        for session in [self.active, self.finished, self.other]:
+            session.refresh_from_db()
+            self.assertNotIn('phase', session.json_data)
+
+        # closed sessions are not swept again
+        out = StringIO()
+        call_command('closestalesessions', stdout=out)
+        self.assertIn('Closed 0 stale session(s)', out.getvalue())
+
+    def test_archive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.jsonl')
+            call_command('closestalesessions', block=['categorization'], archive=path, stdout=StringIO())
+            with open(path) as archive:
+                results = [json.loads(line) for line in archive]
+        self.assertEqual(len(results), 3)
+        self.assertEqual({result['fields']['session'] for result in results}, {s.pk for s in self.stale})
+
+    def test_unknown_block(self):
+        with self.assertRaises(CommandError):
+            call_command('closestalesessions', block=['nonexistent'], stdout=StringIO())
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.5 on 2026-10-18 18:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_score_distribution(apps, schema_editor):
+    Session = apps.get_model('session', 'Session')
+    ScoreDistribution = apps.get_model('session', 'ScoreDistribution')
+    rows = (
+        Session.objects.filter(finished_at__isnull=False, block__isnull=False)
+        .values('block_id', 'final_score')
+        .annotate(n=models.Count('id'))
+        .order_by()
+    )
+    ScoreDistribution.objects.bulk_create(
+        ScoreDistribution(block_id=row['block_id'], score=row['final_score'], count=row['n'])
+        for row in rows.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiment', '0076_experiment_replayable'),
+        ('session', '0008_alter_session_block_alter_session_participant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDistribution',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('count', models.IntegerField(default=0)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_distribution', to='experiment.block')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('block', 'score'), name='unique_block_score')],
+            },
+        ),
+        migrations.RunPython(build_score_distribution, migrations.RunPython.noop),
+    ]
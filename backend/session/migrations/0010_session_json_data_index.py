@@ -0,0 +1,23 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:58
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # build the index without locking the session table for writes
+    atomic = False
+
+    dependencies = [
+        ('session', '0009_scoredistribution'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='session',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['json_data'], name='session_json_data_path_ops', opclasses=['jsonb_path_ops']
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiment', '0077_exportwatermark'),
+        ('session', '0010_session_json_data_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(max_length=64)),
+                ('count', models.IntegerField(default=0)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_counters', to='experiment.block')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('block', 'group'), name='unique_block_group')],
+            },
+        ),
+    ]
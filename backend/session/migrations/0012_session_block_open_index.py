@@ -0,0 +1,30 @@
+# Generated by Django 6.0.5 on 2026-10-18 19:53
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # build the index without locking the session table for writes
+    atomic = False
+
+    dependencies = [
+        ('experiment', '0077_exportwatermark'),
+        ('participant', '0003_accumulative_score'),
+        ('section', '0011_audiometadata'),
+        ('session', '0011_groupcounter'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='session',
+            index=models.Index(fields=['block', 'finished_at', 'started_at'], name='session_block_open'),
+        ),
+        # the new index starts with this column, so its own index is no longer needed
+        migrations.AlterField(
+            model_name='session',
+            name='block',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='experiment.block'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.5 on 2026-10-18 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiment', '0077_exportwatermark'),
+        ('session', '0012_session_block_open_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64)),
+                ('value', models.IntegerField(default=0)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sequence_counters', to='experiment.block')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('block', 'name'), name='unique_block_sequence')],
+            },
+        ),
+    ]
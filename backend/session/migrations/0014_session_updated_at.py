@@ -0,0 +1,34 @@
+# Generated by Django 6.0.5 on 2026-10-18 21:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_updated_at(apps, schema_editor):
+    Session = apps.get_model('session', 'Session')
+    # the last change known of existing sessions, so the incremental export needs no other column
+    Session.objects.update(updated_at=Greatest('started_at', Coalesce('finished_at', 'started_at')))
+
+
+class Migration(migrations.Migration):
+    # build the index without locking the session table for writes
+    atomic = False
+
+    dependencies = [
+        ('session', '0013_sequencecounter'),
+    ]
+
+    operations = [
+        # nullable, so adding it does not rewrite the table
+        migrations.AddField(
+            model_name='session',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='session',
+            index=models.Index(fields=['block', 'updated_at'], name='session_block_updated'),
+        ),
+    ]
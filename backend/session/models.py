@@ -1,12 +1,50 @@
-from typing import Iterable, Optional, Union
-
-from django.db import models
+import random
+import threading
+import weakref
+from collections import Counter, defaultdict
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from django.contrib.postgres.indexes import GinIndex
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Greatest
 from django.db.models.query import QuerySet
 from django.utils import timezone
 
 from result.models import Result
 from section.models import Section
 
+# the fields by which a session is counted in the `ScoreDistribution` and in the accumulative score of its participant
+COUNTED_FIELDS = ("block_id", "participant_id", "finished_at", "final_score")
+NOT_COUNTED = {"block_id": None, "participant_id": None, "finished_at": None, "final_score": 0.0}
+
+
+class SessionManager(models.Manager):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Create sessions in bulk, and count them in the `ScoreDistribution` and in the accumulative scores of their
+        participants as `save()` does. With `ignore_conflicts` or `update_conflicts` it is unknown which sessions were
+        created, run the `rebuildscoredistribution` and `backfillaccumulativescores` commands afterwards
+        """
+        sessions = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+            return sessions
+        entries = Counter()
+        differences = defaultdict(float)
+        for session in sessions:
+            entry = session._get_distribution_entry(session._counted_state)
+            if entry is not None:
+                entries[entry] += 1
+            differences[session.participant_id] += session.final_score
+        for (block_id, score), n in entries.items():
+            ScoreDistribution.objects.add(block_id, score, n)
+        participant_model = self.model._meta.get_field("participant").related_model
+        for participant_id, difference in differences.items():
+            if difference:
+                participant_model.objects.add_to_accumulative_score(participant_id, difference)
+        return sessions
+
+
 class Session(models.Model):
     """A model defining a session of an experiment block of a participant
 
@@ -16,6 +54,7 @@ class Session(models.Model):
         playlist (section.models.Playlist): most sessions will also be tied to a playlist
         started_at (datetime): a timestamp when a session is created, auto-populated
         finished_at (datetime): a timestamp of when `session.finish()` was called
+        updated_at (datetime): a timestamp, set automatically whenever the session is saved
         json_data (json): a field to keep track of progress through a blocks' rules in a session
         final_score (float): the final score of the session, usually the sum of all `Result` objects on the session
     """
@@ -25,6 +64,8 @@ class Session(models.Model):
         on_delete=models.CASCADE,
         blank=True,
         null=True,
+        # covered by the `session_block_open` index
+        db_index=False,
     )
     participant = models.ForeignKey(
         "participant.Participant", related_name='sessions', on_delete=models.CASCADE
@@ -33,12 +74,125 @@ class Session(models.Model):
 
     started_at = models.DateTimeField(db_index=True, default=timezone.now)
     finished_at = models.DateTimeField(db_index=True, default=None, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
     json_data = models.JSONField(default=dict, blank=True, null=True)
     final_score = models.FloatField(db_index=True, default=0.0)
 
+    objects = SessionManager()
+
+    class Meta:
+        indexes = [
+            # rules look up sessions by their state, e.g. `json_data__contains={"group": "S1"}`
+            GinIndex(fields=["json_data"], opclasses=["jsonb_path_ops"], name="session_json_data_path_ops"),
+            # the `closestalesessions` command looks up unfinished sessions of a block by their start
+            models.Index(fields=["block", "finished_at", "started_at"], name="session_block_open"),
+            # the incremental export looks up the sessions of a block which changed since the previous export
+            models.Index(fields=["block", "updated_at"], name="session_block_updated"),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counted_state = self._get_loaded_state()
+        self._results_cache = None
+
     def __str__(self):
         return "Session {}".format(self.id)
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # a new session is not counted yet, whatever it was initialized with
+            saved = NOT_COUNTED
+        else:
+            saved = self._get_counted_state()
+        super().save(*args, **kwargs)
+        # fields which were deferred or left out of `update_fields` keep their saved value
+        state = {**saved, **self._get_loaded_state(kwargs.get("update_fields"))}
+        self._update_score_distribution(saved, state)
+        self._update_accumulative_score(saved, state)
+        self._counted_state = state
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # after refreshing some fields, the others may hold unsaved changes
+        self._counted_state = self._get_loaded_state() if fields is None else {}
+        self.invalidate_results()
+
+    def _get_loaded_state(self, update_fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Returns:
+            the loaded values of the `COUNTED_FIELDS`, leaving out deferred fields and fields not in `update_fields`
+        """
+        names = COUNTED_FIELDS
+        if update_fields is not None:
+            attnames = {self._meta.get_field(name).attname for name in update_fields}
+            names = [name for name in names if name in attnames]
+        # read from __dict__ so deferred fields do not trigger extra queries
+        return {name: self.__dict__[name] for name in names if name in self.__dict__}
+
+    def _get_counted_state(self) -> dict:
+        """
+        Returns:
+            the saved values of the `COUNTED_FIELDS`, by which this session is counted,
+            loaded from the database if some of them were deferred
+        """
+        if len(self._counted_state) < len(COUNTED_FIELDS):
+            saved = Session.objects.filter(pk=self.pk).values(*COUNTED_FIELDS).first()
+            self._counted_state = saved or NOT_COUNTED
+        return self._counted_state
+
+    @staticmethod
+    def _get_distribution_entry(state: dict) -> Optional[tuple[int, float]]:
+        """
+        Returns:
+            the (block id, final score) pair under which a session in this state is counted in the `ScoreDistribution`, or None if it is not counted (yet)
+        """
+        if state["finished_at"] is None or state["block_id"] is None:
+            return None
+        return state["block_id"], state["final_score"]
+
+    def _update_score_distribution(self, saved: dict, state: dict):
+        """Move this session to its current bucket of the `ScoreDistribution`,
+        e.g. when it was just finished, or when its `final_score` changed after finishing
+        """
+        old_entry = self._get_distribution_entry(saved)
+        entry = self._get_distribution_entry(state)
+        if entry == old_entry:
+            return
+        if old_entry is not None:
+            ScoreDistribution.objects.add(*old_entry, amount=-1)
+        if entry is not None:
+            ScoreDistribution.objects.add(*entry)
+
+    def _update_accumulative_score(self, saved: dict, state: dict):
+        """Add changes of `final_score` to the participant's accumulative score"""
+        difference = state["final_score"] - saved["final_score"]
+        if difference:
+            participant_model = self._meta.get_field("participant").related_model
+            participant_model.objects.add_to_accumulative_score(self.participant_id, difference)
+
+    def cached_results(self) -> list[Result]:
+        """All results of this session, oldest first, with their sections and songs.
+        Loaded with a single query on first use and kept on this instance, so the result helpers below
+        do not query the database again within the same request
+
+        Returns:
+            list of Result objects
+        """
+        if self._results_cache is None or self._results_cache[1] != self._results_cache[0].value:
+            with _results_versions_lock:
+                version = _results_versions.setdefault(self.pk, _ResultsVersion())
+            # take the version before loading, so results saved meanwhile invalidate the loaded ones
+            value = version.value
+            results = list(self.result_set.select_related("section__song").order_by("created_at", "pk"))
+            self._results_cache = (version, value, results)
+        return self._results_cache[2]
+
+    def invalidate_results(self):
+        """Forget the results loaded by `cached_results`, e.g. after results were added, changed or deleted.
+        Saving or deleting a Result of this session does this automatically for all its instances in this process
+        """
+        self._results_cache = None
+
     def result_count(self) -> int:
         """
         Returns:
@@ -77,13 +231,10 @@ class Session(models.Model):
         Returns:
             number of results, filtered by `counted_result_keys`, if supplied
         """
-        results = self.result_set
         filter_keys = (
             self.block_rules().counted_result_keys if apply_results_filter else None
         )
-        if filter_keys:
-            results = results.filter(question_key__in=filter_keys)
-        return results.count()
+        return len(self._filter_cached_results(filter_keys))
 
     def get_used_song_ids(self, exclude: dict = {}) -> Iterable[int]:
         """Get a list of song ids already used in this session
@@ -94,30 +245,46 @@ class Session(models.Model):
         Returns:
             a list of song ids from the sections of this session's results
         """
-        return (res.section.song.id for res in self.result_set.exclude(**exclude).filter(section__isnull=False))
+        if not exclude:
+            return (res.section.song_id for res in self.cached_results() if res.section_id is not None)
+        return self._used_song_ids(exclude)
+
+    def _used_song_ids(self, exclude: dict = {}) -> QuerySet:
+        """
+        Returns:
+            a lazy query of the song ids from the sections of this session's results, to be used as a subquery
+        """
+        return (
+            self.result_set.exclude(**exclude)
+            .filter(section__song__isnull=False)
+            .values_list("section__song_id", flat=True)
+        )
 
-    def get_unused_song_ids(self, filter_by: dict = {}) -> Iterable[int]:
-        """Get a list of unused song ids from this session's playlist
+    def get_unused_song_ids(self, filter_by: dict = {}) -> QuerySet:
+        """Get the song ids from this session's playlist which haven't been used in this session yet.
+        The ids are not fetched until the returned query is evaluated, so it can be passed on to
+        `Playlist.get_section(song_ids=...)` and resolved in the same database query
 
         Attributes:
             filter_by: a dictionary by which to select sections from the playlist (e.g., a certain tag), using [Django's querying syntax](https://docs.djangoproject.com/en/4.2/topics/db/queries/)
 
         Returns:
-            a list of song ids which haven't been used in this session yet
+            a query of song ids which haven't been used in this session yet
         """
-        # Get all song ids from the current playlist
-        song_ids = (
-            self.playlist.section_set.filter(**filter_by).order_by("song").values_list("song_id", flat=True).distinct()
+        return (
+            self.playlist.section_set.filter(**filter_by)
+            .exclude(song_id__in=self._used_song_ids())
+            .order_by("song_id")
+            .values_list("song_id", flat=True)
+            .distinct()
         )
-        # Get all song ids from results
-        used_song_ids = self.get_used_song_ids()
-        return list(set(song_ids) - set(used_song_ids))
 
-    def _filter_results(self, question_keys) -> QuerySet:
-        results = self.result_set
+    def _filter_cached_results(self, question_keys) -> list[Result]:
+        """The results from `cached_results` with one of `question_keys`, or all of them if empty, newest first"""
+        results = reversed(self.cached_results())
         if question_keys:
-            results = results.filter(question_key__in=question_keys)
-        return results.order_by("-created_at")
+            return [result for result in results if result.question_key in question_keys]
+        return list(results)
 
     def last_result(self, question_keys: list[str] = []) -> Optional[Result]:
         """
@@ -132,8 +299,8 @@ class Session(models.Model):
         Returns:
             last relevant Result object added to the database for this session
         """
-        results = self._filter_results(question_keys)
-        return results.first()
+        results = self._filter_cached_results(question_keys)
+        return results[0] if results else None
 
     def last_n_results(
         self, question_keys: list[str] = [], n_results: int = 1
@@ -147,8 +314,8 @@ class Session(models.Model):
         Returns:
             list of Result objects with the given question keys
         """
-        results = self._filter_results(question_keys)
-        return list(results.order_by("-created_at")[:n_results])
+        results = self._filter_cached_results(question_keys)
+        return results[:n_results]
 
     def last_section(self, question_keys: list[str] = []) -> Union[Section, None]:
         """
@@ -203,13 +370,27 @@ class Session(models.Model):
         Returns:
             Percentile rank of this session for the associated block, based on `final_score`
         """
-        sessions = Session.objects.filter(**filter_conditions)
-        n_session = sessions.count()
-        if n_session == 0:
+        counts = Session.objects.filter(**filter_conditions).aggregate(
+            n_session=models.Count("pk"),
+            n_lte=models.Count("pk", filter=Q(final_score__lte=self.final_score)),
+            n_eq=models.Count("pk", filter=Q(final_score=self.final_score)),
+        )
+        if counts["n_session"] == 0:
             return 0.0  # Should be impossible but avoids x/0
-        n_lte = sessions.filter(final_score__lte=self.final_score).count()
-        n_eq = sessions.filter(final_score=self.final_score).count()
-        return 100.0 * (n_lte - (0.5 * n_eq)) / n_session
+        return 100.0 * (counts["n_lte"] - (0.5 * counts["n_eq"])) / counts["n_session"]
+
+    def finished_percentile_rank(self, per_block: bool = False) -> float:
+        """Percentile rank of this session among finished sessions, based on `final_score`.
+        Equivalent to `percentile_rank({"finished_at__isnull": False})`, but answered from the `ScoreDistribution` index
+
+        Args:
+            per_block: if True, only compare with finished sessions of the same block
+
+        Returns:
+            Percentile rank of this session
+        """
+        block_ids = [self.block_id] if per_block else None
+        return ScoreDistribution.objects.percentile_rank(self.final_score, block_ids)
 
     def rank(self) -> int:
         """
@@ -238,10 +419,8 @@ class Session(models.Model):
         Returns:
             sum of all result scores
         """
-        score = self.result_set.aggregate(models.Sum("score"))
-        return self.block.bonus_points + (
-            score["score__sum"] if score["score__sum"] else 0
-        )
+        scores = [result.score for result in self.cached_results() if result.score is not None]
+        return self.block.bonus_points + sum(scores)
 
     def save_json_data(self, data: dict):
         """Merge data with json_data, overwriting duplicate keys.
@@ -258,3 +437,283 @@ class Session(models.Model):
             a boolean to indicate whether the session is finished
         """
         return self.finished_at
+
+
+def percentile_rank_in_distribution(
+    buckets: QuerySet, score: float, extra_counts: Optional[dict[float, int]] = None
+) -> float:
+    """Percentile rank of `score` in a distribution stored as rows with a `score` and a `count`
+
+    Args:
+        buckets: queryset of the rows of the distribution to take into account
+        score: the score to rank
+        extra_counts: counts per score which are not stored in `buckets`, but belong to the distribution
+
+    Returns:
+        Percentile rank, calculated in the same way as `Session.percentile_rank`
+    """
+    counts = buckets.aggregate(
+        n_total=Sum("count", default=0),
+        n_lte=Sum("count", filter=Q(score__lte=score), default=0),
+        n_eq=Sum("count", filter=Q(score=score), default=0),
+    )
+    for extra_score, n in (extra_counts or {}).items():
+        counts["n_total"] += n
+        counts["n_lte"] += n if extra_score <= score else 0
+        counts["n_eq"] += n if extra_score == score else 0
+    if counts["n_total"] <= 0:
+        return 0.0  # avoids x/0
+    return 100.0 * (counts["n_lte"] - (0.5 * counts["n_eq"])) / counts["n_total"]
+
+
+class _ResultsVersion:
+    """Version of the results of a session, shared by the Session instances in this process which cached them"""
+
+    __slots__ = ("value", "__weakref__")
+
+    def __init__(self):
+        self.value = 0
+
+
+# versions by session id, dropped as soon as no Session instance holds cached results of that session anymore
+_results_versions = weakref.WeakValueDictionary()
+_results_versions_lock = threading.Lock()
+
+
+def bump_results_version(session_id: Optional[int]):
+    """Clear the cached results of all Session instances of a session in this process,
+    e.g. after its results were changed with a bulk update, which sends no signals"""
+    with _results_versions_lock:
+        version = _results_versions.get(session_id)
+        if version is not None:
+            version.value += 1
+
+
+def invalidate_session_results(sender, instance: Result, **kwargs):
+    """Signal receiver clearing the cached results of all Session instances of a saved or deleted Result's session"""
+    bump_results_version(instance.session_id)
+
+
+def load_counted_state(sender, instance: Session, **kwargs):
+    """Signal receiver loading the saved state of a session before it is deleted, if some of it was deferred"""
+    instance._get_counted_state()
+
+
+def remove_from_score_distribution(sender, instance: Session, **kwargs):
+    """Signal receiver removing a deleted session from the `ScoreDistribution`,
+    also when it is deleted along with its participant or block"""
+    entry = instance._get_distribution_entry(instance._counted_state)
+    if entry is not None:
+        ScoreDistribution.objects.add(*entry, amount=-1)
+
+
+def remove_from_accumulative_score(sender, instance: Session, origin=None, **kwargs):
+    """Signal receiver subtracting the final score of a deleted session from the accumulative score of its
+    participant, unless the participant itself is deleted"""
+    participant_model = Session._meta.get_field("participant").related_model
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    state = instance._counted_state
+    if state["final_score"] and origin_model is not participant_model:
+        participant_model.objects.add_to_accumulative_score(state["participant_id"], -state["final_score"])
+
+
+class ScoreDistributionManager(models.Manager):
+
+    def add(self, block_id: int, score: float, amount: int = 1):
+        """Atomically add `amount` sessions (may be negative) to the bucket of `score` in a block"""
+        updated = self.filter(block_id=block_id, score=score).update(count=F("count") + amount)
+        if updated or amount < 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(block_id=block_id, score=score, count=amount)
+        except IntegrityError:
+            # another process created the bucket in the meantime
+            self.filter(block_id=block_id, score=score).update(count=F("count") + amount)
+
+    def percentile_rank(self, score: float, block_ids: Optional[Iterable[int]] = None) -> float:
+        """Percentile rank of `score` among the finished sessions of the given blocks
+
+        Args:
+            score: the final score to rank
+            block_ids: ids of the blocks to compare with; if None, compare with all blocks
+
+        Returns:
+            Percentile rank, calculated in the same way as `Session.percentile_rank`
+        """
+        buckets = self.all()
+        if block_ids is not None:
+            buckets = buckets.filter(block_id__in=block_ids)
+        return percentile_rank_in_distribution(buckets, score)
+
+    def rank(self, score: float, block_id: int) -> int:
+        """
+        Returns:
+            dense rank of `score` among the finished sessions of a block (1 is the highest score)
+        """
+        return self.filter(block_id=block_id, score__gte=score, count__gt=0).count()
+
+    def rebuild(self, block_ids: Optional[Iterable[int]] = None) -> int:
+        """Recompute the distribution from the `Session` table
+
+        Args:
+            block_ids: ids of the blocks to rebuild; if None, rebuild all blocks
+
+        Returns:
+            number of buckets written
+        """
+        sessions = Session.objects.filter(finished_at__isnull=False, block__isnull=False)
+        buckets = self.all()
+        if block_ids is not None:
+            sessions = sessions.filter(block_id__in=block_ids)
+            buckets = buckets.filter(block_id__in=block_ids)
+        rows = sessions.values("block_id", "final_score").annotate(n=models.Count("id")).order_by()
+        with transaction.atomic():
+            buckets.delete()
+            created = self.bulk_create(
+                ScoreDistribution(block_id=row["block_id"], score=row["final_score"], count=row["n"])
+                for row in rows
+            )
+        return len(created)
+
+
+class ScoreDistribution(models.Model):
+    """Number of finished sessions per final score per block,
+    maintained when sessions are saved or deleted, so percentile ranks can be computed without scanning all sessions.
+    Use the `rebuildscoredistribution` management command to (re)build it from the `Session` table.
+
+    Attributes:
+        block (experiment.models.Block): the block of the counted sessions
+        score (float): a final score
+        count (int): number of finished sessions of the block with this final score
+    """
+
+    block = models.ForeignKey(
+        "experiment.Block", related_name="score_distribution", on_delete=models.CASCADE
+    )
+    score = models.FloatField()
+    count = models.IntegerField(default=0)
+
+    objects = ScoreDistributionManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["block", "score"], name="unique_block_score"),
+        ]
+
+    def __str__(self):
+        return f"{self.block_id}: {self.score} ({self.count})"
+
+
+class GroupCounterManager(models.Manager):
+
+    def _lock(self, block_id: int, groups: Sequence[str]) -> list["GroupCounter"]:
+        # always lock in the same order, so concurrent assignments cannot deadlock
+        return list(self.select_for_update().filter(block_id=block_id, group__in=groups).order_by("pk"))
+
+    def assign(
+        self,
+        block_id: int,
+        groups: Sequence[str],
+        initial_counts: Optional[Callable[[], dict[str, int]]] = None,
+    ) -> str:
+        """Assign the group with the fewest assignments in a block, picking randomly among ties, and count it.
+        The counters of the block are locked while assigning, so concurrent sign-ups are balanced too
+
+        Args:
+            block_id: the block in which participants are assigned to groups
+            groups: the groups to balance
+            initial_counts: called when the counters of the block are created, to count assignments made before
+
+        Returns:
+            the assigned group
+        """
+        with transaction.atomic():
+            counters = self._lock(block_id, groups)
+            if len(counters) < len(set(groups)):
+                counts = initial_counts() if initial_counts else {}
+                self.bulk_create(
+                    [GroupCounter(block_id=block_id, group=group, count=counts.get(group, 0)) for group in groups],
+                    ignore_conflicts=True,
+                )
+                counters = self._lock(block_id, groups)
+            lowest = min(counter.count for counter in counters)
+            counter = random.choice([counter for counter in counters if counter.count == lowest])
+            self.filter(pk=counter.pk).update(count=F("count") + 1)
+        return counter.group
+
+    def release(self, block_id: int, group: str, count: int = 1):
+        """Count assignments to a group less, e.g. when sessions give up their group"""
+        self.filter(block_id=block_id, group=group).update(count=Greatest(F("count") - count, 0))
+
+
+class GroupCounter(models.Model):
+    """Number of sessions assigned to a group per block, used by rules to counterbalance conditions
+    without counting sessions
+
+    Attributes:
+        block (experiment.models.Block): the block of the assigned sessions
+        group (str): a group or condition defined by the rules
+        count (int): number of sessions of the block holding this group
+    """
+
+    block = models.ForeignKey(
+        "experiment.Block", related_name="group_counters", on_delete=models.CASCADE
+    )
+    group = models.CharField(max_length=64)
+    count = models.IntegerField(default=0)
+
+    objects = GroupCounterManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["block", "group"], name="unique_block_group"),
+        ]
+
+    def __str__(self):
+        return f"{self.block_id}: {self.group} ({self.count})"
+
+
+class SequenceCounterManager(models.Manager):
+
+    def next_value(self, block_id: int, name: str) -> int:
+        """Count the next number of a sequence in a block, locking only the counter of that sequence,
+        so concurrent callers get consecutive numbers
+
+        Args:
+            block_id: the block of the sequence
+            name: name of the sequence, defined by the rules
+
+        Returns:
+            the next number of the sequence, starting from 0
+        """
+        with transaction.atomic():
+            counter, _ = self.select_for_update().get_or_create(block_id=block_id, name=name)
+            self.filter(pk=counter.pk).update(value=F("value") + 1)
+        return counter.value
+
+
+class SequenceCounter(models.Model):
+    """Counter of a sequence of numbers per block, used by rules to hand out assignments one after the other
+
+    Attributes:
+        block (experiment.models.Block): the block of the sequence
+        name (str): name of the sequence, defined by the rules
+        value (int): number of values handed out, which is the next value of the sequence
+    """
+
+    block = models.ForeignKey(
+        "experiment.Block", related_name="sequence_counters", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=64)
+    value = models.IntegerField(default=0)
+
+    objects = SequenceCounterManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["block", "name"], name="unique_block_sequence"),
+        ]
+
+    def __str__(self):
+        return f"{self.block_id}: {self.name} ({self.value})"
@@ -0,0 +1,82 @@
+import random
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+
+from experiment.models import Block
+from participant.models import Participant
+from session.models import Session
+
+N_SESSIONS = 10000
+N_CONDITIONS = 500
+N_BLOCKS = 200
+
+
+class SessionIndexTest(TestCase):
+    """Check with EXPLAIN that looking up sessions by their state, start or last change uses its index on a large session table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        blocks = Block.objects.bulk_create([Block(slug=f'index-test-{i}') for i in range(N_BLOCKS)])
+        cls.block = blocks[0]
+        cls.small_block = blocks[2]
+        participant = Participant.objects.create()
+        now = timezone.now()
+        sessions = [
+            Session(
+                # half of the sessions are in one large block
+                block=blocks[0] if i % 2 else blocks[i % N_BLOCKS],
+                participant=participant,
+                started_at=now - timezone.timedelta(days=i % 100),
+                finished_at=now if i % 3 else None,
+                json_data={
+                    'condition': f'condition_{i % N_CONDITIONS}',
+                    'difficulty': str(i % 2),
+                    'group': ['S1', 'S2', 'C1', 'C2'][i % 4],
+                    'phase': 'FINISHED',
+                    'sequence': list(range(20)),
+                },
+            )
+            for i in range(N_SESSIONS)
+        ]
+        # store the sessions in no particular order, as they are after a while in production
+        random.Random(0).shuffle(sessions)
+        Session.objects.bulk_create(sessions)
+        # sessions were last saved when they started
+        Session.objects.update(updated_at=F('started_at'))
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Session._meta.db_table}')
+
+    def assertUsesIndex(self, queryset, index_name='session_json_data_path_ops'):
+        plan = queryset.explain()
+        self.assertNotIn(f'Seq Scan on {Session._meta.db_table}', plan)
+        self.assertIn(index_name, plan)
+
+    def test_sessions_by_condition(self):
+        self.assertUsesIndex(
+            Session.objects.filter(block__in=[self.block], json_data__contains={'condition': 'condition_42', 'difficulty': '0'})
+        )
+
+    def test_sessions_by_group(self):
+        self.assertUsesIndex(
+            Session.objects.filter(json_data__contains={'group': 'S1', 'phase': 'ABORTED'})
+        )
+
+    def test_stale_sessions(self):
+        self.assertUsesIndex(
+            self.small_block.sessions.filter(
+                finished_at=None, started_at__lt=timezone.now() - timezone.timedelta(hours=24)
+            ).order_by('pk'),
+            'session_block_open',
+        )
+
+    def test_sessions_changed_since_export(self):
+        now = timezone.now()
+        self.assertUsesIndex(
+            self.block.sessions.filter(
+                updated_at__gt=now - timezone.timedelta(days=1), updated_at__lte=now
+            ).order_by('updated_at', 'pk'),
+            'session_block_updated',
+        )
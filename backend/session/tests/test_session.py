@@ -7,7 +7,7 @@ from experiment.models import Block
 from participant.models import Participant
 from section.models import Playlist, Section, Song
 from result.models import Result
-from session.models import Session
+from session.models import GroupCounter, ScoreDistribution, Session
 
 
 class SessionTest(TestCase):
@@ -60,6 +60,84 @@ class SessionTest(TestCase):
         rank = finished_session.percentile_rank({})
         assert rank == 62.5
 
+    def test_finished_percentile_rank(self):
+        other_block = Block.objects.create(rules='RHYTHM_BATTERY_INTRO', slug='other')
+        for block, score in [(self.block, 24), (self.block, 42), (other_block, 90)]:
+            Session.objects.create(
+                block=block,
+                participant=self.participant,
+                final_score=score,
+                finished_at=timezone.now()
+            )
+        session = Session.objects.create(block=self.block, participant=self.participant)
+        session.final_score = 42
+        session.finish()
+        filter_conditions = {'finished_at__isnull': False}
+        self.assertEqual(session.finished_percentile_rank(), session.percentile_rank(filter_conditions))
+        filter_conditions['block'] = self.block
+        self.assertEqual(
+            session.finished_percentile_rank(per_block=True), session.percentile_rank(filter_conditions)
+        )
+        self.assertEqual(ScoreDistribution.objects.rank(42, self.block.id), 1)
+        self.assertEqual(ScoreDistribution.objects.rank(24, self.block.id), 2)
+
+    def test_score_distribution_follows_final_score(self):
+        session = Session.objects.create(block=self.block, participant=self.participant)
+        session.save()
+        self.assertFalse(ScoreDistribution.objects.exists())
+        session.finish(final_score=10)
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=10).count, 1)
+        # rules may overwrite the final score after finishing
+        session.final_score = 20
+        session.save()
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=10).count, 0)
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=20).count, 1)
+        # saving again does not count the session twice
+        Session.objects.get(pk=session.pk).save()
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=20).count, 1)
+        # nor when it was loaded with deferred fields
+        deferred = Session.objects.only('id', 'json_data').get(pk=session.pk)
+        deferred.json_data = {'saved': True}
+        deferred.save()
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=20).count, 1)
+        deferred = Session.objects.defer('final_score').get(pk=session.pk)
+        deferred.final_score = 30
+        deferred.save()
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=20).count, 0)
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=30).count, 1)
+
+    def test_score_distribution_on_delete(self):
+        participant = Participant.objects.create()
+        sessions = [
+            Session.objects.create(
+                block=self.block, participant=participant, final_score=10, finished_at=timezone.now()
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=10).count, 3)
+        Session.objects.only('id').get(pk=sessions[0].pk).delete()
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=10).count, 2)
+        # deleting a participant deletes its sessions
+        participant.delete()
+        self.assertEqual(ScoreDistribution.objects.get(block=self.block, score=10).count, 0)
+
+    def test_group_counter(self):
+        groups = ['A', 'B', 'C']
+        assigned = [GroupCounter.objects.assign(self.block.id, groups) for _ in range(6)]
+        self.assertEqual(sorted(assigned), ['A', 'A', 'B', 'B', 'C', 'C'])
+        GroupCounter.objects.release(self.block.id, 'B')
+        self.assertEqual(GroupCounter.objects.assign(self.block.id, groups), 'B')
+        self.assertEqual(GroupCounter.objects.get(block=self.block, group='B').count, 2)
+
+    def test_group_counter_initial_counts(self):
+        groups = ['A', 'B']
+        group = GroupCounter.objects.assign(self.block.id, groups, initial_counts=lambda: {'A': 3, 'B': 1})
+        self.assertEqual(group, 'B')
+        # the initial counts are only used to create the counters
+        group = GroupCounter.objects.assign(self.block.id, groups, initial_counts=lambda: {'A': 0, 'B': 10})
+        self.assertEqual(group, 'B')
+        self.assertEqual(GroupCounter.objects.get(block=self.block, group='B').count, 3)
+
     def test_last_result(self):
         result = self.session.last_result()
         self.assertIsNone(result)
@@ -107,6 +185,53 @@ class SessionTest(TestCase):
         score = self.session.last_score(["c", "d"])
         self.assertEqual(score, 9)
 
+    def test_cached_results(self):
+        song = Song.objects.create(artist='Beavis', name='Butthead')
+        section = Section.objects.create(playlist=self.playlist, song=song)
+        Result.objects.create(session=self.session, section=section, question_key='a', score=1)
+        Result.objects.create(session=self.session, question_key='b', score=2)
+        session = Session.objects.select_related('block').get(pk=self.session.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(session.last_result().question_key, 'b')
+            self.assertEqual(session.last_score(['a']), 1)
+            self.assertEqual(session.last_song(['a']), 'Beavis - Butthead')
+            self.assertEqual(len(session.last_n_results(n_results=5)), 2)
+            self.assertEqual(list(session.get_used_song_ids()), [song.id])
+            self.assertEqual(session.get_rounds_passed(apply_results_filter=False), 2)
+            self.assertEqual(session.total_score(), 3)
+        # new, changed and deleted results of this session invalidate the cache
+        Result.objects.create(session=session, question_key='c', score=3)
+        self.assertEqual(session.last_result().question_key, 'c')
+        result = session.last_result(['a'])
+        result.score = 5
+        result.save()
+        self.assertEqual(session.last_score(['a']), 5)
+        session.result_set.filter(question_key='c').delete()
+        self.assertEqual(session.last_result().question_key, 'b')
+        # also when the result refers to the session by id, or through another instance
+        Result.objects.create(session_id=session.pk, question_key='d')
+        self.assertEqual(session.last_result().question_key, 'd')
+        Result.objects.create(session=Session.objects.get(pk=session.pk), question_key='e')
+        self.assertEqual(session.last_result().question_key, 'e')
+
+    def test_unused_song_ids(self):
+        songs = [Song.objects.create(artist='Artist', name=f'Song {i}') for i in range(3)]
+        sections = [Section.objects.create(playlist=self.playlist, song=song) for song in songs]
+        Result.objects.create(session=self.session, section=sections[0], question_key='a')
+        Result.objects.create(session=self.session, question_key='b')
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.session.get_unused_song_ids()), {songs[1].id, songs[2].id})
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.session.get_used_song_ids(exclude={'question_key': 'b'})), [songs[0].id])
+        # resolving the unused songs and picking a section is a single round trip
+        with self.assertNumQueries(2):
+            section = self.playlist.get_section(song_ids=self.session.get_unused_song_ids())
+        self.assertIn(section, sections[1:])
+        for section in sections[1:]:
+            Result.objects.create(session=self.session, section=section, question_key='a')
+        # all songs were used: fall back to the whole playlist
+        self.assertIn(self.playlist.get_section(song_ids=self.session.get_unused_song_ids()), sections)
+
     def test_get_rounds_passed(self):
         Result.objects.create(session=self.session, question_key='some random key')
         self.assertEqual(self.session.get_rounds_passed(), 1)
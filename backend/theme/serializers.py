@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
-
+from experiment.cache import cached_serialization
 from image.serializers import serialize_image
 from theme.models import FooterConfig, HeaderConfig, ThemeConfig
 
@@ -28,6 +28,10 @@ def serialize_header(header: HeaderConfig) -> dict:
 
 
 def serialize_theme(theme: ThemeConfig) -> dict:
+    return cached_serialization('theme', theme.pk, lambda: _serialize_theme(theme))
+
+
+def _serialize_theme(theme: ThemeConfig) -> dict:
     return {
         'name': theme.name,
         'description': theme.description,
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 
 from image.models import Image
@@ -106,6 +107,10 @@ class ThemeConfigSerializerTest(TestCase):
         }
         self.assertEqual(serialize_header(self.header), expected_json)
 
+    def setUp(self):
+        # serializations are cached, and some tests change the theme without saving it
+        cache.clear()
+
     def default_colors(self):
         return {
             'colorPrimary': '#d843e2',